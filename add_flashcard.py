@@ -1,12 +1,18 @@
 #!python
 import sqlite3
-import datetime
 import sys
+import os
 import argparse
 
+# Shared SQLite connection settings live in the flashcard app
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'flashcard'))
+
+from sqlite_tuning import connect_sqlite
+from card_upsert import upsert_cards
+
 def connect_to_database():
     """Establish a connection to the SQLite database."""
-    return sqlite3.connect('flashcards.db')
+    return connect_sqlite('flashcards.db')
 
 def add_flashcard(word, meaning, meaning_vn=None, example=None, example_vn=None, ipa=None):
     """
@@ -19,44 +25,26 @@ def add_flashcard(word, meaning, meaning_vn=None, example=None, example_vn=None,
         example (str, optional): Example sentence
         example_vn (str, optional): Vietnamese example
         ipa (str, optional): IPA pronunciation
+
+    The cards table has no Vietnamese columns, so meaning_vn and example_vn
+    are accepted but not stored.
     """
     conn = connect_to_database()
-    cursor = conn.cursor()
     
     try:
-        # Get current timestamp
-        now = datetime.datetime.now()
-        
-        # Check if word already exists
-        cursor.execute('SELECT id FROM cards WHERE word = ?', (word,))
-        existing = cursor.fetchone()
+        # Insert or overwrite the card in one statement
+        result = upsert_cards(conn, [{
+            'word': word,
+            'meaning': meaning,
+            'example': example,
+            'ipa': ipa,
+            'box_number': 1  # Start in box 1 for spaced repetition
+        }], update_columns=('meaning', 'example', 'ipa', 'box_number'), overwrite=True)
         
-        if existing:
-            # Update existing record
-            cursor.execute('''
-                UPDATE cards 
-                SET meaning = ?, meaning_vn = ?, example = ?, example_vn = ?, ipa = ?, 
-                    updated_at = ?, box_number = 1
-                WHERE word = ?
-            ''', (
-                meaning, meaning_vn, example, example_vn, ipa, 
-                now, word
-            ))
-            print(f"Flashcard for '{word}' updated successfully!")
-        else:
-            # Insert new record
-            cursor.execute('''
-                INSERT INTO cards 
-                (word, meaning, meaning_vn, example, example_vn, ipa, box_number, 
-                last_reviewed, next_review, created_at, updated_at) 
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            ''', (
-                word, meaning, meaning_vn, example, example_vn, ipa, 
-                1,  # Start in box 1 for spaced repetition
-                None, None,  # No initial review
-                now, now  # creation and update timestamps
-            ))
+        if result.inserted:
             print(f"Flashcard for '{word}' added successfully!")
+        else:
+            print(f"Flashcard for '{word}' updated successfully!")
         
         conn.commit()
         return True
@@ -2,11 +2,11 @@ import logging
 import re
 import ssl
 import sqlite3
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 from typing import Set, Optional, List, Tuple
-import requests
-from flask import Flask, jsonify, request, render_template, send_file, abort
-from sqlalchemy import create_engine, Column, Integer, String, Text, DateTime, Float, ForeignKey, inspect, text
+from flask import Flask, jsonify, request, render_template, send_file, g
+from werkzeug.serving import is_running_from_reloader
+from sqlalchemy import text, bindparam
 from sqlalchemy.orm import declarative_base, relationship, sessionmaker
 from sqlalchemy.ext.declarative import declarative_base
 
@@ -14,12 +14,27 @@ from youtube_transcript_api import YouTubeTranscriptApi
 from gtts import gTTS
 from pathlib import Path
 import os
-import time
 from contextlib import contextmanager
 import nltk
 import tkinter as tk
 from user_interface import FlashcardLearningApp, login_page, register_page
-from models import UserModel, User, Achievement, Base
+from models import UserModel, User, Achievement, Base, Card, ReviewReceipt, get_engine, DECK_SCHEMA
+from schedulers import MAX_BOX, get_scheduler, reschedule, forecast
+from card_reads import CardReader, CARD_COLUMNS, encode_due_cursor, decode_due_cursor
+from card_search import build_match_query
+from word_index import WordIndex, track_card_changes, record_word_changes
+from card_upsert import upsert_cards, PLACEHOLDER_MEANING
+from dictionary_cache import DictionaryCache, fetch_dictionary_entry
+from enrichment import HostRateLimiter, enrich_words
+from lexicon import open_lexicon, explicit_pos, entry_details, DEFAULT_LEXICON_PATH
+from http_client import get_http_client
+from json_encoding import FastJSONProvider
+from sqlite_tuning import create_read_only_engine
+from compression import setup_compression
+from db_writer import DatabaseWriter
+from jobs import JobManager
+from review_log import ReviewEventWriter, event_params, INSERT_EVENT_SQL
+from migrations import run_migrations, rebuild_box_counters, SCHEMA_TABLES
 import uuid
 import hashlib
 
@@ -49,8 +64,8 @@ import logging
 from logging.handlers import RotatingFileHandler
 import os
 
-# Tạo thư mục logs nếu chưa tồn tại
-logs_dir = os.path.join(os.path.dirname(__file__), 'logs')
+# Tạo thư mục logs nếu chưa tồn tại (FLASHCARD_LOG_DIR chọn thư mục khác)
+logs_dir = os.environ.get('FLASHCARD_LOG_DIR', os.path.join(os.path.dirname(__file__), 'logs'))
 os.makedirs(logs_dir, exist_ok=True)
 
 # Cấu hình logging
@@ -96,62 +111,186 @@ app = Flask(__name__,
             static_url_path='/static')
 CORS(app)  # Enable CORS for all routes
 
-# Database configuration
-engine = create_engine('sqlite:///flashcards.db', 
-    connect_args={
-        'timeout': 30,        # Increase SQLite timeout
-        'check_same_thread': False  # Allow multi-threading
-    },
-    pool_recycle=3600,       # Recycle connections after an hour
-    pool_pre_ping=True       # Verify connection before using
-)
+# Encode all JSON responses with the fastest available backend
+app.json_provider_class = FastJSONProvider
+app.json = FastJSONProvider(app)
+
+# Negotiated gzip/brotli compression of large responses; see compression.py
+# for the COMPRESS_* settings and their defaults
+app.config['COMPRESS_MIN_SIZE'] = 1024
+app.config['COMPRESS_GZIP_LEVEL'] = 6
+app.config['COMPRESS_BROTLI_QUALITY'] = 5
+setup_compression(app)
+
+# Database configuration: the process-wide engine from the registry in models.py,
+# tuned with WAL journaling, busy timeout, cache and mmap sizes; see sqlite_config.ini
+engine = get_engine('flashcards.db', schema=DECK_SCHEMA)
 SessionLocal = sessionmaker(bind=engine)
 
+# User accounts; UserModel reuses the registry's engine for its database
+user_model = UserModel()
+
+# GET routes read through a separate read-only engine with its own pool
+read_engine = create_read_only_engine('flashcards.db')
+ReadSessionLocal = sessionmaker(bind=read_engine)
+
 # Configure audio directory
 AUDIO_DIR = Path('static/audio').absolute()
 AUDIO_DIR.mkdir(parents=True, exist_ok=True)
 
-class Card(Base):
-    """Database model for flashcards with spaced repetition"""
-    __tablename__ = 'cards'
-    
-    id = Column(Integer, primary_key=True)
-    word = Column(String(100), nullable=False, index=True, unique=True)
-    meaning = Column(Text, nullable=False)
-    example = Column(Text)
-    ipa = Column(String(100))
-    pos = Column(String(50))  # New column for Part of Speech
-    box_number = Column(Integer, default=0)  # New column
-    last_reviewed = Column(DateTime)         # New column
-    next_review = Column(DateTime)
-    created_at = Column(DateTime, default=datetime.utcnow)
-    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
-    
-    def to_dict(self):
-        """Convert card to dictionary for JSON serialization"""
-        return {
-            'id': self.id,
-            'word': self.word,
-            'meaning': self.meaning,
-            'example': self.example,
-            'ipa': self.ipa,
-            'pos': self.pos,  # Include POS in dictionary
-            'box_number': self.box_number,
-            'last_reviewed': self.last_reviewed.isoformat() if self.last_reviewed else None,
-            'next_review': self.next_review.isoformat() if self.next_review else None,
-            'created_at': self.created_at.isoformat(),
-            'updated_at': self.updated_at.isoformat()
-        }
+# Scheduler used for new reviews; see schedulers.py
+scheduler = get_scheduler()
+
+# Reviews are attributed to this user until the web UI has real sessions
+DEFAULT_USER_ID = 1
+
+# Maximum number of mutations the database writer groups into one transaction
+MAX_WRITE_BATCH = 64
+
+# Dictionary API lookups are cached in memory and in the dictionary_cache table
+DICTIONARY_CACHE_TTL = 30 * 24 * 3600       # Seconds a found word is kept
+DICTIONARY_CACHE_MISS_TTL = 24 * 3600       # Seconds an unknown word is kept
+DICTIONARY_CACHE_MEMORY_ENTRIES = 2048
+
+# Imported words are looked up on this many threads, and each external host
+# gets at most HOST_RATE_LIMIT requests per second
+ENRICH_MAX_WORKERS = 8
+HOST_RATE_LIMIT = 20
+
+# Offline lexicon consulted before the dictionary API; see lexicon.py
+LEXICON_PATH = os.environ.get('FLASHCARD_LEXICON', DEFAULT_LEXICON_PATH)
+
+# YouTube imports run as background jobs on this many threads, and save their
+# progress after every IMPORT_CHUNK_SIZE words
+IMPORT_JOB_WORKERS = 2
+IMPORT_CHUNK_SIZE = 100
+
+# Write-behind settings for the review event log
+REVIEW_FLUSH_INTERVAL_MS = 200
+REVIEW_FLUSH_MAX_EVENTS = 100
+
+# Review forecast horizon limit and cache, keyed by (scheduler, days, date)
+MAX_FORECAST_DAYS = 365
+forecast_cache = {}
+forecast_cache_lock = threading.Lock()
+
+# Maximum number of entries accepted by /api/reviews/batch
+MAX_REVIEW_BATCH = 1000
+
+def schedule_review(box_number, correct, reviewed_at, lapses=0):
+    """Return the new box number and next review date after answering a card"""
+    return scheduler.schedule(box_number, correct, reviewed_at, lapses)
 
-# Spaced repetition intervals (in days) for each box
-BOX_INTERVALS = {
-    0: 0,      # New words (review immediately)
-    1: 1,      # First review after 1 day
-    2: 3,      # Second review after 3 days
-    3: 10,     # Third review after 10 days
-    4: 30,     # Fourth review after 30 days
-    5: 90      # Fifth review after 90 days
-}
+def apply_review(card, correct, reviewed_at, lapses=0):
+    """Move a card between boxes and schedule its next review"""
+    card.last_reviewed = reviewed_at
+    card.box_number, card.next_review = schedule_review(card.box_number, correct, reviewed_at, lapses)
+
+def count_lapses(session, card_ids):
+    """
+    Return {card_id: number of failed reviews} from the review event log.
+    Only queried when the active scheduler depends on lapses.
+    """
+    if not scheduler.uses_lapses or not card_ids:
+        return {}
+    rows = session.execute(
+        text(
+            "SELECT card_id, COUNT(*) FROM review_events "
+            "WHERE outcome = 0 AND card_id IN :card_ids GROUP BY card_id"
+        ).bindparams(bindparam('card_ids', expanding=True)),
+        {'card_ids': list(card_ids)}
+    ).fetchall()
+    return dict(rows)
+
+def parse_client_timestamp(value):
+    """
+    Parse an ISO 8601 timestamp sent by the client into a naive UTC datetime.
+    Returns the current time when no timestamp is given.
+    """
+    if not value:
+        return datetime.utcnow()
+    parsed = datetime.fromisoformat(value.replace('Z', '+00:00'))
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return parsed
+
+# Beyond this many changed cards, /api/cards/changes asks the client to reload instead
+MAX_SYNC_CHANGES = 5000
+
+# Page sizes for /api/cards, /api/cards/due, /api/cards/search and /api/cards/suggest
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 500
+DEFAULT_SEARCH_LIMIT = 20
+DEFAULT_SUGGEST_LIMIT = 10
+MAX_SUGGEST_LIMIT = 50
+
+# Deck snapshot used for the ETag of /api/cards/due: the due set only changes when
+# the deck does or when the next scheduled card comes due, so that moment is
+# cached per deck version instead of being looked up on every request
+due_boundary = {'version': None, 'boundary': None}
+due_boundary_lock = threading.Lock()
+
+# Core read path for card endpoints; see card_reads.py
+card_reader = CardReader()
+
+def parse_card_fields(fields_param):
+    """
+    Parse the `fields=` query parameter into a list of column names.
+    The id column is always included because it doubles as the cursor.
+    """
+    if not fields_param:
+        return list(CARD_COLUMNS)
+
+    fields = ['id']
+    for name in fields_param.split(','):
+        name = name.strip()
+        if not name or name in fields:
+            continue
+        if name not in CARD_COLUMNS:
+            raise ValueError(f"Unknown field: {name}")
+        fields.append(name)
+    return fields
+
+def deck_etag(version, *extra):
+    """
+    Build a strong ETag for a response that only depends on the deck contents
+    (as of deck `version`), the route and the request's query string.
+    While reviews are buffered, the newest one's sequence number is part of
+    the tag too, since card responses overlay them on the stored deck.
+    """
+    query = hashlib.sha1(request.path.encode('utf-8') + b'?' + request.query_string).hexdigest()[:12]
+    pending = review_writer.pending_sequence()
+    if pending is not None:
+        extra += (f'r{pending}',)
+    return '-'.join([f'v{version}', query, *(str(part) for part in extra)])
+
+def not_modified(etag):
+    """Return a 304 response if the request's If-None-Match matches `etag`, else None"""
+    if not request.if_none_match.contains_weak(etag):
+        return None
+    return with_etag(app.response_class(status=304), etag)
+
+def with_etag(response, etag):
+    """Attach `etag` and make browsers revalidate before reusing the response"""
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = 'no-cache'
+    return response
+
+def current_due_boundary(connection, version, now):
+    """
+    Return when the due set next changes on its own (the next card coming due),
+    as an epoch timestamp, or 'none' if no card is scheduled after `now`.
+    """
+    with due_boundary_lock:
+        if due_boundary['version'] == version and (
+                due_boundary['boundary'] is None or now < due_boundary['boundary']):
+            boundary = due_boundary['boundary']
+            return 'none' if boundary is None else int(boundary.timestamp())
+
+    boundary = card_reader.next_due_after(connection, now)
+    with due_boundary_lock:
+        due_boundary['version'], due_boundary['boundary'] = version, boundary
+    return 'none' if boundary is None else int(boundary.timestamp())
 
 @contextmanager
 def session_scope():
@@ -163,29 +302,33 @@ def session_scope():
     except Exception as e:
         session.rollback()
         if isinstance(e, sqlite3.OperationalError) and "database is locked" in str(e):
+            # SQLite already waited busy_timeout_ms for the lock
             logger.warning("Database lock detected, rolling back transaction")
-            time.sleep(0.1)  # Small delay before retrying
         raise
     finally:
         session.close()
 
-def retry_operation(func):
-    """Decorator to retry operations with exponential backoff"""
-    def wrapper(*args, **kwargs):
-        max_attempts = 3
-        attempt = 1
-        while attempt <= max_attempts:
-            try:
-                return func(*args, **kwargs)
-            except Exception as e:
-                if attempt == max_attempts:
-                    logger.error(f"Final attempt failed: {str(e)}")
-                    raise
-                logger.warning(f"Attempt {attempt} failed, retrying...")
-                time.sleep(2 ** attempt)  # Exponential backoff
-                attempt += 1
-    wrapper.__name__ = f"{func.__name__}_retry"  # Give each wrapped function a unique name
-    return wrapper
+@contextmanager
+def read_scope():
+    """Provide a session on the read-only engine; nothing is committed."""
+    session = ReadSessionLocal()
+    try:
+        yield session
+    finally:
+        session.close()
+
+def get_user_session():
+    """Return the user database session of the current request, opened on first use"""
+    if 'user_session' not in g:
+        g.user_session = user_model.SessionLocal()
+    return g.user_session
+
+@app.teardown_appcontext
+def close_user_session(exception=None):
+    """Close the request's user database session; uncommitted changes are rolled back"""
+    session = g.pop('user_session', None)
+    if session is not None:
+        session.close()
 
 def get_youtube_id(url: str) -> Optional[str]:
     """Extract YouTube video ID from URL"""
@@ -235,32 +378,31 @@ def get_word_definition(word):
 
 def get_word_details(word):
     """
-    Fetch word details from a dictionary API with improved robustness
+    Fetch word details from a dictionary API with improved robustness.
+    Words found in the offline lexicon with an IPA and a definition never reach
+    the network; other lookups go through dictionary_cache, so each word is
+    fetched at most once per TTL.
     """
+    entry = lexicon.lookup(word) if lexicon is not None else None
+    if entry is not None and entry.ipa and entry.definition:
+        return entry_details(word, entry)
+
     try:
         # Use Free Dictionary API
-        response = requests.get(f"https://api.dictionaryapi.dev/api/v2/entries/en/{word}")
-        if response.status_code == 200:
-            data = response.json()[0]
+        entries = dictionary_cache.lookup(word)
+        if entries:
+            data = entries[0]
             
-            # Explicit POS prioritization for specific words
-            explicit_pos = {
-                'welcome': 'verb',  # Explicitly set 'welcome' as verb
-                'music': 'noun',
-            }
-            
-            # Check explicit POS first
-            if word.lower() in explicit_pos:
-                pos = explicit_pos[word.lower()]
+            # Extract POS from API response
+            meanings = data.get('meanings', [])
+            if meanings:
+                # Prioritize verb if multiple meanings exist
+                verb_meanings = [m for m in meanings if m['partOfSpeech'] == 'verb']
+                pos = verb_meanings[0]['partOfSpeech'] if verb_meanings else meanings[0]['partOfSpeech']
             else:
-                # Extract POS from API response
-                meanings = data.get('meanings', [])
-                if meanings:
-                    # Prioritize verb if multiple meanings exist
-                    verb_meanings = [m for m in meanings if m['partOfSpeech'] == 'verb']
-                    pos = verb_meanings[0]['partOfSpeech'] if verb_meanings else meanings[0]['partOfSpeech']
-                else:
-                    pos = ''
+                pos = ''
+            # Explicit POS (see lexicon.EXPLICIT_POS) wins
+            pos = explicit_pos(word, pos)
             
             # Extract meaning
             meaning = data['meanings'][0]['definitions'][0]['definition'] if data['meanings'] else "No definition found"
@@ -278,24 +420,19 @@ def get_word_details(word):
                         break
             
             return ipa, meaning, example, pos
+        elif entry is not None:
+            # Incomplete lexicon entry, but still better than nothing
+            return entry_details(word, entry)
         else:
             # Fallback to explicit POS if API fails
-            explicit_pos = {
-                'welcome': 'verb',
-                'music': 'noun',
-            }
-            pos = explicit_pos.get(word.lower(), '')
-            return '', "Definition not found", "No example available", pos
+            return '', "Definition not found", "No example available", explicit_pos(word)
     except Exception as e:
         logger.error(f"Error fetching word details for {word}: {e}")
+        if entry is not None:
+            return entry_details(word, entry)
         
         # Fallback to explicit POS in case of exception
-        explicit_pos = {
-            'welcome': 'verb',
-            'music': 'noun',
-        }
-        pos = explicit_pos.get(word.lower(), '')
-        return '', "Definition not found", "No example available", pos
+        return '', "Definition not found", "No example available", explicit_pos(word)
 
 def infer_pos(word):
     """
@@ -495,15 +632,148 @@ def register():
 
 @app.route('/api/cards')
 def get_cards():
-    """Get all flashcards"""
+    """
+    Get one page of flashcards using keyset pagination.
+    Responses carry an ETag built from the deck version, so an unchanged
+    deck is answered with 304 Not Modified without reading any cards.
+    The version is also returned, for use with /api/cards/changes.
+
+    Query parameters:
+        after_id: Cursor returned as `next_cursor` by the previous page
+        limit: Page size (default DEFAULT_PAGE_SIZE, max MAX_PAGE_SIZE)
+        fields: Comma-separated list of columns to return
+    """
     try:
-        with session_scope() as session:
-            cards = session.query(Card).all()
-            return jsonify([card.to_dict() for card in cards])
+        after_id = request.args.get('after_id', 0, type=int)
+        limit = request.args.get('limit', DEFAULT_PAGE_SIZE, type=int)
+        limit = max(1, min(limit, MAX_PAGE_SIZE))
+
+        try:
+            fields = parse_card_fields(request.args.get('fields'))
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+
+        with read_scope() as session:
+            connection = session.connection()
+            # Read before the cards: a write in between is sent again by /api/cards/changes
+            version = get_deck_version(connection)
+            etag = deck_etag(version)
+            response = not_modified(etag)
+            if response:
+                return response
+
+            # Fetch one extra row to know whether another page exists;
+            # reviews not flushed yet are applied on top
+            cards = review_writer.overlay(card_reader.page(connection, after_id, limit + 1, fields))
+
+            has_more = len(cards) > limit
+            cards = cards[:limit]
+
+            return with_etag(jsonify({
+                'cards': cards,
+                'next_cursor': cards[-1]['id'] if has_more else None,
+                'version': version
+            }), etag)
     except Exception as e:
         logger.error(f"Error in get_cards: {e}", exc_info=True)
         return jsonify({'error': str(e)}), 500
 
+@app.route('/api/cards/changes')
+def get_card_changes():
+    """
+    Get the cards inserted, updated and deleted since a deck version, so a client
+    can keep its copy current without reloading the deck
+
+    Query parameters:
+        since: `version` returned with the client's copy (by /api/cards or a previous call)
+        fields: Comma-separated list of columns to return
+
+    Response:
+        {"version": 42, "cards": [...], "deleted": [3, 7], "full_reload": false}
+        Clients apply `cards` (by id), then `deleted`, then store `version`.
+        `full_reload` is true when there are more than MAX_SYNC_CHANGES changes
+        or `since` does not belong to this deck; the client should reload instead.
+        Buffered reviews are reported once flushed, within REVIEW_FLUSH_INTERVAL_MS.
+    """
+    try:
+        since = request.args.get('since', type=int)
+        if since is None or since < 0:
+            return jsonify({'error': 'since must be a deck version'}), 400
+
+        try:
+            fields = parse_card_fields(request.args.get('fields'))
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+
+        with read_scope() as session:
+            connection = session.connection()
+            version = get_deck_version(connection)
+            if since > version:
+                return jsonify({'version': version, 'cards': [], 'deleted': [], 'full_reload': True})
+            if since == version:
+                return jsonify({'version': version, 'cards': [], 'deleted': [], 'full_reload': False})
+
+            # Range scans on ix_cards_sync_version and ix_card_deletions_version
+            cards = card_reader.changed_since(connection, since, MAX_SYNC_CHANGES + 1, fields)
+            if len(cards) > MAX_SYNC_CHANGES:
+                return jsonify({'version': version, 'cards': [], 'deleted': [], 'full_reload': True})
+            deleted = [row[0] for row in connection.execute(
+                text("SELECT card_id FROM card_deletions WHERE version > :since ORDER BY card_id"),
+                {'since': since}
+            )]
+
+            return jsonify({'version': version, 'cards': cards, 'deleted': deleted, 'full_reload': False})
+    except Exception as e:
+        logger.error(f"Error in get_card_changes: {e}", exc_info=True)
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/cards/search')
+def search_cards():
+    """
+    Full-text search over word, meaning and example, best match first
+
+    Query parameters:
+        q: Search text; every word is matched as a prefix
+        limit: Number of cards to return (default DEFAULT_SEARCH_LIMIT, max MAX_PAGE_SIZE)
+        fields: Comma-separated list of columns to return
+    """
+    try:
+        limit = request.args.get('limit', DEFAULT_SEARCH_LIMIT, type=int)
+        limit = max(1, min(limit, MAX_PAGE_SIZE))
+
+        try:
+            fields = parse_card_fields(request.args.get('fields'))
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+
+        match_query = build_match_query(request.args.get('q', ''))
+        if match_query is None:
+            return jsonify({'cards': []})
+
+        with read_scope() as session:
+            cards = review_writer.overlay(card_reader.search(session.connection(), match_query, limit, fields))
+            return jsonify({'cards': cards})
+    except Exception as e:
+        logger.error(f"Error in search_cards: {e}", exc_info=True)
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/cards/suggest')
+def suggest_words():
+    """
+    Autocomplete card words from the in-memory word index, tolerating typos
+
+    Query parameters:
+        prefix: Text typed so far
+        limit: Number of suggestions (default DEFAULT_SUGGEST_LIMIT, max MAX_SUGGEST_LIMIT)
+    """
+    try:
+        limit = request.args.get('limit', DEFAULT_SUGGEST_LIMIT, type=int)
+        limit = max(1, min(limit, MAX_SUGGEST_LIMIT))
+        return jsonify({'suggestions': word_index.suggest(request.args.get('prefix', ''), limit)})
+    except Exception as e:
+        logger.error(f"Error in suggest_words: {e}", exc_info=True)
+        return jsonify({'error': str(e)}), 500
+
 @app.route('/api/speak/<word>')
 def speak_word(word):
     try:
@@ -533,91 +803,371 @@ def speak_word(word):
         return jsonify({"error": "Failed to generate speech"}), 500
 
 @app.route('/api/cards/<int:card_id>/learned', methods=['POST'])
-@retry_operation
 def mark_learned(card_id: int):
-    """Mark a card as learned"""
+    """
+    Mark a card as learned: it moves to the last box, which the stats count
+    as learned, and comes back after that box's interval
+    """
     try:
-        with session_scope() as session:
+        # Buffered reviews of the card would move it back when flushed later
+        review_writer.flush()
+        now = datetime.utcnow()
+
+        def mark(session):
             card = session.query(Card).get(card_id)
             if not card:
-                abort(404)
-            
-            card.learned = True
-            return jsonify({'success': True})
+                return None
+            lapses = count_lapses(session, [card_id]).get(card_id, 0)
+            card.box_number, card.next_review = schedule_review(MAX_BOX - 1, True, now, lapses)
+            session.flush()
+            return card_reader.get(session.connection(), card_id)
+
+        card_data = db_writer.run(mark)
+        if card_data is None:
+            return jsonify({'error': 'Card not found'}), 404
+        return jsonify({'success': True, 'card': card_data})
     except Exception as e:
         logger.error(f"Error in mark_learned: {e}", exc_info=True)
         return jsonify({'error': str(e)}), 500
 
 @app.route('/api/cards/<int:card_id>/review', methods=['POST'])
 def review_card(card_id: int):
-    """Review a card and update its box number based on the result"""
+    """
+    Review a card and update its box number based on the result.
+    The review is buffered in the review event writer and persisted in the
+    background, so the request never waits on a database write.
+    """
     try:
         data = request.get_json()
         correct = data.get('correct', False)
-        
-        with session_scope() as session:
-            card = session.query(Card).get(card_id)
-            if not card:
-                return jsonify({'error': 'Card not found'}), 404
-                
-            now = datetime.utcnow()
-            card.last_reviewed = now
-            
-            if correct:
-                # Move to next box if answered correctly
-                if card.box_number < 5:
-                    card.box_number += 1
-            else:
-                # Move back to box 1 if answered incorrectly
-                card.box_number = 1
-                
-            # Calculate next review date
-            days = BOX_INTERVALS[card.box_number]
-            card.next_review = now + timedelta(days=days)
-            
-            session.commit()
-            return jsonify(card.to_dict())
+        user_id = data.get('user_id', DEFAULT_USER_ID)
+
+        def load_card(card_id):
+            with read_scope() as session:
+                card_data = card_reader.get(session.connection(), card_id)
+                if not card_data:
+                    return None, 0
+                return card_data, count_lapses(session, [card_id]).get(card_id, 0)
+
+        # Buffered reviews of this card (box and lapses) are applied on top of the stored state
+        card_data = review_writer.review(card_id, user_id, datetime.utcnow(), correct, load_card, schedule_review)
+        if card_data is None:
+            return jsonify({'error': 'Card not found'}), 404
+        return jsonify(card_data)
     except Exception as e:
         logger.error(f"Error in review_card: {e}", exc_info=True)
         return jsonify({'error': str(e)}), 500
 
+@app.route('/api/reviews/batch', methods=['POST'])
+def review_batch():
+    """
+    Apply many queued reviews in a single transaction
+
+    Request body:
+        {"reviews": [{"card_id": 1, "correct": true,
+                      "reviewed_at": "2024-01-01T10:00:00Z",
+                      "client_review_id": "..."}]}
+
+    Entries whose client_review_id was already applied are skipped,
+    so the client can safely resend a batch after a failed flush.
+    """
+    try:
+        data = request.get_json() or {}
+        entries = data.get('reviews')
+        user_id = data.get('user_id', DEFAULT_USER_ID)
+        if not isinstance(entries, list) or not entries:
+            return jsonify({'error': 'reviews must be a non-empty list'}), 400
+        if len(entries) > MAX_REVIEW_BATCH:
+            return jsonify({'error': f'At most {MAX_REVIEW_BATCH} reviews per batch'}), 400
+
+        reviews = []
+        for entry in entries:
+            try:
+                reviews.append({
+                    'card_id': int(entry['card_id']),
+                    'correct': bool(entry.get('correct', False)),
+                    'reviewed_at': parse_client_timestamp(entry.get('reviewed_at')),
+                    'client_review_id': str(entry['client_review_id'])
+                })
+            except (KeyError, TypeError, ValueError) as e:
+                return jsonify({'error': f'Invalid review entry: {entry!r} ({e})'}), 400
+
+        # Apply answers in the order they were given
+        reviews.sort(key=lambda review: review['reviewed_at'])
+
+        # Persist buffered single-card reviews so cards are read in their latest state
+        review_writer.flush()
+
+        def apply_batch(session):
+            review_ids = {review['client_review_id'] for review in reviews}
+            applied_ids = {
+                receipt.client_review_id for receipt in session.query(ReviewReceipt).filter(
+                    ReviewReceipt.client_review_id.in_(review_ids)
+                )
+            }
+            card_ids = {review['card_id'] for review in reviews}
+            cards = {
+                card.id: card for card in session.query(Card).filter(Card.id.in_(card_ids))
+            }
+            lapses = count_lapses(session, card_ids)
+
+            results = []
+            events = []
+            applied = 0
+            for review in reviews:
+                review_id = review['client_review_id']
+                card = cards.get(review['card_id'])
+                if review_id in applied_ids:
+                    status = 'duplicate'
+                elif card is None:
+                    status = 'not_found'
+                else:
+                    old_box = card.box_number or 0
+                    apply_review(card, review['correct'], review['reviewed_at'], lapses.get(card.id, 0))
+                    if not review['correct']:
+                        lapses[card.id] = lapses.get(card.id, 0) + 1
+                    events.append(event_params(
+                        card.id, user_id, review['reviewed_at'], review['correct'], old_box, card.box_number
+                    ))
+                    session.add(ReviewReceipt(client_review_id=review_id, card_id=card.id))
+                    applied_ids.add(review_id)
+                    applied += 1
+                    status = 'applied'
+                results.append({'client_review_id': review_id, 'card_id': review['card_id'], 'status': status})
+
+            if events:
+                session.execute(INSERT_EVENT_SQL, events)
+            session.flush()
+            return {
+                'applied': applied,
+                'results': results,
+                'cards': card_reader.by_ids(session.connection(), list(cards))
+            }
+
+        return jsonify(db_writer.run(apply_batch))
+    except Exception as e:
+        logger.error(f"Error in review_batch: {e}", exc_info=True)
+        return jsonify({'error': str(e)}), 500
+
 @app.route('/api/cards/due')
 def get_due_cards():
-    """Get all cards due for review"""
+    """
+    Get the next cards due for review, most overdue first.
+    The ETag also covers the time the next card comes due, so it changes as
+    soon as the due set would.
+
+    Query parameters:
+        limit: Number of cards to return (default DEFAULT_PAGE_SIZE, max MAX_PAGE_SIZE)
+        cursor: Value of `next_cursor` from the previous page
+    """
     try:
+        limit = request.args.get('limit', DEFAULT_PAGE_SIZE, type=int)
+        limit = max(1, min(limit, MAX_PAGE_SIZE))
+
+        try:
+            cursor = decode_due_cursor(request.args.get('cursor'))
+        except ValueError:
+            return jsonify({'error': 'Invalid cursor'}), 400
+
         now = datetime.utcnow()
-        with session_scope() as session:
-            cards = session.query(Card).filter(
-                (Card.next_review <= now) | (Card.next_review == None)
-            ).all()
-            return jsonify([card.to_dict() for card in cards])
+        with read_scope() as session:
+            connection = session.connection()
+            version = get_deck_version(connection)
+            etag = deck_etag(version, current_due_boundary(connection, version, now))
+            response = not_modified(etag)
+            if response:
+                return response
+
+            # Range scan on ix_cards_next_review_box; next_review is never NULL
+            cards = card_reader.due(connection, now, limit + 1, cursor)
+
+            has_more = len(cards) > limit
+            cards = cards[:limit]
+            next_cursor = encode_due_cursor(cards[-1]) if has_more else None
+
+            # Cards answered since the last flush are no longer due
+            due_before = now.strftime('%Y-%m-%dT%H:%M:%S.%f')
+            cards = [card for card in review_writer.overlay(cards) if card['next_review'] <= due_before]
+
+            return with_etag(jsonify({'cards': cards, 'next_cursor': next_cursor}), etag)
     except Exception as e:
         logger.error(f"Error in get_due_cards: {e}", exc_info=True)
         return jsonify({'error': str(e)}), 500
 
 @app.route('/api/cards/stats')
 def get_box_stats():
-    """Get statistics about cards in each box"""
+    """
+    Get statistics about cards in each box from the trigger-maintained counters.
+    Pass `?recompute=1` to rebuild the counters from the cards table first;
+    otherwise the response is cached by ETag like /api/cards. Buffered reviews
+    are counted once flushed, within REVIEW_FLUSH_INTERVAL_MS.
+    """
     try:
-        with session_scope() as session:
+        recompute = request.args.get('recompute') == '1'
+        if recompute:
+            db_writer.run(rebuild_box_counters)
+        with read_scope() as session:
+            if not recompute:
+                etag = deck_etag(get_deck_version(session))
+                response = not_modified(etag)
+                if response:
+                    return response
+            counters = dict(session.execute(
+                text("SELECT box_number, count FROM box_counters")
+            ).fetchall())
+
             stats = {}
-            total_cards = session.query(Card).count()
+            total_cards = sum(counters.values())
             for box in range(6):
-                count = session.query(Card).filter(Card.box_number == box).count()
+                count = counters.get(box, 0)
                 stats[f'box_{box}'] = {
                     'count': count,
                     'percentage': round((count / total_cards * 100) if total_cards > 0 else 0, 1)
                 }
             stats['total'] = total_cards
-            return jsonify(stats)
+            if recompute:
+                return jsonify(stats)
+            return with_etag(jsonify(stats), etag)
     except Exception as e:
         logger.error(f"Error in get_box_stats: {e}", exc_info=True)
         return jsonify({'error': str(e)}), 500
 
+@app.route('/api/cards/forecast')
+def get_review_forecast():
+    """
+    Get the number of reviews projected to come due on each of the next `days` days
+    (default 30, max MAX_FORECAST_DAYS). Results are cached per deck version;
+    buffered reviews are counted once flushed, within REVIEW_FLUSH_INTERVAL_MS.
+    """
+    try:
+        days = request.args.get('days', 30, type=int)
+        days = max(1, min(days, MAX_FORECAST_DAYS))
+
+        with read_scope() as session:
+            version = get_deck_version(session)
+            today = datetime.utcnow().date()
+            cache_key = (scheduler.name, days, today)
+            with forecast_cache_lock:
+                cached = forecast_cache.get(cache_key)
+            if cached and cached[0] == version:
+                return jsonify(cached[1])
+
+            due = forecast(session.connection(), scheduler, days)
+
+        result = {
+            'days': days,
+            'scheduler': scheduler.name,
+            'forecast': [
+                {'date': (today + timedelta(days=offset)).isoformat(), 'count': int(count)}
+                for offset, count in enumerate(due)
+            ]
+        }
+        with forecast_cache_lock:
+            # Entries from previous days or deck versions are never read again
+            for key in [key for key, entry in forecast_cache.items() if key[2] != today or entry[0] != version]:
+                del forecast_cache[key]
+            forecast_cache[cache_key] = (version, result)
+        return jsonify(result)
+    except Exception as e:
+        logger.error(f"Error in get_review_forecast: {e}", exc_info=True)
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/scheduler')
+def get_scheduler_info():
+    """
+    Describe the active scheduler, so clients can show the result of an
+    answer before it is sent; intervals[box] is in days.
+    """
+    return jsonify({
+        'name': scheduler.name,
+        'uses_lapses': scheduler.uses_lapses,
+        'max_box': MAX_BOX,
+        'intervals': scheduler.box_intervals()
+    })
+
+@app.route('/api/dictionary/cache')
+def get_dictionary_cache_stats():
+    """Get hit/miss counters of the dictionary lookup cache"""
+    return jsonify(dictionary_cache.stats())
+
+@app.route('/api/http/stats')
+def get_http_stats():
+    """Get latency, retry and connection pool counters of outbound HTTP calls, per host"""
+    return jsonify(get_http_client().stats())
+
+def fetch_transcript(video_id):
+    """Get the transcript of a video, trying several languages"""
+    for lang in ['en', 'vi', 'auto']:
+        try:
+            return YouTubeTranscriptApi.get_transcript(video_id, languages=[lang])
+        except Exception as e:
+            logger.warning(f"Couldn't get transcript in {lang}: {e}")
+    return None
+
+def build_import_cards(words):
+    """Look up imported words and return the card dicts worth writing"""
+    # Find which words already exist and which of those still lack a meaning
+    with read_scope() as session:
+        existing = dict(session.query(Card.word, Card.meaning).filter(Card.word.in_(words)))
+
+    # Existing cards are only filled in while they have no meaning
+    lookup_words = [
+        word for word in words
+        if word not in existing or existing[word] == PLACEHOLDER_MEANING
+    ]
+
+    # Dictionary lookups run concurrently before anything is written, never inside a transaction
+    details = enrich_words(lookup_words, get_word_details, max_workers=ENRICH_MAX_WORKERS)
+
+    cards = []
+    for word, (ipa, meaning, example, pos) in details.items():
+        # New cards need an IPA, existing ones a meaning
+        if (meaning if word in existing else ipa):
+            cards.append({
+                'word': word,
+                'meaning': meaning or PLACEHOLDER_MEANING,
+                'ipa': ipa,
+                'example': str(example) if example else "To be added",
+                'pos': pos
+            })
+    return cards
+
+def run_youtube_import(job):
+    """
+    Import job: fetch the transcript, then look up and write the words in
+    chunks. The word list and each chunk's progress are saved with the job,
+    so a resumed job skips the transcript and the chunks already written.
+    """
+    if job.state is None:
+        job.update(stage='transcript')
+        transcript = fetch_transcript(job.params['video_id'])
+        if not transcript:
+            raise ValueError('No transcript available in any language')
+        words = extract_words_from_transcript(transcript)
+        job.update(stage='enrichment', state={'words': words}, total=len(words))
+
+    words = job.state['words']
+    for start in range(job.processed, len(words), IMPORT_CHUNK_SIZE):
+        chunk = words[start:start + IMPORT_CHUNK_SIZE]
+        cards = build_import_cards(chunk)
+        added, updated = job.added, job.updated
+
+        def save_chunk(session):
+            # The cards and the job's progress commit together
+            result = upsert_cards(session.connection().connection, cards)
+            record_word_changes(session, [('add', word) for word in result.new_words])
+            job.save(
+                session,
+                processed=start + len(chunk),
+                added=added + result.inserted,
+                updated=updated + result.updated
+            )
+
+        db_writer.run(save_chunk)
+
 @app.route('/api/import-youtube', methods=['POST'])
-@retry_operation
 def import_youtube():
-    """Import words from YouTube video subtitles"""
+    """Start importing words from YouTube video subtitles; poll /api/jobs/<id> for progress"""
     try:
         data = request.get_json()
         if not data or 'url' not in data:
@@ -627,89 +1177,32 @@ def import_youtube():
         video_id = get_youtube_id(url)
         if not video_id:
             return jsonify({'error': 'Invalid YouTube URL'}), 400
-        
-        # Try getting transcript in multiple languages
-        languages_to_try = ['en', 'vi', 'auto']
-        transcript = None
-        
-        for lang in languages_to_try:
-            try:
-                transcript = YouTubeTranscriptApi.get_transcript(video_id, languages=[lang])
-                break
-            except Exception as e:
-                logger.warning(f"Couldn't get transcript in {lang}: {e}")
-        
-        if not transcript:
-            return jsonify({'error': 'No transcript available in any language'}), 400
-        
-        # Extract words from transcript
-        words: Set[str] = set()
-        words = extract_words_from_transcript(transcript)
-        
-        words_added = 0
-        words_updated = 0
-        batch_size = 10  # Smaller batch size for better lock handling
-        
-        # Process words in smaller transactions
-        for i in range(0, len(words), batch_size):
-            word_batch = words[i:i + batch_size]
-            with session_scope() as session:
-                # Disable autoflush to prevent premature constraint checks
-                with session.no_autoflush:
-                    for word in word_batch:
-                        try:
-                            # Check if word exists
-                            existing_card = session.query(Card).filter_by(word=word).first()
-                             
-                            if existing_card:
-                                # Update existing card if it has no meaning
-                                if existing_card.meaning == "To be defined":
-                                    ipa, meaning, example, pos = get_word_details(word)
-                                    if meaning:
-                                        existing_card.meaning = meaning
-                                        existing_card.ipa = ipa
-                                        existing_card.example = str(example) if example else "To be added"
-                                        existing_card.pos = pos
-                                        words_updated += 1
-                                continue
-                             
-                            # Get word details from dictionary API
-                            ipa, meaning, example, pos = get_word_details(word)
-                             
-                            # Only add card if IPA is available
-                            if ipa:
-                                # Create new card
-                                card = Card(
-                                    word=word,
-                                    meaning=meaning or "To be defined",
-                                    ipa=ipa,
-                                    example=str(example) if example else "To be added",
-                                    pos=pos
-                                )
-                                session.merge(card)  # Use merge instead of add
-                                words_added += 1
-                             
-                        except Exception as e:
-                            logger.error(f"Error processing word '{word}': {str(e)}")
-                            continue
-                
-                # Commit each batch
-                try:
-                    session.flush()
-                except Exception as e:
-                    logger.error(f"Error flushing batch: {str(e)}")
-                    session.rollback()
-                    continue
-                
+
+        job_id = job_manager.submit('youtube_import', {'url': url, 'video_id': video_id})
+        logger.info(f"Queued YouTube import job {job_id} for video {video_id}")
+
         return jsonify({
-            'success': True, 
-            'words_added': words_added
-        })
+            'success': True,
+            'job_id': job_id,
+            'status_url': f'/api/jobs/{job_id}'
+        }), 202
         
     except Exception as e:
         logger.error(f"Error importing from YouTube: {str(e)}")
         return jsonify({'error': str(e)}), 400
 
+@app.route('/api/jobs/<job_id>')
+def get_job(job_id):
+    """Stage, counts and ETA of a background job"""
+    try:
+        job = job_manager.get(job_id)
+        if job is None:
+            return jsonify({'error': 'Job not found'}), 404
+        return jsonify(job)
+    except Exception as e:
+        logger.error(f"Error getting job {job_id}: {str(e)}")
+        return jsonify({'error': str(e)}), 500
+
 @app.route('/api/youtube/import', methods=['POST'])
 def import_youtube_words():
     try:
@@ -730,24 +1223,29 @@ def import_youtube_words():
         words = extract_words_from_transcript(transcript)
         
         # Import words to database
-        imported_count = 0
+        candidates = words[:20]  # Limit to 20 words
         with session_scope() as session:
-            for word in words[:20]:  # Limit to 20 words
-                # Check if word already exists
-                existing_card = session.query(Card).filter_by(word=word).first()
-                if not existing_card:
-                    new_card = Card(
-                        word=word,
-                        meaning=get_word_definition(word),
-                        example=f'From YouTube video: {youtube_url}',
-                        box_number=0,
-                        next_review=datetime.utcnow(),
-                        pos=infer_pos(word)
-                    )
-                    session.add(new_card)
-                    imported_count += 1
-            
-            session.commit()
+            existing = {word for word, in session.query(Card.word).filter(Card.word.in_(candidates))}
+
+        # Look up definitions before handing the inserts to the database writer
+        new_cards = [
+            {
+                'word': word,
+                'meaning': get_word_definition(word),
+                'example': f'From YouTube video: {youtube_url}',
+                'box_number': 0,
+                'next_review': datetime.utcnow(),
+                'pos': infer_pos(word)
+            }
+            for word in candidates if word not in existing
+        ]
+
+        def add_cards(session):
+            result = upsert_cards(session.connection().connection, new_cards)
+            record_word_changes(session, [('add', word) for word in result.new_words])
+            return result.inserted
+
+        imported_count = db_writer.run(add_cards)
         
         return jsonify({
             'imported': imported_count,
@@ -762,26 +1260,23 @@ def import_youtube_words():
 def cleanup_incomplete_cards():
     """Remove cards without IPA transcription"""
     try:
-        with session_scope() as session:
+        def delete_incomplete(session):
             # Find and delete cards without IPA
             incomplete_cards = session.query(Card).filter(
                 (Card.ipa == '') | (Card.ipa == None)
             ).all()
             
-            # Count the number of cards to be deleted
-            cards_to_delete_count = len(incomplete_cards)
-            
             # Delete the incomplete cards
             for card in incomplete_cards:
                 session.delete(card)
             
-            # Commit the changes
-            session.commit()
-            
-            return jsonify({
-                'success': True, 
-                'cards_removed': cards_to_delete_count
-            })
+            # Count the number of cards deleted
+            return len(incomplete_cards)
+
+        return jsonify({
+            'success': True, 
+            'cards_removed': db_writer.run(delete_incomplete)
+        })
     except Exception as e:
         logger.error(f"Error cleaning up incomplete cards: {str(e)}")
         return jsonify({'error': str(e)}), 400
@@ -790,27 +1285,28 @@ def cleanup_incomplete_cards():
 def update_card_ipa():
     """Update IPA for existing cards"""
     try:
+        # Find cards without IPA
         with session_scope() as session:
-            # Find cards without IPA
-            cards_without_ipa = session.query(Card).filter(
+            words_without_ipa = [word for word, in session.query(Card.word).filter(
                 (Card.ipa == '') | (Card.ipa == None)
-            ).all()
-            
-            updated_count = 0
-            for card in cards_without_ipa:
-                # Try to fetch IPA for the word
-                ipa, _, _, _ = get_word_details(card.word)
-                
-                if ipa:
-                    card.ipa = ipa
-                    updated_count += 1
-            
-            session.commit()
-            
-            return jsonify({
-                'success': True, 
-                'cards_updated': updated_count
-            })
+            )]
+
+        # Try to fetch IPA for each word concurrently, outside of any transaction
+        details = enrich_words(words_without_ipa, get_word_details, max_workers=ENRICH_MAX_WORKERS)
+        ipas = {word: detail[0] for word, detail in details.items() if detail[0]}
+
+        def save_ipas(session):
+            updated = 0
+            for card in session.query(Card).filter(Card.word.in_(list(ipas))):
+                if not card.ipa:
+                    card.ipa = ipas[card.word]
+                    updated += 1
+            return updated
+
+        return jsonify({
+            'success': True, 
+            'cards_updated': db_writer.run(save_ipas)
+        })
     except Exception as e:
         logger.error(f"Error updating card IPAs: {str(e)}")
         return jsonify({'error': str(e)}), 400
@@ -823,22 +1319,20 @@ def remove_incomplete_cards():
         int: Number of cards removed
     """
     try:
-        with session_scope() as session:
+        def delete_incomplete(session):
             # Find and delete cards without IPA
             incomplete_cards = session.query(Card).filter(
                 (Card.ipa == '') | (Card.ipa == None)
             ).all()
             
-            # Count and log the number of cards to be deleted
-            cards_to_delete_count = len(incomplete_cards)
-            logger.info(f"Removing {cards_to_delete_count} cards without IPA")
-            
             # Delete the incomplete cards
             for card in incomplete_cards:
-                logger.info(f"Removing card: {card.word}")
                 session.delete(card)
-            
-            return cards_to_delete_count
+            return [card.word for card in incomplete_cards]
+
+        removed_words = db_writer.run(delete_incomplete)
+        logger.info(f"Removed {len(removed_words)} cards without IPA: {', '.join(removed_words)}")
+        return len(removed_words)
     except Exception as e:
         logger.error(f"Error removing incomplete cards: {str(e)}")
         return 0
@@ -866,11 +1360,22 @@ def reset_database():
     """
     try:
         # Drop all existing tables
-        Base.metadata.drop_all(engine)
+        review_writer.flush()
+        with engine.begin() as connection:
+            # Log every card as deleted so synced clients drop them
+            connection.execute(text("DELETE FROM cards"))
+        Base.metadata.drop_all(engine, tables=SCHEMA_TABLES[DECK_SCHEMA])
+        with engine.begin() as connection:
+            connection.execute(text("DROP TABLE IF EXISTS box_counters"))
+            connection.execute(text("DROP TABLE IF EXISTS review_events"))
+            connection.execute(text("DROP TABLE IF EXISTS cards_fts"))
+            connection.execute(text("PRAGMA user_version = 0"))
         logger.info("Existing database tables dropped")
-        
-        # Recreate all tables
-        Base.metadata.create_all(engine)
+
+        # Recreate all tables by running every migration again
+        run_migrations(engine)
+        with engine.connect() as connection:
+            word_index.load(connection)
         logger.info("Database tables recreated")
         
         # Initialize with sample words
@@ -933,63 +1438,52 @@ def reset_database():
         logger.error(f"Error resetting database: {e}")
         return False
 
-def add_pos_column_if_not_exists(engine):
-    """
-    Check if 'pos' column exists in cards table, add if not present.
-    This ensures backward compatibility during database migration.
-    """
-    try:
-        inspector = inspect(engine)
-        columns = [col['name'] for col in inspector.get_columns('cards')]
-        
-        if 'pos' not in columns:
-            print("Adding 'pos' column to cards table...")
-            with engine.begin() as connection:
-                connection.execute(f"ALTER TABLE cards ADD COLUMN pos VARCHAR(50)")
-            print("'pos' column added successfully!")
-    except Exception as e:
-        print(f"Error checking/adding 'pos' column: {e}")
+def get_deck_version(connection):
+    """Return the current deck data version"""
+    return connection.execute(text("SELECT version FROM deck_version WHERE id = 1")).scalar() or 0
 
-def add_updated_at_column_if_not_exists(engine):
-    """
-    Check if 'updated_at' column exists in users table, add if not present.
-    This ensures backward compatibility during database migration.
-    """
-    try:
-        # Kết nối trực tiếp với SQLite
-        conn = engine.connect()
-        
-        # Kiểm tra xem cột đã tồn tại chưa
-        try:
-            conn.execute(text("SELECT updated_at FROM users LIMIT 1"))
-            logger.info("'updated_at' column already exists")
-            return
-        except Exception:
-            # Nếu cột chưa tồn tại, thêm cột
-            conn.execute(text('''
-                ALTER TABLE users 
-                ADD COLUMN updated_at DATETIME
-            '''))
-            
-            # Cập nhật giá trị mặc định cho cột
-            conn.execute(text('''
-                UPDATE users 
-                SET updated_at = created_at
-            '''))
-            
-            logger.info("Added 'updated_at' column to users table")
-    except Exception as e:
-        logger.error(f"Error adding 'updated_at' column: {e}")
-    finally:
-        if 'conn' in locals():
-            conn.close()
+# Autocomplete index of card words, kept in sync with committed ORM sessions
+word_index = WordIndex()
+track_card_changes(SessionLocal, word_index)
+with engine.connect() as connection:
+    word_index.load(connection)
+
+# Single writer thread for all database mutations; see db_writer.py
+db_writer = DatabaseWriter(engine, max_batch=MAX_WRITE_BATCH)
+track_card_changes(db_writer.session_factory, word_index)
 
-add_updated_at_column_if_not_exists(engine)
+review_writer = ReviewEventWriter(
+    db_writer,
+    flush_interval_ms=REVIEW_FLUSH_INTERVAL_MS,
+    max_events=REVIEW_FLUSH_MAX_EVENTS
+)
+
+# Memory-mapped word list checked before the dictionary API; None when not built
+lexicon = open_lexicon(LEXICON_PATH)
+
+# Reads go through the read-only engine, new entries through the database writer
+host_rate_limiter = HostRateLimiter(HOST_RATE_LIMIT)
+dictionary_cache = DictionaryCache(
+    read_engine,
+    writer=db_writer,
+    fetch=lambda word: fetch_dictionary_entry(word, limiter=host_rate_limiter),
+    ttl=DICTIONARY_CACHE_TTL,
+    miss_ttl=DICTIONARY_CACHE_MISS_TTL,
+    memory_entries=DICTIONARY_CACHE_MEMORY_ENTRIES
+)
+
+# Background imports; see jobs.py
+job_manager = JobManager(read_engine, db_writer, workers=IMPORT_JOB_WORKERS)
+job_manager.register('youtube_import', run_youtube_import)
+
+@app.before_request
+def resume_jobs():
+    # Whichever server runs the app (app.run, flask run, a WSGI server), the process
+    # answering requests picks up unfinished imports. The debug reloader's watcher
+    # process never serves a request, so it never runs them twice.
+    job_manager.resume()
 
 def init_db():
-    # Khởi tạo UserModel
-    user_model = UserModel()
-    
     # Tạo session
     session = user_model._get_connection()
     
@@ -1114,27 +1608,9 @@ def create_test_user_if_not_exists(session):
 
 @app.route('/user_profile')
 def user_profile():
-    # Khởi tạo UserModel
-    user_model = UserModel()
-    
     try:
-        # Kết nối và truy vấn thông tin người dùng
-        session = user_model._get_connection()
-        
-        # Kiểm tra và thêm cột nếu chưa tồn tại
-        try:
-            session.execute(text("SELECT updated_at FROM users LIMIT 1"))
-        except Exception:
-            # Nếu cột chưa tồn tại, thêm cột
-            session.execute(text('''
-                ALTER TABLE users 
-                ADD COLUMN updated_at DATETIME
-            '''))
-            session.execute(text('''
-                UPDATE users 
-                SET updated_at = created_at
-            '''))
-            session.commit()
+        # Session của request, đóng trong teardown
+        session = get_user_session()
         
         # Tạo người dùng mẫu nếu không tồn tại
         user = create_test_user_if_not_exists(session)
@@ -1175,7 +1651,7 @@ def user_profile():
                     'name': achievement.achievement_name,
                     'description': achievement.achievement_description,
                     'points': achievement.points,
-                    'date': str(achievement.date_earned)
+                    'date': achievement.date_earned
                 } for achievement in achievements
             ]
         }
@@ -1189,9 +1665,6 @@ def user_profile():
             'error': True,
             'message': f"Lỗi hệ thống: {str(e)}"
         }), 500
-    finally:
-        if 'session' in locals():
-            session.close()
 
 import os
 from werkzeug.utils import secure_filename
@@ -1227,8 +1700,7 @@ def upload_avatar():
             file.save(filepath)
             
             # Cập nhật đường dẫn avatar trong database
-            user_model = UserModel()
-            session = user_model._get_connection()
+            session = get_user_session()
             
             user = session.query(User).filter(User.id == user_id).first()
             if user:
@@ -1263,8 +1735,7 @@ def update_profile():
         
         # Lấy user hiện tại
         user_id = 1  # Tạm thởi hardcode
-        user_model = UserModel()
-        session = user_model._get_connection()
+        session = get_user_session()
         
         user = session.query(User).filter(User.id == user_id).first()
         
@@ -1331,6 +1802,15 @@ if __name__ == '__main__':
         if '--cleanup-cards' in sys.argv:
             cleanup_cards_cli()
         
+        # Recompute next_review for the whole deck with another scheduler
+        if '--reschedule' in sys.argv:
+            arg_index = sys.argv.index('--reschedule') + 1
+            target = get_scheduler(sys.argv[arg_index] if arg_index < len(sys.argv) else None)
+            review_writer.flush()
+            count = reschedule(engine, target)
+            print(f"Rescheduled {count} cards. Set FLASHCARD_SCHEDULER={target.name} to keep using it.")
+            sys.exit(0)
+        
         # Check if reset flag is passed
         if '--reset-db' in sys.argv:
             reset_database()
@@ -1362,9 +1842,15 @@ if __name__ == '__main__':
             except Exception as ngrok_error:
                 print(f"Failed to start ngrok tunnel: {ngrok_error}")
         
+        # Resume unfinished imports at startup, without waiting for the first request.
+        # With the reloader this script runs twice; the watcher process must not.
+        debug = True
+        if is_running_from_reloader() or not debug:
+            job_manager.resume()
+        
         # Run the app directly
         print("Starting Flask application...")
-        app.run(host='0.0.0.0', port=5000, debug=True)
+        app.run(host='0.0.0.0', port=5000, debug=debug)
     
     except Exception as e:
         print("An error occurred while starting the application:")
@@ -0,0 +1,56 @@
+"""
+Helpers shared by the benchmarks: a synthetic deck and best-of-N timers.
+Benchmarks add the app directory to sys.path before importing this module.
+"""
+import time
+from datetime import datetime, timedelta
+
+from models import Card
+from migrations import run_migrations
+
+def card_rows(size, now=None):
+    """Column values for `size` synthetic cards spread over every box and review date"""
+    now = now or datetime.utcnow()
+    return [
+        {
+            'word': f'word{i}',
+            'meaning': f'meaning of word {i}',
+            'example': f'An example sentence using word{i}.',
+            'ipa': '/wɜːd/',
+            'pos': 'noun',
+            'box_number': i % 6,
+            'last_reviewed': now - timedelta(days=i % 30),
+            'next_review': now + timedelta(days=(i % 60) - 30),
+            'created_at': now,
+            'updated_at': now
+        }
+        for i in range(size)
+    ]
+
+def build_deck(engine, rows):
+    """
+    Migrate a fresh database to the current schema, as the app does on start,
+    and insert the card `rows`
+    """
+    run_migrations(engine)
+    with engine.begin() as connection:
+        connection.execute(Card.__table__.insert(), rows)
+
+def time_best(func, repeat=5):
+    """Return the best wall time of `repeat` runs"""
+    best = float('inf')
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+def time_per_query(func, queries, repeat=3):
+    """Return the best average wall time per query over `repeat` runs"""
+    best = float('inf')
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for query in queries:
+            func(query)
+        best = min(best, (time.perf_counter() - started) / len(queries))
+    return best
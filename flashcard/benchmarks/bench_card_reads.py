@@ -0,0 +1,50 @@
+"""
+Micro-benchmark: card reads through the ORM (query(Card) + to_dict)
+versus the Core read path in card_reads.py.
+
+Usage:
+    python benchmarks/bench_card_reads.py [deck sizes...]
+"""
+import sys
+import os
+import tempfile
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from models import Card
+from card_reads import CardReader
+from _common import card_rows, build_deck, time_best
+
+def run(size):
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(f"sqlite:///{os.path.join(tmp, 'bench.db')}")
+        build_deck(engine, card_rows(size))
+        Session = sessionmaker(bind=engine)
+        reader = CardReader()
+
+        def orm_path():
+            session = Session()
+            try:
+                return [card.to_dict() for card in session.query(Card).all()]
+            finally:
+                session.close()
+
+        def core_path():
+            with engine.connect() as connection:
+                return reader.page(connection, 0, size)
+
+        assert len(orm_path()) == len(core_path()) == size
+        orm_time = time_best(orm_path)
+        core_time = time_best(core_path)
+        engine.dispose()
+
+    print(f"{size:>8} cards | ORM {size / orm_time:>12,.0f} rows/s | "
+          f"Core {size / core_time:>12,.0f} rows/s | speedup {orm_time / core_time:.1f}x")
+
+if __name__ == '__main__':
+    sizes = [int(arg) for arg in sys.argv[1:]] or [10000, 100000]
+    for size in sizes:
+        run(size)
@@ -0,0 +1,73 @@
+"""
+Micro-benchmark: /api/cards/search queries against the cards_fts index
+versus a LIKE scan over word, meaning and example.
+
+Usage:
+    python benchmarks/bench_card_search.py [deck sizes...]
+"""
+import sys
+import os
+import random
+import tempfile
+from datetime import datetime
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine, text
+
+from card_reads import CardReader
+from card_search import build_match_query
+from _common import build_deck, time_per_query
+
+LETTERS = 'abcdefghijklmnopqrstuvwxyz'
+
+def make_word(rng):
+    return ''.join(rng.choice(LETTERS) for _ in range(rng.randint(4, 10)))
+
+def make_rows(size):
+    """`size` cards with random words, so searches hit a realistic spread of terms"""
+    rng = random.Random(42)
+    now = datetime.utcnow()
+    rows = []
+    for i in range(size):
+        word = f'{make_word(rng)}{i}'  # keep words unique
+        rows.append({
+            'word': word,
+            'meaning': f'{make_word(rng)} {make_word(rng)}',
+            'example': f'The {make_word(rng)} used {word} near the {make_word(rng)}.',
+            'box_number': 0,
+            'next_review': now,
+            'created_at': now,
+            'updated_at': now
+        })
+    return rows
+
+def run(size):
+    rng = random.Random(7)
+    queries = [make_word(rng)[:rng.randint(3, 6)] for _ in range(50)]
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(f"sqlite:///{os.path.join(tmp, 'bench.db')}")
+        build_deck(engine, make_rows(size))
+        reader = CardReader()
+
+        with engine.connect() as connection:
+            def fts_search(query):
+                return reader.search(connection, build_match_query(query), 20)
+
+            def like_search(query):
+                pattern = f'%{query}%'
+                return connection.execute(text(
+                    "SELECT * FROM cards WHERE word LIKE :p OR meaning LIKE :p OR example LIKE :p LIMIT 20"
+                ), {'p': pattern}).fetchall()
+
+            fts_time = time_per_query(fts_search, queries)
+            like_time = time_per_query(like_search, queries)
+        engine.dispose()
+
+    print(f"{size:>8} cards | FTS5 {fts_time * 1000:>7.2f} ms/query | "
+          f"LIKE {like_time * 1000:>7.2f} ms/query")
+
+if __name__ == '__main__':
+    sizes = [int(arg) for arg in sys.argv[1:]] or [10000, 100000]
+    for size in sizes:
+        run(size)
@@ -0,0 +1,48 @@
+"""
+Benchmark: enriching an imported transcript with dictionary lookups, serially
+versus on the bounded thread pool from enrichment.py (with and without the
+per-host rate limit). The API is simulated by a lookup that sleeps for a
+fixed latency, so the numbers do not depend on the network.
+
+Usage:
+    python benchmarks/bench_enrichment.py [words] [latency_ms] [rate_per_second]
+"""
+import sys
+import os
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from enrichment import HostRateLimiter, enrich_words
+
+API_URL = 'https://api.dictionaryapi.dev/api/v2/entries/en/{word}'
+
+def make_lookup(latency, limiter=None):
+    """Simulated dictionary lookup; like HttpClient, it waits for `limiter` before each request"""
+    def lookup(word):
+        if limiter is not None:
+            limiter.wait(API_URL.format(word=word))
+        time.sleep(latency)
+        return ('', word, '', '')
+    return lookup
+
+def timed(label, func, words):
+    start = time.perf_counter()
+    results = func(words)
+    elapsed = time.perf_counter() - start
+    assert len(results) == len(words)
+    print(f"{label:<28} {elapsed:>7.2f}s  ({len(words) / elapsed:>7.1f} words/s)")
+
+if __name__ == '__main__':
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 400
+    latency = (float(sys.argv[2]) if len(sys.argv) > 2 else 50) / 1000
+    rate = float(sys.argv[3]) if len(sys.argv) > 3 else 100
+    words = [f'word{i}' for i in range(count)]
+    lookup = make_lookup(latency)
+
+    print(f"{count} words, {latency * 1000:.0f} ms per lookup")
+    timed('serial', lambda ws: {word: lookup(word) for word in ws}, words)
+    for workers in (4, 8, 16):
+        timed(f'{workers} workers', lambda ws: enrich_words(ws, lookup, max_workers=workers), words)
+    limited = make_lookup(latency, HostRateLimiter(rate))
+    timed(f'16 workers, {rate:.0f} req/s limit', lambda ws: enrich_words(ws, limited, max_workers=16), words)
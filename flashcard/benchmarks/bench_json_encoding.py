@@ -0,0 +1,57 @@
+"""
+Micro-benchmark: encoding a full card list with Flask's stdlib JSON provider
+(pretty-printed as in debug mode, and compact) versus FastJSONProvider.
+
+Usage:
+    python benchmarks/bench_json_encoding.py [deck sizes...]
+"""
+import sys
+import os
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask import Flask
+from flask.json.provider import DefaultJSONProvider
+
+from json_encoding import FastJSONProvider, ORJSON_AVAILABLE
+from _common import card_rows, time_best
+
+def build_cards(size):
+    """Card dictionaries as returned by Card.to_dict, with datetime values"""
+    return [dict(row, id=i, meaning=f'nghĩa của từ {i}') for i, row in enumerate(card_rows(size))]
+
+# Providers only keep a weak reference to their app
+app = Flask(__name__)
+
+def make_provider(provider_class, **attributes):
+    provider = provider_class(app)
+    for name, value in attributes.items():
+        setattr(provider, name, value)
+    return provider
+
+def run(size):
+    cards = build_cards(size)
+    payload = {'cards': cards, 'next_cursor': None}
+    providers = [
+        ('stdlib indented', make_provider(DefaultJSONProvider, compact=False)),
+        ('stdlib compact', make_provider(FastJSONProvider, backend='stdlib')),
+    ]
+    if ORJSON_AVAILABLE:
+        providers.append(('orjson', make_provider(FastJSONProvider, backend='orjson')))
+
+    print(f"{size} cards")
+    baseline = None
+    for label, provider in providers:
+        with app.app_context():
+            body = provider.response(payload).get_data()
+            elapsed = time_best(lambda: provider.response(payload))
+        baseline = baseline or elapsed
+        print(f"  {label:<16} {elapsed * 1000:>8.1f} ms | {len(body) / 1024:>8.0f} KiB | "
+              f"speedup {baseline / elapsed:.1f}x")
+
+if __name__ == '__main__':
+    if not ORJSON_AVAILABLE:
+        print("orjson is not installed, only the stdlib backend is measured")
+    sizes = [int(arg) for arg in sys.argv[1:]] or [10000, 100000]
+    for size in sizes:
+        run(size)
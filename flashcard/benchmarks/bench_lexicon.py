@@ -0,0 +1,60 @@
+"""
+Benchmark: word lookups in the memory-mapped lexicon file. A synthetic
+lexicon is written to a temporary directory, then looked up for words it
+contains and words it does not, and compared with a plain dict of the same
+entries.
+
+Usage:
+    python benchmarks/bench_lexicon.py [words] [lookups]
+"""
+import sys
+import os
+import random
+import tempfile
+import time
+import tracemalloc
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from lexicon import Lexicon, write_lexicon
+
+def make_entries(count):
+    return [
+        (f'word{i:07d}', f'/wɜːd{i}/', 'noun', f'Definition number {i} of a synthetic word.', f'An example using word{i}.')
+        for i in range(count)
+    ]
+
+def timed(label, lookup, words):
+    start = time.perf_counter()
+    for word in words:
+        lookup(word)
+    elapsed = time.perf_counter() - start
+    print(f"{label:<24} {elapsed / len(words) * 1e6:>7.2f} µs per lookup")
+
+if __name__ == '__main__':
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 200000
+    lookups = int(sys.argv[2]) if len(sys.argv) > 2 else 100000
+    entries = make_entries(count)
+    hits = [random.choice(entries)[0] for _ in range(lookups)]
+    misses = [f'missing{i}' for i in range(lookups)]
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'lexicon.bin')
+        start = time.perf_counter()
+        write_lexicon(entries, path)
+        print(f"{count} words, built in {time.perf_counter() - start:.2f}s, {os.path.getsize(path) / 1e6:.1f} MB on disk")
+
+        tracemalloc.start()
+        lexicon = Lexicon(path)
+        print(f"Python heap after opening: {tracemalloc.get_traced_memory()[0] / 1e3:.1f} kB")
+        tracemalloc.stop()
+
+        timed('mmap lexicon, hits', lexicon.lookup, hits)
+        timed('mmap lexicon, misses', lexicon.lookup, misses)
+        lexicon.close()
+
+    tracemalloc.start()
+    table = {word: fields for word, *fields in entries}
+    print(f"Python heap for a dict of the same entries: {tracemalloc.get_traced_memory()[0] / 1e6:.1f} MB")
+    tracemalloc.stop()
+    timed('dict, hits', table.get, hits)
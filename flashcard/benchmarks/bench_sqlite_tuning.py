@@ -0,0 +1,105 @@
+"""
+Benchmark: concurrent review throughput with the previous engine settings
+(rollback journal, synchronous=FULL, 30s timeout) versus the tuned connection
+settings from sqlite_tuning.py.
+
+Writer threads record reviews one transaction at a time (card update plus
+review event) while reader threads page through the deck, as the web app does.
+
+Usage:
+    python benchmarks/bench_sqlite_tuning.py [seconds] [writers] [readers]
+"""
+import sys
+import os
+import time
+import random
+import tempfile
+import threading
+from datetime import datetime, timedelta
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine
+
+from card_reads import CardReader
+from review_log import event_params, INSERT_EVENT_SQL, UPDATE_CARD_SQL
+from sqlite_tuning import install_sqlite_tuning, get_sqlite_settings
+from _common import build_deck
+
+DECK_SIZE = 5000
+
+def build_engine(path, tuned):
+    if tuned:
+        engine = create_engine(f"sqlite:///{path}", connect_args={'check_same_thread': False})
+        return install_sqlite_tuning(engine)
+    return create_engine(f"sqlite:///{path}", connect_args={'timeout': 30, 'check_same_thread': False})
+
+def run(tuned, seconds, writers, readers):
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = build_engine(os.path.join(tmp, 'bench.db'), tuned)
+        now = datetime.utcnow()
+        build_deck(engine, [
+            {'word': f'word{i}', 'meaning': f'meaning {i}', 'example': f'Example {i}.',
+             'box_number': 0, 'next_review': now, 'created_at': now, 'updated_at': now}
+            for i in range(DECK_SIZE)
+        ])
+        reader = CardReader()
+        stop = threading.Event()
+        counts = {'reviews': 0, 'reads': 0, 'errors': 0}
+        lock = threading.Lock()
+
+        def write_loop(seed):
+            rng = random.Random(seed)
+            done = errors = 0
+            while not stop.is_set():
+                card_id = rng.randint(1, DECK_SIZE)
+                now = datetime.utcnow()
+                try:
+                    with engine.begin() as connection:
+                        connection.execute(INSERT_EVENT_SQL, [event_params(card_id, 1, now, True, 0, 1)])
+                        connection.execute(UPDATE_CARD_SQL, [{
+                            'card_id': card_id, 'box_number': 1, 'last_reviewed': now,
+                            'next_review': now + timedelta(days=1), 'updated_at': now
+                        }])
+                    done += 1
+                except Exception:
+                    errors += 1
+            with lock:
+                counts['reviews'] += done
+                counts['errors'] += errors
+
+        def read_loop(seed):
+            rng = random.Random(seed)
+            done = errors = 0
+            while not stop.is_set():
+                try:
+                    with engine.connect() as connection:
+                        reader.page(connection, rng.randint(0, DECK_SIZE - 100), 100)
+                    done += 1
+                except Exception:
+                    errors += 1
+            with lock:
+                counts['reads'] += done
+                counts['errors'] += errors
+
+        threads = [threading.Thread(target=write_loop, args=(i,)) for i in range(writers)]
+        threads += [threading.Thread(target=read_loop, args=(100 + i,)) for i in range(readers)]
+        for thread in threads:
+            thread.start()
+        time.sleep(seconds)
+        stop.set()
+        for thread in threads:
+            thread.join()
+        engine.dispose()
+
+    label = 'tuned' if tuned else 'previous'
+    print(f"{label:>9} | reviews {counts['reviews'] / seconds:>8,.0f}/s | "
+          f"page reads {counts['reads'] / seconds:>8,.0f}/s | errors {counts['errors']}")
+
+if __name__ == '__main__':
+    seconds = float(sys.argv[1]) if len(sys.argv) > 1 else 5
+    writers = int(sys.argv[2]) if len(sys.argv) > 2 else 4
+    readers = int(sys.argv[3]) if len(sys.argv) > 3 else 4
+    print(f"{writers} writers, {readers} readers, {seconds:.0f}s each; settings: {get_sqlite_settings()}")
+    run(False, seconds, writers, readers)
+    run(True, seconds, writers, readers)
@@ -0,0 +1,72 @@
+"""
+Micro-benchmark: /api/cards/suggest lookups in the in-memory word index
+(prefix and typo-tolerant) versus a `LIKE 'x%'` / `LIKE '%x%'` query.
+
+Usage:
+    python benchmarks/bench_word_suggest.py [deck sizes...]
+"""
+import sys
+import os
+import time
+import random
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine, text
+
+from word_index import WordIndex
+from _common import time_per_query
+
+LETTERS = 'abcdefghijklmnopqrstuvwxyz'
+
+def make_words(size, rng):
+    words = set()
+    while len(words) < size:
+        words.add(''.join(rng.choice(LETTERS) for _ in range(rng.randint(4, 10))))
+    return sorted(words)
+
+def make_typo(word, rng):
+    """Delete, substitute or swap one character after the first"""
+    position = rng.randrange(1, len(word) - 1)
+    kind = rng.randrange(3)
+    if kind == 0:
+        return word[:position] + word[position + 1:]
+    if kind == 1:
+        return word[:position] + rng.choice(LETTERS) + word[position + 1:]
+    return word[:position] + word[position + 1] + word[position] + word[position + 2:]
+
+def run(size):
+    rng = random.Random(42)
+    words = make_words(size, rng)
+
+    engine = create_engine('sqlite://')
+    connection = engine.connect()
+    connection.execute(text("CREATE TABLE cards (id INTEGER PRIMARY KEY, word TEXT UNIQUE)"))
+    connection.execute(text("INSERT INTO cards (word) VALUES (:word)"), [{'word': word} for word in words])
+
+    index = WordIndex()
+    started = time.perf_counter()
+    index.load(connection)
+    build_time = time.perf_counter() - started
+
+    prefixes = [word[:rng.randint(2, 5)] for word in rng.sample(words, 50)]
+    typos = [make_typo(word, rng) for word in rng.sample(words, 50)]
+
+    prefix_time = time_per_query(lambda query: index.suggest(query), prefixes)
+    started = time.perf_counter()
+    for query in typos:
+        index.suggest(query)
+    first_typo_time = (time.perf_counter() - started) / len(typos)
+    typo_time = time_per_query(lambda query: index.suggest(query), typos)
+    like_time = time_per_query(lambda query: connection.execute(
+        text("SELECT word FROM cards WHERE word LIKE :pattern LIMIT 10"), {'pattern': f'%{query}%'}
+    ).fetchall(), typos)
+    connection.close()
+
+    print(f"{size:>8} words | load {build_time:.2f}s | prefix {prefix_time * 1000:.3f} ms | "
+          f"typo {typo_time * 1000:.3f} ms (cold {first_typo_time * 1000:.3f} ms) | LIKE '%x%' {like_time * 1000:.3f} ms")
+
+if __name__ == '__main__':
+    sizes = [int(arg) for arg in sys.argv[1:]] or [10000, 100000]
+    for size in sizes:
+        run(size)
@@ -0,0 +1,189 @@
+from datetime import datetime
+
+from sqlalchemy import select, bindparam, type_coerce, String, table, column, text, func
+
+from models import Card
+from card_search import SEARCH_RANK
+
+cards_table = Card.__table__
+cards_fts_table = table('cards_fts', column('rowid'))
+
+# Output key for every column that can be read, in API order
+CARD_COLUMNS = (
+    'id', 'word', 'meaning', 'example', 'ipa', 'pos', 'box_number',
+    'last_reviewed', 'next_review', 'created_at', 'updated_at'
+)
+
+DATETIME_COLUMNS = frozenset(('last_reviewed', 'next_review', 'created_at', 'updated_at'))
+
+# Earliest review time after a moment: one seek on ix_cards_next_review_box
+NEXT_DUE_STATEMENT = select(func.min(cards_table.c.next_review)).where(
+    cards_table.c.next_review > bindparam('now', type_=cards_table.c.next_review.type)
+)
+
+def encode_due_cursor(card):
+    """Build the due-queue cursor from the last serialized card of a page"""
+    return f"{card['next_review']}|{card['id']}"
+
+def decode_due_cursor(cursor):
+    """
+    Parse a due-queue cursor into (next_review, id). next_review is given back
+    as the text stored in the column, so cards tied on it compare equal.
+    Returns None when no cursor is given, raises ValueError when it is malformed.
+    """
+    if not cursor:
+        return None
+    review_part, id_part = cursor.rsplit('|', 1)
+    datetime.fromisoformat(review_part)  # Reject anything that is not a timestamp
+    return review_part.replace('T', ' ', 1), int(id_part)
+
+class CardProjection:
+    """
+    A fixed set of card columns with its precomputed serialization.
+
+    Datetime columns are selected as the raw text SQLite stores
+    ('YYYY-MM-DD HH:MM:SS.ffffff'), so no datetime objects are built;
+    serializing only swaps the separator to produce an ISO 8601 string.
+    """
+
+    def __init__(self, fields):
+        self.keys = tuple(fields)
+        self.datetime_indexes = tuple(
+            index for index, name in enumerate(self.keys) if name in DATETIME_COLUMNS
+        )
+        self.columns = [
+            type_coerce(cards_table.c[name], String).label(name) if name in DATETIME_COLUMNS
+            else cards_table.c[name]
+            for name in self.keys
+        ]
+
+    def serialize(self, rows):
+        """Convert row tuples to a list of JSON-serializable dictionaries"""
+        keys = self.keys
+        datetime_indexes = self.datetime_indexes
+        if not datetime_indexes:
+            return [dict(zip(keys, row)) for row in rows]
+
+        result = []
+        for row in rows:
+            values = list(row)
+            for index in datetime_indexes:
+                value = values[index]
+                if value is not None:
+                    values[index] = value.replace(' ', 'T', 1)
+            result.append(dict(zip(keys, values)))
+        return result
+
+class CardReader:
+    """
+    Read path for cards that bypasses ORM hydration.
+
+    Statements are built once per projection with bind parameters, so SQLAlchemy's
+    compiled cache is hit on every call, and results come back as plain row tuples.
+    """
+
+    def __init__(self):
+        self._projections = {}
+        self._statements = {}
+
+    def projection(self, fields=CARD_COLUMNS):
+        """Return the cached projection for a sequence of column names"""
+        fields = tuple(fields)
+        projection = self._projections.get(fields)
+        if projection is None:
+            projection = self._projections[fields] = CardProjection(fields)
+        return projection
+
+    def _statement(self, kind, projection):
+        key = (kind, projection.keys)
+        statement = self._statements.get(key)
+        if statement is not None:
+            return statement
+
+        statement = select(*projection.columns)
+        c = cards_table.c
+        if kind == 'page':
+            statement = statement.where(c.id > bindparam('after_id')) \
+                .order_by(c.id).limit(bindparam('limit'))
+        elif kind == 'due':
+            statement = statement.where(c.next_review <= bindparam('now', type_=c.next_review.type)) \
+                .order_by(c.next_review, c.id).limit(bindparam('limit'))
+        elif kind == 'due_after':
+            # The cursor holds the stored text, compared as text: a value rebuilt
+            # as a datetime would not equal rows stored in another format
+            stored_review = type_coerce(c.next_review, String)
+            cursor_review = bindparam('cursor_review', type_=String)
+            statement = statement.where(
+                c.next_review <= bindparam('now', type_=c.next_review.type),
+                (stored_review > cursor_review) |
+                ((stored_review == cursor_review) & (c.id > bindparam('cursor_id')))
+            ).order_by(c.next_review, c.id).limit(bindparam('limit'))
+        elif kind == 'changed':
+            statement = statement.where(c.sync_version > bindparam('since')) \
+                .order_by(c.sync_version, c.id).limit(bindparam('limit'))
+        elif kind == 'search':
+            statement = statement.select_from(
+                cards_table.join(cards_fts_table, cards_fts_table.c.rowid == c.id)
+            ).where(text('cards_fts MATCH :query')) \
+                .order_by(text(SEARCH_RANK)).limit(bindparam('limit'))
+        elif kind == 'by_ids':
+            statement = statement.where(c.id.in_(bindparam('ids', expanding=True))).order_by(c.id)
+        else:
+            raise ValueError(f"Unknown statement kind: {kind}")
+
+        self._statements[key] = statement
+        return statement
+
+    def page(self, connection, after_id, limit, fields=CARD_COLUMNS):
+        """Return up to `limit` cards with id greater than `after_id`, ordered by id"""
+        projection = self.projection(fields)
+        rows = connection.execute(
+            self._statement('page', projection), {'after_id': after_id, 'limit': limit}
+        ).fetchall()
+        return projection.serialize(rows)
+
+    def due(self, connection, now, limit, cursor=None, fields=CARD_COLUMNS):
+        """Return up to `limit` due cards, most overdue first, after an optional (next_review, id) cursor"""
+        projection = self.projection(fields)
+        params = {'now': now, 'limit': limit}
+        if cursor:
+            params['cursor_review'], params['cursor_id'] = cursor
+            statement = self._statement('due_after', projection)
+        else:
+            statement = self._statement('due', projection)
+        return projection.serialize(connection.execute(statement, params).fetchall())
+
+    def next_due_after(self, connection, now):
+        """Return when the next card comes due after `now`, or None if none is scheduled"""
+        return connection.execute(NEXT_DUE_STATEMENT, {'now': now}).scalar()
+
+    def by_ids(self, connection, card_ids, fields=CARD_COLUMNS):
+        """Return the cards with the given ids, ordered by id"""
+        if not card_ids:
+            return []
+        projection = self.projection(fields)
+        rows = connection.execute(
+            self._statement('by_ids', projection), {'ids': list(card_ids)}
+        ).fetchall()
+        return projection.serialize(rows)
+
+    def changed_since(self, connection, since, limit, fields=CARD_COLUMNS):
+        """Return up to `limit` cards inserted or updated after deck version `since`, oldest change first"""
+        projection = self.projection(fields)
+        rows = connection.execute(
+            self._statement('changed', projection), {'since': since, 'limit': limit}
+        ).fetchall()
+        return projection.serialize(rows)
+
+    def search(self, connection, match_query, limit, fields=CARD_COLUMNS):
+        """Return up to `limit` cards matching an FTS5 MATCH expression, best match first"""
+        projection = self.projection(fields)
+        rows = connection.execute(
+            self._statement('search', projection), {'query': match_query, 'limit': limit}
+        ).fetchall()
+        return projection.serialize(rows)
+
+    def get(self, connection, card_id, fields=CARD_COLUMNS):
+        """Return a single card, or None if it does not exist"""
+        cards = self.by_ids(connection, [card_id], fields)
+        return cards[0] if cards else None
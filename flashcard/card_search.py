@@ -0,0 +1,66 @@
+import re
+
+from sqlalchemy import text
+
+# External-content FTS5 index over the searchable card columns. The index stores
+# only tokens and reads the text back from `cards`, so it adds little to the file.
+# Diacritics are folded so 'nghia' matches 'nghĩa', and 2/3 character prefix
+# indexes make prefix queries ('app*') a direct lookup instead of a term scan.
+CARD_SEARCH_DDL = [
+    '''
+    CREATE VIRTUAL TABLE IF NOT EXISTS cards_fts USING fts5(
+        word, meaning, example,
+        content='cards', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2',
+        prefix='2 3'
+    )
+    ''',
+    '''
+    CREATE TRIGGER IF NOT EXISTS cards_fts_insert AFTER INSERT ON cards
+    BEGIN
+        INSERT INTO cards_fts (rowid, word, meaning, example)
+        VALUES (NEW.id, NEW.word, NEW.meaning, NEW.example);
+    END
+    ''',
+    '''
+    CREATE TRIGGER IF NOT EXISTS cards_fts_delete AFTER DELETE ON cards
+    BEGIN
+        INSERT INTO cards_fts (cards_fts, rowid, word, meaning, example)
+        VALUES ('delete', OLD.id, OLD.word, OLD.meaning, OLD.example);
+    END
+    ''',
+    '''
+    CREATE TRIGGER IF NOT EXISTS cards_fts_update AFTER UPDATE OF word, meaning, example ON cards
+    BEGIN
+        INSERT INTO cards_fts (cards_fts, rowid, word, meaning, example)
+        VALUES ('delete', OLD.id, OLD.word, OLD.meaning, OLD.example);
+        INSERT INTO cards_fts (rowid, word, meaning, example)
+        VALUES (NEW.id, NEW.word, NEW.meaning, NEW.example);
+    END
+    '''
+]
+
+# bm25 column weights for (word, meaning, example): a hit on the word itself
+# ranks above one in its meaning, which ranks above one in the example sentence
+SEARCH_RANK = 'bm25(cards_fts, 10.0, 2.0, 1.0)'
+
+MAX_QUERY_TERMS = 8
+
+TERM_PATTERN = re.compile(r'\w+', re.UNICODE)
+
+def rebuild_card_search(connection):
+    """Rebuild the whole search index from the cards table"""
+    connection.execute(text("INSERT INTO cards_fts (cards_fts) VALUES ('rebuild')"))
+
+def build_match_query(query):
+    """
+    Turn free text typed by a user into an FTS5 MATCH expression.
+
+    Every word becomes a quoted prefix term, so FTS5 operators and quotes in the
+    input are never interpreted and 'exam sent' matches 'example sentence'.
+    All terms must match. Returns None if the input contains no words.
+    """
+    terms = TERM_PATTERN.findall(query or '')[:MAX_QUERY_TERMS]
+    if not terms:
+        return None
+    return ' '.join(f'"{term}"*' for term in terms)
@@ -0,0 +1,102 @@
+"""
+Set-based insert-or-update of cards by word, shared by the import routes and
+the command-line scripts.
+
+All rows go through one `INSERT ... ON CONFLICT(word) DO UPDATE` statement run
+with executemany, instead of a SELECT plus an INSERT or UPDATE per word.
+Functions take a DB-API sqlite3 connection; inside a SQLAlchemy session use
+`session.connection().connection`.
+"""
+from collections import namedtuple
+from datetime import datetime
+
+# Meaning stored for imported words whose definition is not known yet
+PLACEHOLDER_MEANING = 'To be defined'
+
+UPSERT_COLUMNS = ('word', 'meaning', 'example', 'ipa', 'pos', 'box_number', 'next_review', 'created_at', 'updated_at')
+
+# Columns an import may fill in on an existing card
+DEFAULT_UPDATE_COLUMNS = ('meaning', 'example', 'ipa', 'pos')
+
+# Bound variables per existence query, below SQLite's default limit of 999
+MAX_QUERY_WORDS = 500
+
+UpsertResult = namedtuple('UpsertResult', ['inserted', 'updated', 'new_words'])
+
+def build_upsert_sql(update_columns=DEFAULT_UPDATE_COLUMNS, overwrite=False):
+    """
+    Build the upsert statement. Unless `overwrite` is set, an existing card is
+    only updated while its meaning is still the placeholder.
+    """
+    assignments = ', '.join(f'{column} = excluded.{column}' for column in tuple(update_columns) + ('updated_at',))
+    sql = (
+        f"INSERT INTO cards ({', '.join(UPSERT_COLUMNS)}) "
+        f"VALUES ({', '.join('?' for _ in UPSERT_COLUMNS)}) "
+        f"ON CONFLICT(word) DO UPDATE SET {assignments}"
+    )
+    if not overwrite:
+        sql += f" WHERE cards.meaning = '{PLACEHOLDER_MEANING}'"
+    return sql
+
+def to_sqlite_datetime(value):
+    """Format a datetime the way SQLAlchemy stores DateTime columns in SQLite"""
+    return value.strftime('%Y-%m-%d %H:%M:%S.%f') if value is not None else None
+
+def card_params(card, now):
+    """Bind parameters for one card dict; new cards start in box 0 and are due now"""
+    return (
+        card['word'],
+        card.get('meaning') or PLACEHOLDER_MEANING,
+        card.get('example'),
+        card.get('ipa'),
+        card.get('pos'),
+        card.get('box_number', 0),
+        to_sqlite_datetime(card.get('next_review') or now),
+        to_sqlite_datetime(now),
+        to_sqlite_datetime(now)
+    )
+
+def upsert_cards(connection, cards, update_columns=DEFAULT_UPDATE_COLUMNS, overwrite=False):
+    """
+    Insert new cards and fill in existing ones in a single executemany.
+    Duplicate words keep their first occurrence. The caller commits.
+
+    Args:
+        connection: DB-API sqlite3 connection
+        cards: Dicts with a 'word' key and any of the other UPSERT_COLUMNS
+        update_columns: Columns copied onto an existing card
+        overwrite: Update existing cards even when they already have a meaning
+
+    Returns:
+        UpsertResult: inserted and updated counts, and the words that were inserted
+    """
+    rows = {}
+    for card in cards:
+        rows.setdefault(card['word'], card)
+    if not rows:
+        return UpsertResult(0, 0, [])
+
+    words = list(rows)
+    cursor = connection.cursor()
+    try:
+        # Existing words are read in the same transaction to split the row count
+        existing = set()
+        for start in range(0, len(words), MAX_QUERY_WORDS):
+            chunk = words[start:start + MAX_QUERY_WORDS]
+            cursor.execute(
+                f"SELECT word FROM cards WHERE word IN ({', '.join('?' for _ in chunk)})", chunk
+            )
+            existing.update(row[0] for row in cursor.fetchall())
+
+        now = datetime.utcnow()
+        cursor.executemany(
+            build_upsert_sql(update_columns, overwrite),
+            [card_params(card, now) for card in rows.values()]
+        )
+        # rowcount sums inserted and updated rows, without changes made by triggers
+        changed = cursor.rowcount
+    finally:
+        cursor.close()
+
+    new_words = [word for word in words if word not in existing]
+    return UpsertResult(len(new_words), changed - len(new_words), new_words)
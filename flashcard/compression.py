@@ -0,0 +1,123 @@
+import gzip
+import threading
+from collections import OrderedDict
+
+from flask import request
+
+# Optional brotli support
+try:
+    import brotli
+    BROTLI_AVAILABLE = True
+except ImportError:
+    BROTLI_AVAILABLE = False
+    brotli = None
+
+# Defaults, overridable through app.config
+DEFAULT_COMPRESSION_CONFIG = {
+    'COMPRESS_MIN_SIZE': 1024,          # Smaller bodies are sent as-is
+    'COMPRESS_GZIP_LEVEL': 6,           # 1 (fastest) - 9 (smallest)
+    'COMPRESS_BROTLI_QUALITY': 5,       # 0 (fastest) - 11 (smallest)
+    'COMPRESS_MIMETYPES': ('application/json', 'text/html', 'text/css', 'application/javascript'),
+    'COMPRESS_CACHE_ENTRIES': 64        # Compressed bodies kept per (path, ETag, encoding)
+}
+
+class CompressedBodyCache:
+    """
+    LRU cache of compressed response bodies keyed by (path, ETag, encoding, level).
+    A strong ETag identifies the exact bytes of a response within one resource,
+    so the same deck snapshot is compressed once and then served from memory.
+    """
+
+    def __init__(self, max_entries):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        with self._lock:
+            body = self._entries.get(key)
+            if body is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return body
+
+    def put(self, key, body):
+        with self._lock:
+            self._entries[key] = body
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+def choose_encoding(accept_encodings):
+    """
+    Pick the response encoding from the request's Accept-Encoding header.
+    Brotli is preferred when installed, then gzip; an encoding with q=0 is refused.
+
+    Returns:
+        str or None: 'br', 'gzip' or None for an uncompressed response
+    """
+    candidates = ['br', 'gzip'] if BROTLI_AVAILABLE else ['gzip']
+    best, best_quality = None, 0
+    for encoding in candidates:
+        quality = accept_encodings[encoding]
+        if quality > best_quality:
+            best, best_quality = encoding, quality
+    return best
+
+def compress_body(body, encoding, config):
+    if encoding == 'br':
+        return brotli.compress(body, quality=config['COMPRESS_BROTLI_QUALITY'])
+    return gzip.compress(body, compresslevel=config['COMPRESS_GZIP_LEVEL'])
+
+def setup_compression(app):
+    """
+    Compress responses negotiated through Accept-Encoding.
+
+    Only successful, non-streamed responses of a compressible mimetype and at
+    least COMPRESS_MIN_SIZE bytes are compressed. Responses carrying a strong
+    ETag are cached compressed; their ETag is sent as weak, since the compressed
+    bytes differ from the identity representation it was computed for.
+    """
+    for key, value in DEFAULT_COMPRESSION_CONFIG.items():
+        app.config.setdefault(key, value)
+    cache = CompressedBodyCache(app.config['COMPRESS_CACHE_ENTRIES'])
+    app.extensions['compression_cache'] = cache
+
+    @app.after_request
+    def compress_response(response):
+        config = app.config
+        response.vary.add('Accept-Encoding')
+
+        if (response.status_code < 200 or response.status_code >= 300 or response.status_code == 204
+                or response.direct_passthrough or 'Content-Encoding' in response.headers
+                or response.mimetype not in config['COMPRESS_MIMETYPES']):
+            return response
+
+        encoding = choose_encoding(request.accept_encodings)
+        if encoding is None:
+            return response
+
+        body = response.get_data()
+        if len(body) < config['COMPRESS_MIN_SIZE']:
+            return response
+
+        etag, weak = response.get_etag()
+        level = config['COMPRESS_BROTLI_QUALITY'] if encoding == 'br' else config['COMPRESS_GZIP_LEVEL']
+        # ETags are only unique per resource, so the path is part of the key
+        cache_key = (request.path, etag, encoding, level) if etag and not weak else None
+
+        compressed = cache.get(cache_key) if cache_key else None
+        if compressed is None:
+            compressed = compress_body(body, encoding, config)
+            if cache_key:
+                cache.put(cache_key, compressed)
+
+        response.set_data(compressed)
+        response.headers['Content-Encoding'] = encoding
+        if etag:
+            response.set_etag(etag, weak=True)
+        return response
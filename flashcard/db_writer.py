@@ -0,0 +1,118 @@
+import logging
+import queue
+import threading
+import atexit
+from concurrent.futures import Future
+
+from sqlalchemy import text
+from sqlalchemy.orm import sessionmaker
+
+logger = logging.getLogger('app.db_writer')
+
+class DatabaseWriter:
+    """
+    Single writer thread that owns the only write connection to the database.
+
+    Request handlers submit mutations, functions taking an ORM session, and wait
+    on the returned future. The writer takes every mutation queued at that moment
+    (up to `max_batch`) and runs them in one transaction. The whole group pays
+    for one lock acquisition and one commit, and handlers never compete for
+    SQLite's write lock.
+
+    If a mutation raises, the group is rolled back and every mutation is run
+    again in its own transaction, so only the failing one reports an error.
+    Mutations may therefore run more than once: they must only touch the
+    database and return plain values (ORM objects do not outlive the session).
+    """
+
+    def __init__(self, engine, max_batch=64):
+        self.engine = engine
+        self.max_batch = max_batch
+        self.session_factory = sessionmaker(expire_on_commit=False)
+
+        self._queue = queue.Queue()
+        self._stopped = False
+        self._thread = threading.Thread(target=self._run, name='db-writer', daemon=True)
+        self._thread.start()
+        atexit.register(self.stop)
+
+        self.transactions = 0
+        self.mutations = 0
+
+    def submit(self, mutation):
+        """Queue `mutation(session)` and return a Future for its result"""
+        if self._stopped:
+            raise RuntimeError("Database writer is stopped")
+        future = Future()
+        self._queue.put((mutation, future))
+        return future
+
+    def run(self, mutation, timeout=None):
+        """Queue `mutation(session)` and wait for its result (or exception)"""
+        return self.submit(mutation).result(timeout)
+
+    def stop(self):
+        """Finish the queued mutations and stop the writer thread"""
+        if self._stopped:
+            return
+        self._stopped = True
+        self._queue.put(None)
+        self._thread.join(timeout=10)
+
+    def _run(self):
+        with self.engine.connect() as connection:
+            while True:
+                item = self._queue.get()
+                if item is None:
+                    return
+
+                batch = [item]
+                while len(batch) < self.max_batch:
+                    try:
+                        item = self._queue.get_nowait()
+                    except queue.Empty:
+                        break
+                    if item is None:
+                        self._queue.put(None)  # Stop after this batch
+                        break
+                    batch.append(item)
+
+                batch = [(mutation, future) for mutation, future in batch
+                         if future.set_running_or_notify_cancel()]
+                if batch:
+                    self._run_batch(connection, batch)
+
+    def _run_batch(self, connection, batch):
+        try:
+            results = self._transaction(connection, [mutation for mutation, _ in batch])
+        except Exception as e:
+            if len(batch) == 1:
+                batch[0][1].set_exception(e)
+                return
+            # Isolate the failing mutation
+            logger.warning(f"Write batch of {len(batch)} mutations failed ({e}), retrying one by one")
+            for mutation, future in batch:
+                try:
+                    future.set_result(self._transaction(connection, [mutation])[0])
+                except Exception as e:
+                    future.set_exception(e)
+            return
+
+        for (_, future), result in zip(batch, results):
+            future.set_result(result)
+
+    def _transaction(self, connection, mutations):
+        session = self.session_factory(bind=connection)
+        try:
+            # Take the write lock up front instead of upgrading a read lock mid-transaction
+            session.execute(text("BEGIN IMMEDIATE"))
+            results = [mutation(session) for mutation in mutations]
+            session.commit()
+        except Exception:
+            session.rollback()
+            raise
+        finally:
+            session.close()
+        self.transactions += 1
+        self.mutations += len(mutations)
+        return results
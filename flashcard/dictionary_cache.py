@@ -0,0 +1,196 @@
+"""
+Cache of dictionary API lookups, in memory and in the `dictionary_cache` table.
+
+Responses are stored compressed and keyed by the normalized word. Found words
+are kept for `ttl` seconds; words the API does not know (404) are cached too,
+for the shorter `miss_ttl`, so imports stop asking for them on every run.
+Other failures are never cached.
+"""
+import json
+import logging
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from urllib.parse import quote
+
+from sqlalchemy import text
+
+from http_client import get_http_client
+
+logger = logging.getLogger('app.dictionary_cache')
+
+DICTIONARY_API_URL = 'https://api.dictionaryapi.dev/api/v2/entries/en/{word}'
+
+DEFAULT_TTL = 30 * 24 * 3600       # Found words
+DEFAULT_MISS_TTL = 24 * 3600       # Words the API answered 404 for
+DEFAULT_MEMORY_ENTRIES = 2048
+
+# status is the HTTP status of the cached answer (200 or 404); body is the
+# zlib-compressed JSON response, NULL for misses. Times are epoch seconds.
+DICTIONARY_CACHE_DDL = [
+    '''
+    CREATE TABLE IF NOT EXISTS dictionary_cache (
+        word TEXT PRIMARY KEY,
+        status INTEGER NOT NULL,
+        body BLOB,
+        fetched_at INTEGER NOT NULL,
+        expires_at INTEGER NOT NULL
+    )
+    '''
+]
+
+SELECT_ENTRY_SQL = text("SELECT status, body, expires_at FROM dictionary_cache WHERE word = :word")
+
+UPSERT_ENTRY_SQL = text('''
+    INSERT INTO dictionary_cache (word, status, body, fetched_at, expires_at)
+    VALUES (:word, :status, :body, :fetched_at, :expires_at)
+    ON CONFLICT(word) DO UPDATE SET
+        status = excluded.status, body = excluded.body,
+        fetched_at = excluded.fetched_at, expires_at = excluded.expires_at
+''')
+
+_MISSING = object()
+
+def normalize_word(word):
+    return word.strip().lower()
+
+def fetch_dictionary_entry(word, limiter=None):
+    """
+    Ask the dictionary API about one word, through the shared HTTP client
+    (timeouts and retries on 429/5xx are handled there). Every attempt,
+    retries included, first waits for a slot from `limiter` when given.
+
+    Returns:
+        tuple: (status, body) with status 200 and the raw JSON bytes, or 404 and None
+
+    Raises:
+        requests.RequestException: on timeouts, connection errors and other statuses
+    """
+    response = get_http_client().get(DICTIONARY_API_URL.format(word=quote(word)), limiter=limiter)
+    if response.status_code == 404:
+        return 404, None
+    response.raise_for_status()
+    return response.status_code, response.content
+
+class DictionaryCache:
+    """
+    Read-through cache for dictionary lookups.
+
+    Lookups check an in-process LRU, then the dictionary_cache table, and only
+    then the API. Entries are read through `engine`; new entries are written
+    through `writer` (a DatabaseWriter) without waiting for the commit, or
+    directly through `engine` when no writer is given.
+    """
+
+    def __init__(self, engine, writer=None, fetch=fetch_dictionary_entry,
+                 ttl=DEFAULT_TTL, miss_ttl=DEFAULT_MISS_TTL, memory_entries=DEFAULT_MEMORY_ENTRIES):
+        self.engine = engine
+        self.writer = writer
+        self.fetch = fetch
+        self.ttl = ttl
+        self.miss_ttl = miss_ttl
+        self.memory_entries = memory_entries
+
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self.counters = {
+            'memory_hits': 0,    # Answered from the LRU
+            'db_hits': 0,        # Answered from the dictionary_cache table
+            'negative_hits': 0,  # Cached 404s, counted in either layer as well
+            'misses': 0,         # Fetched from the API
+            'errors': 0          # API failures (not cached)
+        }
+
+    def lookup(self, word):
+        """
+        Return the API's entries for `word` (a list parsed from JSON), or None
+        when the dictionary does not know the word.
+        """
+        key = normalize_word(word)
+        now = int(time.time())
+
+        entries = self._memory_get(key, now)
+        if entries is not _MISSING:
+            self._count('memory_hits', entries)
+            return entries
+
+        with self.engine.connect() as connection:
+            row = connection.execute(SELECT_ENTRY_SQL, {'word': key}).first()
+        if row is not None and row.expires_at > now:
+            entries = json.loads(zlib.decompress(row.body)) if row.body is not None else None
+            self._memory_put(key, row.expires_at, entries)
+            self._count('db_hits', entries)
+            return entries
+
+        self._count('misses')
+        try:
+            status, body = self.fetch(key)
+        except Exception:
+            self._count('errors')
+            raise
+
+        entries = json.loads(body) if body is not None else None
+        expires_at = now + (self.ttl if entries is not None else self.miss_ttl)
+        self._memory_put(key, expires_at, entries)
+        self._store({
+            'word': key,
+            'status': status,
+            'body': zlib.compress(body) if body is not None else None,
+            'fetched_at': now,
+            'expires_at': expires_at
+        })
+        return entries
+
+    def stats(self):
+        """Return the hit/miss counters and the number of entries held in memory"""
+        with self._lock:
+            stats = dict(self.counters)
+            stats['memory_entries'] = len(self._memory)
+        lookups = stats['memory_hits'] + stats['db_hits'] + stats['misses']
+        stats['hit_rate'] = round((stats['memory_hits'] + stats['db_hits']) / lookups, 3) if lookups else 0.0
+        return stats
+
+    def _count(self, counter, entries=_MISSING):
+        with self._lock:
+            self.counters[counter] += 1
+            if entries is None:
+                self.counters['negative_hits'] += 1
+
+    def _memory_get(self, key, now):
+        with self._lock:
+            item = self._memory.get(key)
+            if item is None:
+                return _MISSING
+            expires_at, entries = item
+            if expires_at <= now:
+                del self._memory[key]
+                return _MISSING
+            self._memory.move_to_end(key)
+            return entries
+
+    def _memory_put(self, key, expires_at, entries):
+        with self._lock:
+            self._memory[key] = (expires_at, entries)
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.memory_entries:
+                self._memory.popitem(last=False)
+
+    def _store(self, params):
+        if self.writer is None:
+            try:
+                with self.engine.begin() as connection:
+                    connection.execute(UPSERT_ENTRY_SQL, params)
+            except Exception as e:
+                logger.warning(f"Could not cache dictionary entry for '{params['word']}': {e}")
+            return
+
+        def store(session):
+            session.execute(UPSERT_ENTRY_SQL, params)
+
+        def report(future):
+            if future.exception() is not None:
+                logger.warning(f"Could not cache dictionary entry for '{params['word']}': {future.exception()}")
+
+        # Fire and forget: the lookup does not wait for the write to commit
+        self.writer.submit(store).add_done_callback(report)
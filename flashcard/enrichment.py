@@ -0,0 +1,58 @@
+"""
+Concurrent enrichment of imported words.
+
+Dictionary lookups for an import run on a bounded thread pool before any
+database transaction is opened; the results are then written in one step.
+Requests to each host are spaced out by a shared rate limiter, so raising the
+concurrency does not flood the dictionary API.
+"""
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+
+logger = logging.getLogger('app.enrichment')
+
+class HostRateLimiter:
+    """Allow at most `rate` requests per second to each host, across all threads"""
+
+    def __init__(self, rate):
+        self.interval = 1.0 / rate if rate else 0.0
+        self._next_slot = {}
+        self._lock = threading.Lock()
+
+    def wait(self, url):
+        """Block until a request to the host of `url` may be sent"""
+        if not self.interval:
+            return
+        host = urlsplit(url).netloc
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot.get(host, now))
+            self._next_slot[host] = slot + self.interval
+        if slot > now:
+            time.sleep(slot - now)
+
+def enrich_words(words, lookup, max_workers=8):
+    """
+    Run `lookup(word)` for every word on at most `max_workers` threads.
+
+    Returns:
+        dict: {word: result} in the order of `words`; words whose lookup
+        raised are logged and left out
+    """
+    words = list(dict.fromkeys(words))
+    if not words:
+        return {}
+
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(words)), thread_name_prefix='enrich') as executor:
+        futures = [(word, executor.submit(lookup, word)) for word in words]
+
+    results = {}
+    for word, future in futures:
+        try:
+            results[word] = future.result()
+        except Exception as e:
+            logger.error(f"Error looking up '{word}': {e}")
+    return results
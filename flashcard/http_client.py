@@ -0,0 +1,169 @@
+"""
+Shared HTTP client for outbound calls (dictionary lookups and other enrichment
+sources).
+
+One pooled requests.Session keeps connections to each host alive between
+calls. Every request has connect and read timeouts; 429 and 5xx answers and
+connection errors are retried with jittered exponential backoff. Latency, retries,
+errors and pool usage are recorded per host.
+"""
+import logging
+import random
+import threading
+import time
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+logger = logging.getLogger('app.http_client')
+
+DEFAULT_TIMEOUT = (3.05, 10)            # (connect, read) seconds
+DEFAULT_POOL_SIZE = 16                  # Keep-alive connections per host
+DEFAULT_RETRIES = 3
+DEFAULT_BACKOFF = 0.5                   # Seconds before the first retry, doubled each time
+MAX_BACKOFF = 10
+RETRY_STATUSES = frozenset([429, 500, 502, 503, 504])
+
+class HostStats:
+    """Request counters for one host; guarded by the client's lock"""
+
+    def __init__(self):
+        self.requests = 0
+        self.errors = 0
+        self.retries = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.saturated = 0               # Requests started with every pooled connection busy
+        self.total_latency = 0.0
+        self.max_latency = 0.0
+
+    def to_dict(self, pool_size):
+        return {
+            'requests': self.requests,
+            'errors': self.errors,
+            'retries': self.retries,
+            'in_flight': self.in_flight,
+            'max_in_flight': self.max_in_flight,
+            'pool_size': pool_size,
+            'saturated': self.saturated,
+            'avg_latency_ms': round(self.total_latency / self.requests * 1000, 1) if self.requests else 0.0,
+            'max_latency_ms': round(self.max_latency * 1000, 1)
+        }
+
+class HttpClient:
+    """
+    Pooled keep-alive HTTP client with timeouts, retries and per-host metrics.
+
+    The pool blocks when all `pool_size` connections to a host are in use, so
+    callers wait for a connection instead of opening throwaway ones; `saturated`
+    counts how often that happened.
+    """
+
+    def __init__(self, pool_size=DEFAULT_POOL_SIZE, timeout=DEFAULT_TIMEOUT,
+                 retries=DEFAULT_RETRIES, backoff=DEFAULT_BACKOFF):
+        self.pool_size = pool_size
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, pool_block=True)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+
+        self._hosts = {}
+        self._lock = threading.Lock()
+
+    def get(self, url, limiter=None, **kwargs):
+        """GET `url`, retrying 429/5xx answers and connection errors"""
+        return self.request('GET', url, limiter=limiter, **kwargs)
+
+    def request(self, method, url, limiter=None, **kwargs):
+        """
+        Send a request, retrying 429/5xx answers and connection errors. With a
+        `limiter` (see enrichment.HostRateLimiter), every attempt waits for a
+        request slot on the host first, so retries count against the rate too.
+        """
+        kwargs.setdefault('timeout', self.timeout)
+        host = urlsplit(url).netloc
+        attempt = 0
+        while True:
+            if limiter is not None:
+                limiter.wait(url)
+            try:
+                response = self._send(host, method, url, **kwargs)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                if attempt >= self.retries:
+                    raise
+                delay = self._backoff_delay(attempt)
+                logger.warning(f"{method} {host} failed ({e}), retrying in {delay:.2f}s")
+            else:
+                if response.status_code not in RETRY_STATUSES or attempt >= self.retries:
+                    return response
+                delay = self._backoff_delay(attempt, response.headers.get('Retry-After'))
+                logger.warning(f"{method} {host} returned {response.status_code}, retrying in {delay:.2f}s")
+                response.close()
+
+            with self._lock:
+                self._host(host).retries += 1
+            time.sleep(delay)
+            attempt += 1
+
+    def stats(self):
+        """Return {host: counters} for every host contacted so far"""
+        with self._lock:
+            return {host: stats.to_dict(self.pool_size) for host, stats in self._hosts.items()}
+
+    def close(self):
+        self.session.close()
+
+    def _host(self, host):
+        stats = self._hosts.get(host)
+        if stats is None:
+            stats = self._hosts[host] = HostStats()
+        return stats
+
+    def _send(self, host, method, url, **kwargs):
+        with self._lock:
+            stats = self._host(host)
+            if stats.in_flight >= self.pool_size:
+                stats.saturated += 1
+            stats.in_flight += 1
+            stats.max_in_flight = max(stats.max_in_flight, stats.in_flight)
+
+        start = time.perf_counter()
+        failed = True
+        try:
+            response = self.session.request(method, url, **kwargs)
+            failed = response.status_code >= 500
+            return response
+        finally:
+            elapsed = time.perf_counter() - start
+            with self._lock:
+                stats.in_flight -= 1
+                stats.requests += 1
+                stats.total_latency += elapsed
+                stats.max_latency = max(stats.max_latency, elapsed)
+                if failed:
+                    stats.errors += 1
+
+    def _backoff_delay(self, attempt, retry_after=None):
+        """Exponential backoff with full jitter, or the server's Retry-After when given in seconds"""
+        if retry_after is not None:
+            try:
+                return min(float(retry_after), MAX_BACKOFF)
+            except ValueError:
+                pass
+        return random.uniform(0, min(self.backoff * (2 ** attempt), MAX_BACKOFF))
+
+_client = None
+_client_lock = threading.Lock()
+
+def get_http_client():
+    """Return the process-wide HTTP client, creating it on first use"""
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = HttpClient()
+        return _client
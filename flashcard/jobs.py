@@ -0,0 +1,262 @@
+"""
+Background jobs persisted in the `jobs` table.
+
+Long imports run on a small pool of worker threads instead of inside the HTTP
+request: submit() records the job and returns its id right away, and clients
+poll get() for the stage, counts and ETA. A handler saves its progress (and
+whatever it needs to carry on, in `state`) as it goes, ideally in the same
+transaction as the work it describes. Jobs still queued or running when the
+process stopped are picked up again by resume() and continue from their last
+checkpoint instead of starting over.
+
+Several processes may serve the app from one database. A job is run by the
+worker that claims it: the claim is a single UPDATE that only succeeds on a
+queued job, or on a running one whose lease has expired (its process
+stopped). Every progress save renews the lease and fails with JobLost once
+another worker has taken the job over. Idle workers look for claimable jobs
+every POLL_SECONDS, so jobs of a process that died are picked up again.
+"""
+import json
+import logging
+import queue
+import threading
+import time
+import os
+import socket
+import uuid
+
+from sqlalchemy import text
+
+logger = logging.getLogger('app.jobs')
+
+DEFAULT_WORKERS = 2
+
+# A running job is left alone for this long after its last save; handlers
+# must save progress more often than that
+LEASE_SECONDS = 120
+
+# How often an idle worker looks for queued jobs and expired leases
+POLL_SECONDS = 30
+
+# status: queued, running, done or failed. stage is set by the handler.
+# params is the JSON given to submit(); state is the handler's JSON checkpoint.
+# Times are epoch seconds. owner and lease_expires are added by migration 11.
+JOBS_DDL = [
+    '''
+    CREATE TABLE IF NOT EXISTS jobs (
+        id TEXT PRIMARY KEY,
+        kind TEXT NOT NULL,
+        status TEXT NOT NULL,
+        stage TEXT,
+        params TEXT NOT NULL,
+        state TEXT,
+        total INTEGER NOT NULL DEFAULT 0,
+        processed INTEGER NOT NULL DEFAULT 0,
+        added INTEGER NOT NULL DEFAULT 0,
+        updated INTEGER NOT NULL DEFAULT 0,
+        eta_seconds INTEGER,
+        error TEXT,
+        created_at INTEGER NOT NULL,
+        updated_at INTEGER NOT NULL,
+        finished_at INTEGER
+    )
+    ''',
+    "CREATE INDEX IF NOT EXISTS ix_jobs_status ON jobs (status)"
+]
+
+# Columns a job may update while it runs
+PROGRESS_FIELDS = ('status', 'stage', 'state', 'total', 'processed', 'added', 'updated', 'eta_seconds', 'error', 'finished_at')
+
+# Columns reported to clients (params and state stay internal)
+PUBLIC_FIELDS = ('id', 'kind', 'status', 'stage', 'total', 'processed', 'added', 'updated',
+                 'eta_seconds', 'error', 'created_at', 'updated_at', 'finished_at')
+
+INSERT_JOB_SQL = text('''
+    INSERT INTO jobs (id, kind, status, stage, params, created_at, updated_at)
+    VALUES (:id, :kind, 'queued', 'queued', :params, :now, :now)
+''')
+
+CLAIMABLE_CONDITION = "(status = 'queued' OR (status = 'running' AND COALESCE(lease_expires, 0) < :now))"
+
+CLAIM_JOB_SQL = text(f'''
+    UPDATE jobs SET status = 'running', owner = :owner, lease_expires = :lease, updated_at = :now
+    WHERE id = :id AND {CLAIMABLE_CONDITION}
+''')
+
+class JobLost(Exception):
+    """The job was taken over by another worker after its lease expired"""
+
+class Job:
+    """A job as seen by its handler, with the progress saved so far"""
+
+    def __init__(self, manager, row):
+        self.manager = manager
+        self.id = row.id
+        self.kind = row.kind
+        self.params = json.loads(row.params)
+        self.state = json.loads(row.state) if row.state else None
+        self.stage = row.stage
+        self.total = row.total
+        self.processed = row.processed
+        self.added = row.added
+        self.updated = row.updated
+
+        # The ETA is based on the rate of this run, so time spent before a restart does not count
+        self._started = time.monotonic()
+        self._started_processed = row.processed
+
+    def update(self, **fields):
+        """Save progress in a transaction of its own"""
+        self.manager.writer.run(lambda session: self.save(session, **fields))
+
+    def save(self, session, **fields):
+        """
+        Save progress inside the caller's transaction, so it commits with the
+        work it describes, and renew the lease. Raises JobLost (rolling the
+        transaction back) when another worker holds the job now.
+        """
+        for name, value in fields.items():
+            if name not in PROGRESS_FIELDS:
+                raise ValueError(f"Unknown job field: {name}")
+            setattr(self, name, value)
+
+        if 'eta_seconds' not in fields:
+            fields['eta_seconds'] = self.eta()
+        if 'state' in fields:
+            fields['state'] = json.dumps(fields['state'])
+        fields['updated_at'] = int(time.time())
+        fields['lease_expires'] = fields['updated_at'] + LEASE_SECONDS
+
+        assignments = ', '.join(f'{name} = :{name}' for name in fields)
+        result = session.execute(
+            text(f"UPDATE jobs SET {assignments} WHERE id = :id AND owner = :owner"),
+            dict(fields, id=self.id, owner=self.manager.owner)
+        )
+        if result.rowcount == 0:
+            raise JobLost(f"Job {self.id} is held by another worker")
+
+    def eta(self):
+        """Seconds left at the rate seen so far in this run, or None before any progress"""
+        done = self.processed - self._started_processed
+        if done <= 0 or not self.total:
+            return None
+        elapsed = time.monotonic() - self._started
+        return int(max(self.total - self.processed, 0) * elapsed / done)
+
+class JobManager:
+    """
+    Runs persisted jobs on `workers` daemon threads.
+
+    Jobs are read through `engine` and every change to the jobs table goes
+    through `writer` (a DatabaseWriter). Handlers are registered per kind and
+    called with a Job; they raise to fail the job.
+    """
+
+    def __init__(self, engine, writer, workers=DEFAULT_WORKERS):
+        self.engine = engine
+        self.writer = writer
+        self.handlers = {}
+        self.owner = f'{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}'
+        self._resumed = False
+        self._resume_lock = threading.Lock()
+
+        self._queue = queue.Queue()
+        self._threads = [
+            threading.Thread(target=self._work, name=f'job-worker-{i}', daemon=True)
+            for i in range(workers)
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def register(self, kind, handler):
+        """Run `handler(job)` for jobs of `kind`"""
+        self.handlers[kind] = handler
+
+    def submit(self, kind, params):
+        """Record a new job and queue it; returns the job id"""
+        if kind not in self.handlers:
+            raise ValueError(f"Unknown job kind: {kind}")
+        job_id = uuid.uuid4().hex
+        values = {'id': job_id, 'kind': kind, 'params': json.dumps(params), 'now': int(time.time())}
+        self.writer.run(lambda session: session.execute(INSERT_JOB_SQL, values))
+        self._queue.put(job_id)
+        return job_id
+
+    def get(self, job_id):
+        """Return the public fields of a job as a dict, or None"""
+        with self.engine.connect() as connection:
+            row = connection.execute(
+                text(f"SELECT {', '.join(PUBLIC_FIELDS)} FROM jobs WHERE id = :id"), {'id': job_id}
+            ).first()
+        return dict(row._mapping) if row is not None else None
+
+    def resume(self):
+        """
+        Queue the jobs left unfinished by a previous run of the process (or by
+        another process whose lease expired), without waiting for the next
+        poll. Only the first call does anything, so it is safe to call on
+        every request; a job queued twice is still only run by one claim.
+        """
+        with self._resume_lock:
+            if self._resumed:
+                return 0
+            self._resumed = True
+        count = self._queue_claimable()
+        if count:
+            logger.info(f"Resuming {count} unfinished job(s)")
+        return count
+
+    def _queue_claimable(self):
+        with self.engine.connect() as connection:
+            job_ids = connection.execute(
+                text(f"SELECT id FROM jobs WHERE {CLAIMABLE_CONDITION} ORDER BY created_at"),
+                {'now': int(time.time())}
+            ).scalars().all()
+        for job_id in job_ids:
+            self._queue.put(job_id)
+        return len(job_ids)
+
+    def _work(self):
+        while True:
+            try:
+                job_id = self._queue.get(timeout=POLL_SECONDS)
+            except queue.Empty:
+                try:
+                    self._queue_claimable()
+                except Exception as e:
+                    logger.error(f"Could not look for claimable jobs: {e}", exc_info=True)
+                continue
+            try:
+                self._run(job_id)
+            except Exception as e:
+                logger.error(f"Could not run job {job_id}: {e}", exc_info=True)
+
+    def claim(self, job_id):
+        """Atomically take `job_id` for this manager; returns False if it is not claimable"""
+        now = int(time.time())
+        params = {'id': job_id, 'owner': self.owner, 'lease': now + LEASE_SECONDS, 'now': now}
+        return self.writer.run(lambda session: session.execute(CLAIM_JOB_SQL, params).rowcount) == 1
+
+    def _run(self, job_id):
+        if not self.claim(job_id):
+            return
+        with self.engine.connect() as connection:
+            row = connection.execute(text("SELECT * FROM jobs WHERE id = :id"), {'id': job_id}).first()
+
+        job = Job(self, row)
+        handler = self.handlers.get(job.kind)
+        if handler is None:
+            job.update(status='failed', error=f"Unknown job kind: {job.kind}", finished_at=int(time.time()))
+            return
+
+        try:
+            handler(job)
+        except JobLost as e:
+            logger.warning(f"Job {job.id} ({job.kind}) stopped: {e}")
+            return
+        except Exception as e:
+            logger.error(f"Job {job.id} ({job.kind}) failed: {e}", exc_info=True)
+            job.update(status='failed', error=str(e), eta_seconds=None, finished_at=int(time.time()))
+        else:
+            logger.info(f"Job {job.id} ({job.kind}) finished: {job.added} added, {job.updated} updated")
+            job.update(status='done', stage='done', eta_seconds=0, finished_at=int(time.time()))
@@ -0,0 +1,49 @@
+from datetime import date, datetime
+
+from flask.json.provider import DefaultJSONProvider
+
+# Optional fast JSON backend
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+    orjson = None
+
+def encode_default(obj):
+    """
+    Encode values the JSON backends do not handle themselves.
+    Dates and datetimes become ISO 8601 strings (Flask's default would
+    produce HTTP dates); everything else falls back to Flask's rules.
+    """
+    if isinstance(obj, (datetime, date)):
+        return obj.isoformat()
+    return DefaultJSONProvider.default(obj)
+
+class FastJSONProvider(DefaultJSONProvider):
+    """
+    JSON provider for every `jsonify` response in the app.
+
+    Uses orjson when it is installed and the stdlib encoder otherwise. Both
+    encode datetimes natively as ISO 8601, so models can hand datetimes over
+    without stringifying them first. Responses are always compact, also in
+    debug mode, to keep payloads small.
+
+    Set `backend` to 'stdlib' to force the fallback, e.g. when comparing output.
+    """
+    default = staticmethod(encode_default)
+    compact = True
+    backend = 'orjson' if ORJSON_AVAILABLE else 'stdlib'
+
+    def dumps(self, obj, **kwargs):
+        if self.backend == 'orjson' and not kwargs:
+            return orjson.dumps(obj, default=encode_default, option=orjson.OPT_NON_STR_KEYS).decode()
+        return super().dumps(obj, **kwargs)
+
+    def response(self, *args, **kwargs):
+        if self.backend != 'orjson':
+            return super().response(*args, **kwargs)
+
+        obj = self._prepare_response_obj(args, kwargs)
+        body = orjson.dumps(obj, default=encode_default, option=orjson.OPT_NON_STR_KEYS)
+        return self._app.response_class(body, mimetype=self.mimetype)
@@ -0,0 +1,267 @@
+"""
+Offline lexicon: word -> IPA, part of speech, definition and example, read
+from a compact binary file through mmap.
+
+Layout of the file (all integers little-endian):
+
+    header    magic b'FLEX', format version (u16), reserved (u16), count (u32)
+    index     count x u32 absolute offset of each record, sorted by word
+    records   five u16 field lengths, then the UTF-8 bytes of word, ipa,
+              pos, definition and example
+
+Words are stored normalized (stripped, lower case) and sorted by their UTF-8
+bytes, so a lookup is a binary search over the index that touches a handful
+of pages; nothing is loaded up front and the OS pages the file in and out.
+
+The file is built from an open dataset, the English Wiktionary extract
+published by kaikki.org (JSON lines, CC BY-SA), or from the responses already
+stored in an app database's dictionary_cache table. The lexicon shipped in
+data/ is built from data/lexicon_seed.jsonl, a few common words in the
+kaikki.org format.
+
+Usage:
+    python lexicon.py build <source.jsonl[.gz] | flashcards.db> [output]
+    python lexicon.py lookup <word> [lexicon]
+    python lexicon.py info [lexicon]
+"""
+import gzip
+import json
+import logging
+import mmap
+import os
+import sqlite3
+import struct
+import sys
+import zlib
+from collections import namedtuple
+
+logger = logging.getLogger('app.lexicon')
+
+DEFAULT_LEXICON_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'lexicon.bin')
+
+MAGIC = b'FLEX'
+FORMAT_VERSION = 1
+HEADER = struct.Struct('<4sHHI')
+OFFSET = struct.Struct('<I')
+RECORD = struct.Struct('<5H')
+
+# Longer text is cut when building; keeps every field within a u16 length
+MAX_FIELD_CHARS = 2000
+
+# Wiktionary extract POS codes, renamed to the names the app uses
+WIKTIONARY_POS = {
+    'adj': 'adjective',
+    'adv': 'adverb',
+    'prep': 'preposition',
+    'pron': 'pronoun',
+    'conj': 'conjunction',
+    'intj': 'interjection',
+    'det': 'determiner',
+    'num': 'numeral',
+    'name': 'proper noun'
+}
+
+# Part of speech pinned for specific words, over whatever the lexicon or the API says
+EXPLICIT_POS = {
+    'welcome': 'verb',  # Explicitly set 'welcome' as verb
+    'music': 'noun',
+}
+
+LexiconEntry = namedtuple('LexiconEntry', ['ipa', 'pos', 'definition', 'example'])
+
+def normalize_word(word):
+    return word.strip().lower()
+
+def explicit_pos(word, pos=''):
+    """The pinned part of speech for `word`, or `pos` when it has none"""
+    return EXPLICIT_POS.get(normalize_word(word), pos)
+
+def entry_details(word, entry):
+    """(ipa, meaning, example, pos) for a lexicon entry, as get_word_details returns them"""
+    return (entry.ipa, entry.definition or "Definition not found",
+            entry.example or "No example available", explicit_pos(word, entry.pos))
+
+class Lexicon:
+    """Read-only, memory-mapped lexicon file; safe to share between threads"""
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, 'rb') as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, version, _, count = HEADER.unpack_from(self._mmap, 0)
+        if magic != MAGIC or version != FORMAT_VERSION:
+            self._mmap.close()
+            raise ValueError(f"{path} is not a version {FORMAT_VERSION} lexicon file")
+        self.count = count
+
+    def __len__(self):
+        return self.count
+
+    def __contains__(self, word):
+        return self._find(normalize_word(word).encode('utf-8')) is not None
+
+    def lookup(self, word):
+        """Return the LexiconEntry for `word`, or None when it is not in the lexicon"""
+        offset = self._find(normalize_word(word).encode('utf-8'))
+        if offset is None:
+            return None
+
+        lengths = RECORD.unpack_from(self._mmap, offset)
+        position = offset + RECORD.size + lengths[0]
+        fields = []
+        for length in lengths[1:]:
+            fields.append(self._mmap[position:position + length].decode('utf-8'))
+            position += length
+        return LexiconEntry(*fields)
+
+    def close(self):
+        self._mmap.close()
+
+    def _find(self, key):
+        """Binary search for `key`; returns the offset of its record or None"""
+        mm = self._mmap
+        lo, hi = 0, self.count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            offset, = OFFSET.unpack_from(mm, HEADER.size + OFFSET.size * mid)
+            start = offset + RECORD.size
+            candidate = mm[start:start + RECORD.unpack_from(mm, offset)[0]]
+            if candidate < key:
+                lo = mid + 1
+            elif candidate > key:
+                hi = mid
+            else:
+                return offset
+        return None
+
+def open_lexicon(path=DEFAULT_LEXICON_PATH):
+    """Open the lexicon at `path`, or return None (and log why) when it cannot be used"""
+    if not os.path.exists(path):
+        logger.info(f"No offline lexicon at {path}; word details come from the dictionary API")
+        return None
+    try:
+        lexicon = Lexicon(path)
+    except (OSError, ValueError, struct.error) as e:
+        logger.warning(f"Could not open offline lexicon {path}: {e}")
+        return None
+    logger.info(f"Offline lexicon loaded: {len(lexicon)} words from {path}")
+    return lexicon
+
+def _field(value):
+    return (value or '').strip()[:MAX_FIELD_CHARS].encode('utf-8')
+
+def write_lexicon(entries, path):
+    """
+    Write (word, ipa, pos, definition, example) tuples to a lexicon file.
+
+    For a word given more than once, each field keeps its first non-empty
+    value. The file is written next to `path` and moved into place, so a
+    process that has the old file mapped keeps reading it undisturbed.
+
+    Returns:
+        int: number of words written
+    """
+    merged = {}
+    for word, *fields in entries:
+        key = normalize_word(word)
+        if not key:
+            continue
+        current = merged.get(key)
+        if current is None:
+            merged[key] = list(fields)
+        else:
+            merged[key] = [old or new for old, new in zip(current, fields)]
+
+    records = sorted(
+        (key.encode('utf-8'), [_field(value) for value in fields])
+        for key, fields in merged.items()
+    )
+
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    temp_path = f'{path}.tmp'
+    with open(temp_path, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, FORMAT_VERSION, 0, len(records)))
+
+        offset = HEADER.size + OFFSET.size * len(records)
+        for key, fields in records:
+            f.write(OFFSET.pack(offset))
+            offset += RECORD.size + len(key) + sum(len(value) for value in fields)
+
+        for key, fields in records:
+            f.write(RECORD.pack(len(key), *(len(value) for value in fields)))
+            f.write(key)
+            for value in fields:
+                f.write(value)
+    os.replace(temp_path, path)
+    return len(records)
+
+def read_wiktionary_jsonl(path):
+    """Yield lexicon tuples from a kaikki.org Wiktionary extract (.jsonl or .jsonl.gz)"""
+    opener = gzip.open if path.endswith('.gz') else open
+    with opener(path, 'rt', encoding='utf-8') as f:
+        for line in f:
+            item = json.loads(line)
+            word = item.get('word', '')
+            # Single English words only; imports never look up phrases
+            if item.get('lang_code', 'en') != 'en' or not word or ' ' in word:
+                continue
+
+            ipa = next((sound['ipa'] for sound in item.get('sounds', []) if sound.get('ipa')), '')
+            definition = example = ''
+            for sense in item.get('senses', []):
+                if sense.get('glosses'):
+                    # The last gloss is the most specific one for nested senses
+                    definition = sense['glosses'][-1]
+                    example = next((e['text'] for e in sense.get('examples', []) if e.get('text')), '')
+                    break
+            pos = item.get('pos', '')
+            yield word, ipa, WIKTIONARY_POS.get(pos, pos), definition, example
+
+def read_dictionary_cache(db_path):
+    """Yield lexicon tuples from the dictionary API responses cached in an app database"""
+    connection = sqlite3.connect(db_path)
+    try:
+        rows = connection.execute("SELECT word, body FROM dictionary_cache WHERE status = 200 AND body IS NOT NULL")
+        for word, body in rows:
+            for data in json.loads(zlib.decompress(body)):
+                ipa = next((p['text'] for p in data.get('phonetics', []) if p.get('text')), '')
+                for meaning in data.get('meanings', []):
+                    if meaning.get('definitions'):
+                        definition = meaning['definitions'][0]
+                        yield (word, ipa, meaning.get('partOfSpeech', ''),
+                               definition.get('definition', ''), definition.get('example', ''))
+                        break
+    finally:
+        connection.close()
+
+def main(argv):
+    command = argv[1] if len(argv) > 1 else 'info'
+
+    if command == 'build' and len(argv) > 2:
+        source = argv[2]
+        output = argv[3] if len(argv) > 3 else DEFAULT_LEXICON_PATH
+        entries = read_dictionary_cache(source) if source.endswith('.db') else read_wiktionary_jsonl(source)
+        count = write_lexicon(entries, output)
+        print(f"Wrote {count} words to {output} ({os.path.getsize(output)} bytes)")
+        return 0
+
+    if command == 'lookup' and len(argv) > 2:
+        lexicon = Lexicon(argv[3] if len(argv) > 3 else DEFAULT_LEXICON_PATH)
+        entry = lexicon.lookup(argv[2])
+        print(dict(entry._asdict()) if entry else f"'{argv[2]}' is not in the lexicon")
+        return 0 if entry else 1
+
+    if command == 'info':
+        path = argv[2] if len(argv) > 2 else DEFAULT_LEXICON_PATH
+        lexicon = Lexicon(path)
+        print(f"{path}: {len(lexicon)} words, {os.path.getsize(path)} bytes")
+        return 0
+
+    print(__doc__)
+    return 1
+
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.INFO)
+    sys.exit(main(sys.argv))
@@ -2,31 +2,7 @@ import sys
 import os
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
-from sqlalchemy import Column, String, inspect, text
-from sqlalchemy.exc import OperationalError, SQLAlchemyError
-from app import SessionLocal, Card, datetime, Base, engine
-
-def add_pos_column():
-    """Add pos column to existing database"""
-    try:
-        inspector = inspect(engine)
-        
-        # Check if column exists
-        columns = [col['name'] for col in inspector.get_columns('cards')]
-        
-        if 'pos' not in columns:
-            print("Adding 'pos' column to cards table...")
-            
-            # Use text() to create an executable SQL statement
-            with engine.begin() as connection:
-                connection.execute(text("ALTER TABLE cards ADD COLUMN pos VARCHAR(50)"))
-            
-            print("'pos' column added successfully!")
-    except SQLAlchemyError as e:
-        print(f"Error adding column: {e}")
-        # If column already exists, ignore the error
-        if "duplicate column" not in str(e).lower():
-            raise
+from app import SessionLocal, Card
 
 def infer_pos(word):
     """
@@ -93,8 +69,7 @@ def infer_pos(word):
     return 'noun'
 
 def migrate_pos():
-    add_pos_column()
-    
+    # The pos column itself is added by migration 1 (see migrations.py)
     session = SessionLocal()
     try:
         # Find cards without POS
@@ -0,0 +1,349 @@
+"""
+Versioned schema migrations for the flashcard databases.
+
+The schema version of a database file is kept in `PRAGMA user_version`.
+Migration N brings a database from version N-1 to N; it runs in one
+transaction together with the version bump, so a failed migration leaves
+the database at the previous version. run_migrations() is called once per
+process, when the engine registry in models.py opens a database; requests
+never inspect the schema.
+
+The first migrations describe objects that used to be created ad hoc at
+startup, so they also work on databases that already contain them.
+
+There are two kinds of database: the deck (cards and everything built on
+them) and the user database (accounts, achievements, learning progress).
+Both share one version sequence, but each migration only changes the kinds
+it was registered for; the others just move to the next version.
+
+Usage:
+    python migrations.py status [db_path] [deck|user]
+    python migrations.py upgrade [db_path] [deck|user]
+"""
+import logging
+import sys
+
+from sqlalchemy import create_engine, text
+
+from models import (
+    Card, ReviewReceipt, User, Achievement, LearningProgress, DECK_SCHEMA, USER_SCHEMA
+)
+from card_search import CARD_SEARCH_DDL, rebuild_card_search
+from review_log import REVIEW_EVENTS_DDL
+from dictionary_cache import DICTIONARY_CACHE_DDL
+from jobs import JOBS_DDL
+from sqlite_tuning import install_sqlite_tuning
+
+logger = logging.getLogger('app.migrations')
+
+# (version, description, {schema: function taking a connection}), in order
+MIGRATIONS = []
+
+# ORM tables created in each kind of database
+SCHEMA_TABLES = {
+    DECK_SCHEMA: [Card.__table__, ReviewReceipt.__table__],
+    USER_SCHEMA: [User.__table__, Achievement.__table__, LearningProgress.__table__]
+}
+
+# SQL expression for the current time in the format SQLAlchemy stores DateTime
+# columns in ('YYYY-MM-DD HH:MM:SS.ffffff'; SQLite's %f only has milliseconds),
+# so timestamps written by triggers compare correctly as text with the others
+SQL_NOW = "strftime('%Y-%m-%d %H:%M:%f', 'now') || '000'"
+
+def migration(version, description, schema=DECK_SCHEMA):
+    """
+    Register the decorated function as the migration to `version` for one
+    kind of database; a version may be registered once per kind.
+    """
+    def register(function):
+        if MIGRATIONS and MIGRATIONS[-1][0] == version:
+            MIGRATIONS[-1][2][schema] = function
+        else:
+            assert version == len(MIGRATIONS) + 1, f"Migration {version} registered out of order"
+            MIGRATIONS.append((version, description, {schema: function}))
+        return function
+    return register
+
+def get_schema_version(connection):
+    """Return the schema version stored in the database file"""
+    return connection.execute(text("PRAGMA user_version")).scalar()
+
+def latest_version():
+    return MIGRATIONS[-1][0] if MIGRATIONS else 0
+
+def get_columns(connection, table):
+    return {row[1] for row in connection.execute(text(f"PRAGMA table_info({table})"))}
+
+def run_migrations(engine, schema=DECK_SCHEMA):
+    """
+    Apply the pending migrations for a `schema` database in order.
+
+    Returns:
+        list: Versions applied by this call (empty when the schema is current)
+    """
+    with engine.connect() as connection:
+        if get_schema_version(connection) >= latest_version():
+            return []
+
+    applied = []
+    for version, description, functions in MIGRATIONS:
+        function = functions.get(schema)
+        with engine.begin() as connection:
+            # Take the write lock before re-reading the version, so processes
+            # starting at the same time apply each migration only once
+            connection.execute(text("BEGIN IMMEDIATE"))
+            if get_schema_version(connection) >= version:
+                continue
+            if function is not None:
+                function(connection)
+            connection.execute(text(f"PRAGMA user_version = {version}"))
+        if function is not None:
+            logger.info(f"Applied migration {version} to {schema} database: {description}")
+            applied.append(version)
+    return applied
+
+@migration(1, "Base tables and legacy columns")
+def create_deck_tables(connection):
+    Card.metadata.create_all(bind=connection, tables=SCHEMA_TABLES[DECK_SCHEMA])
+    if 'pos' not in get_columns(connection, 'cards'):
+        connection.execute(text("ALTER TABLE cards ADD COLUMN pos VARCHAR(50)"))
+
+@migration(1, "Base tables and legacy columns", schema=USER_SCHEMA)
+def create_user_tables(connection):
+    User.metadata.create_all(bind=connection, tables=SCHEMA_TABLES[USER_SCHEMA])
+    if 'updated_at' not in get_columns(connection, 'users'):
+        connection.execute(text("ALTER TABLE users ADD COLUMN updated_at DATETIME"))
+        connection.execute(text("UPDATE users SET updated_at = created_at"))
+
+# Per-box card counters maintained by triggers on the cards table.
+# Cards with a NULL box_number are counted under box -1 so the total stays exact.
+BOX_COUNTER_DDL = [
+    '''
+    CREATE TABLE IF NOT EXISTS box_counters (
+        box_number INTEGER PRIMARY KEY,
+        count INTEGER NOT NULL DEFAULT 0
+    )
+    ''',
+    '''
+    CREATE TRIGGER IF NOT EXISTS cards_box_counter_insert AFTER INSERT ON cards
+    BEGIN
+        INSERT INTO box_counters (box_number, count) VALUES (IFNULL(NEW.box_number, -1), 1)
+        ON CONFLICT(box_number) DO UPDATE SET count = count + 1;
+    END
+    ''',
+    '''
+    CREATE TRIGGER IF NOT EXISTS cards_box_counter_update AFTER UPDATE OF box_number ON cards
+    WHEN OLD.box_number IS NOT NEW.box_number
+    BEGIN
+        UPDATE box_counters SET count = count - 1 WHERE box_number = IFNULL(OLD.box_number, -1);
+        INSERT INTO box_counters (box_number, count) VALUES (IFNULL(NEW.box_number, -1), 1)
+        ON CONFLICT(box_number) DO UPDATE SET count = count + 1;
+    END
+    ''',
+    '''
+    CREATE TRIGGER IF NOT EXISTS cards_box_counter_delete AFTER DELETE ON cards
+    BEGIN
+        UPDATE box_counters SET count = count - 1 WHERE box_number = IFNULL(OLD.box_number, -1);
+    END
+    '''
+]
+
+def rebuild_box_counters(connection):
+    """Recompute all box counters with a single GROUP BY pass over cards"""
+    connection.execute(text("DELETE FROM box_counters"))
+    connection.execute(text('''
+        INSERT INTO box_counters (box_number, count)
+        SELECT IFNULL(box_number, -1), COUNT(*) FROM cards GROUP BY IFNULL(box_number, -1)
+    '''))
+
+@migration(2, "Per-box card counters")
+def create_box_counters(connection):
+    for statement in BOX_COUNTER_DDL:
+        connection.execute(text(statement))
+    rebuild_box_counters(connection)
+
+# Due-queue schema: a composite index for "what is due now" queries and a trigger
+# that gives cards inserted by raw SQL (add_flashcard.py, importers) a next_review,
+# so due cards can be found with a plain range scan instead of `OR next_review IS NULL`.
+DUE_QUEUE_DDL = [
+    "CREATE INDEX IF NOT EXISTS ix_cards_next_review_box ON cards (next_review, box_number)",
+    '''
+    CREATE TRIGGER IF NOT EXISTS cards_next_review_default AFTER INSERT ON cards
+    WHEN NEW.next_review IS NULL
+    BEGIN
+        UPDATE cards SET next_review = IFNULL(NEW.created_at, ''' + SQL_NOW + ''') WHERE id = NEW.id;
+    END
+    '''
+]
+
+@migration(3, "Due-queue index and next_review default")
+def create_due_queue(connection):
+    for statement in DUE_QUEUE_DDL:
+        connection.execute(text(statement))
+    # Cards with a NULL next_review are due from their creation time
+    connection.execute(text(
+        f"UPDATE cards SET next_review = IFNULL(created_at, {SQL_NOW}) WHERE next_review IS NULL"
+    ))
+
+# Deck data version: a single counter bumped by triggers on every insert, update
+# and delete of a card, including writes made outside this process. Caches keyed
+# on it are invalidated by the next write to cards.
+#
+# The same triggers stamp each changed card with the new version (cards.sync_version)
+# and log deleted cards in card_deletions, so /api/cards/changes can send a client
+# everything that changed after the version its copy was loaded at. Stamping a card
+# is itself an update, which the update trigger skips through its WHEN clause.
+DECK_VERSION_TRIGGERS = ('cards_version_insert', 'cards_version_update', 'cards_version_delete')
+
+DECK_VERSION_DDL = [
+    '''
+    CREATE TABLE IF NOT EXISTS deck_version (
+        id INTEGER PRIMARY KEY CHECK (id = 1),
+        version INTEGER NOT NULL
+    )
+    ''',
+    "INSERT OR IGNORE INTO deck_version (id, version) VALUES (1, 0)",
+    '''
+    CREATE TABLE IF NOT EXISTS card_deletions (
+        card_id INTEGER PRIMARY KEY,
+        version INTEGER NOT NULL
+    )
+    ''',
+    "CREATE INDEX IF NOT EXISTS ix_card_deletions_version ON card_deletions (version)",
+    "CREATE INDEX IF NOT EXISTS ix_cards_sync_version ON cards (sync_version)",
+    '''
+    CREATE TRIGGER IF NOT EXISTS cards_version_insert AFTER INSERT ON cards
+    BEGIN
+        UPDATE deck_version SET version = version + 1 WHERE id = 1;
+        UPDATE cards SET sync_version = (SELECT version FROM deck_version WHERE id = 1) WHERE id = NEW.id;
+        DELETE FROM card_deletions WHERE card_id = NEW.id;
+    END
+    ''',
+    '''
+    CREATE TRIGGER IF NOT EXISTS cards_version_update AFTER UPDATE ON cards
+    WHEN NEW.sync_version IS OLD.sync_version OR NEW.sync_version IS NULL
+    BEGIN
+        UPDATE deck_version SET version = version + 1 WHERE id = 1;
+        UPDATE cards SET sync_version = (SELECT version FROM deck_version WHERE id = 1) WHERE id = NEW.id;
+    END
+    ''',
+    '''
+    CREATE TRIGGER IF NOT EXISTS cards_version_delete AFTER DELETE ON cards
+    BEGIN
+        UPDATE deck_version SET version = version + 1 WHERE id = 1;
+        INSERT OR REPLACE INTO card_deletions (card_id, version)
+        VALUES (OLD.id, (SELECT version FROM deck_version WHERE id = 1));
+    END
+    '''
+]
+
+@migration(4, "Deck version, card sync versions and deletion log")
+def create_deck_version(connection):
+    if 'sync_version' not in get_columns(connection, 'cards'):
+        connection.execute(text("ALTER TABLE cards ADD COLUMN sync_version INTEGER"))
+
+    # Triggers from older versions only bumped the counter; recreate them
+    for trigger in DECK_VERSION_TRIGGERS:
+        connection.execute(text(f"DROP TRIGGER IF EXISTS {trigger}"))
+    for statement in DECK_VERSION_DDL:
+        connection.execute(text(statement))
+
+    connection.execute(text(
+        "UPDATE cards SET sync_version = (SELECT version FROM deck_version WHERE id = 1) "
+        "WHERE sync_version IS NULL"
+    ))
+
+@migration(5, "Full-text card search")
+def create_card_search(connection):
+    for statement in CARD_SEARCH_DDL:
+        connection.execute(text(statement))
+    rebuild_card_search(connection)
+
+@migration(6, "Review event log")
+def create_review_events(connection):
+    for statement in REVIEW_EVENTS_DDL:
+        connection.execute(text(statement))
+
+@migration(7, "Indexes for profile and lapse queries")
+def create_lapse_index(connection):
+    # count_lapses() only reads failed reviews
+    connection.execute(text(
+        "CREATE INDEX IF NOT EXISTS ix_review_events_lapses ON review_events (card_id) WHERE outcome = 0"
+    ))
+
+@migration(7, "Indexes for profile and lapse queries", schema=USER_SCHEMA)
+def create_profile_indexes(connection):
+    # Recent achievements on /user_profile
+    connection.execute(text(
+        "CREATE INDEX IF NOT EXISTS ix_achievements_user_date ON achievements (user_id, date_earned)"
+    ))
+    connection.execute(text(
+        "CREATE INDEX IF NOT EXISTS ix_learning_progress_user_date ON learning_progress (user_id, session_date)"
+    ))
+
+@migration(8, "Dictionary lookup cache")
+def create_dictionary_cache(connection):
+    for statement in DICTIONARY_CACHE_DDL:
+        connection.execute(text(statement))
+
+@migration(9, "Background jobs")
+def create_jobs(connection):
+    for statement in JOBS_DDL:
+        connection.execute(text(statement))
+
+CARD_DATETIME_COLUMNS = ('next_review', 'last_reviewed', 'created_at', 'updated_at')
+
+@migration(10, "Microsecond timestamps on cards")
+def normalize_card_timestamps(connection):
+    # The next_review default used to write CURRENT_TIMESTAMP ('YYYY-MM-DD HH:MM:SS')
+    connection.execute(text("DROP TRIGGER IF EXISTS cards_next_review_default"))
+    for statement in DUE_QUEUE_DDL:
+        connection.execute(text(statement))
+
+    # Values without fractional seconds sort before equal ones that have them,
+    # and break text comparisons such as the due-queue cursor. Padding keeps the
+    # same instants, so the version trigger is left out: it would bump
+    # deck_version once per row and make every client reload the whole deck
+    connection.execute(text("DROP TRIGGER IF EXISTS cards_version_update"))
+    for column in CARD_DATETIME_COLUMNS:
+        connection.execute(text(
+            f"UPDATE cards SET {column} = {column} || '.000000' WHERE length({column}) = 19"
+        ))
+    for statement in DECK_VERSION_DDL:
+        connection.execute(text(statement))
+
+@migration(11, "Job leases")
+def add_job_leases(connection):
+    # The worker that claimed a running job, and until when (epoch seconds) it holds it
+    columns = get_columns(connection, 'jobs')
+    if 'owner' not in columns:
+        connection.execute(text("ALTER TABLE jobs ADD COLUMN owner TEXT"))
+    if 'lease_expires' not in columns:
+        connection.execute(text("ALTER TABLE jobs ADD COLUMN lease_expires INTEGER"))
+
+def main(argv):
+    command = argv[1] if len(argv) > 1 else 'status'
+    db_path = argv[2] if len(argv) > 2 else 'flashcards.db'
+    schema = argv[3] if len(argv) > 3 else DECK_SCHEMA
+    if command not in ('status', 'upgrade') or schema not in SCHEMA_TABLES:
+        print(__doc__)
+        return 1
+
+    engine = install_sqlite_tuning(create_engine(f'sqlite:///{db_path}'))
+    if command == 'upgrade':
+        applied = run_migrations(engine, schema)
+        print(f"Applied {len(applied)} migration(s)")
+
+    with engine.connect() as connection:
+        current = get_schema_version(connection)
+    print(f"{db_path} ({schema} database): schema version {current} of {latest_version()}")
+    for version, description, functions in MIGRATIONS:
+        if schema not in functions:
+            continue
+        state = 'applied' if version <= current else 'pending'
+        print(f"  {version:>3}  {state:<8} {description}")
+    return 0
+
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.INFO)
+    sys.exit(main(sys.argv))
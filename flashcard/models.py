@@ -4,12 +4,16 @@ import hashlib
 import uuid
 import re
 import os
+import threading
 
 from sqlalchemy import Column, Integer, String, Text, DateTime, Float, ForeignKey
-from sqlalchemy.orm import declarative_base, relationship
+from sqlalchemy.orm import declarative_base, relationship, column_property
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import QueuePool
+
+from sqlite_tuning import install_sqlite_tuning
 
 # Sử dụng declarative_base() cho SQLAlchemy 2.0
 Base = declarative_base()
@@ -93,16 +97,100 @@ class LearningProgress(Base):
     # Relationship with User
     user = relationship('User', back_populates='learning_progress')
 
+class Card(Base):
+    """Database model for flashcards with spaced repetition"""
+    __tablename__ = 'cards'
+    
+    id = Column(Integer, primary_key=True)
+    # active_history: a rename always records the previous word, even when it was not
+    # loaded, so word_index.track_card_changes can drop it from the index
+    word = column_property(Column(String(100), nullable=False, index=True, unique=True), active_history=True)
+    meaning = Column(Text, nullable=False)
+    example = Column(Text)
+    ipa = Column(String(100))
+    pos = Column(String(50))  # New column for Part of Speech
+    box_number = Column(Integer, default=0)  # New column
+    last_reviewed = Column(DateTime)         # New column
+    next_review = Column(DateTime, default=datetime.utcnow)  # Never NULL: new cards are due immediately
+    created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    sync_version = Column(Integer)  # Deck version of the last change, stamped by triggers in migrations.py
+    
+    def to_dict(self):
+        """
+        Convert card to dictionary for JSON serialization.
+        Datetimes are left as-is; the app's JSON provider encodes them as ISO 8601.
+        """
+        return {
+            'id': self.id,
+            'word': self.word,
+            'meaning': self.meaning,
+            'example': self.example,
+            'ipa': self.ipa,
+            'pos': self.pos,  # Include POS in dictionary
+            'box_number': self.box_number,
+            'last_reviewed': self.last_reviewed,
+            'next_review': self.next_review,
+            'created_at': self.created_at,
+            'updated_at': self.updated_at
+        }
+
+class ReviewReceipt(Base):
+    """Client review ids that have already been applied, so batch retries are idempotent"""
+    __tablename__ = 'review_receipts'
+
+    client_review_id = Column(String(64), primary_key=True)
+    card_id = Column(Integer, nullable=False)
+    applied_at = Column(DateTime, default=datetime.utcnow)
+
+# Database used by UserModel unless another path is given
+USER_DB_PATH = '../flashcards.db'
+
+# Kinds of database, each with its own tables; see migrations.py
+DECK_SCHEMA = 'deck'    # Cards, reviews and everything built on them
+USER_SCHEMA = 'user'    # Accounts, achievements and learning progress
+
+# Engine and session factory per database file, shared by the whole process
+_engine_registry = {}
+_engine_registry_lock = threading.Lock()
+
+def _registered(db_path, schema):
+    key = os.path.abspath(db_path)
+    with _engine_registry_lock:
+        entry = _engine_registry.get(key)
+        if entry is not None and entry[2] != schema:
+            raise ValueError(f"{db_path} is already open as a {entry[2]} database")
+        if entry is None:
+            engine = install_sqlite_tuning(create_engine(
+                f'sqlite:///{db_path}',
+                connect_args={'check_same_thread': False},  # Shared by request threads
+                poolclass=QueuePool,  # Keep tuned connections open instead of reconnecting per session
+                pool_recycle=3600,
+                pool_pre_ping=True,
+                echo=False
+            ))
+            # The schema is migrated once per process, never on the request path
+            from migrations import run_migrations
+            run_migrations(engine, schema)
+            session_factory = sessionmaker(bind=engine, autocommit=False, autoflush=False)
+            entry = _engine_registry[key] = (engine, session_factory, schema)
+        return entry
+
+def get_engine(db_path=USER_DB_PATH, schema=USER_SCHEMA):
+    """Return the process-wide engine for a `schema` database file, creating it on first use"""
+    return _registered(db_path, schema)[0]
+
+def get_session_factory(db_path=USER_DB_PATH, schema=USER_SCHEMA):
+    """Return the process-wide session factory for a `schema` database file"""
+    return _registered(db_path, schema)[1]
+
 class UserModel:
-    def __init__(self, db_path='../flashcards.db'):
+    def __init__(self, db_path=USER_DB_PATH):
         self.db_path = db_path
         
-        # Tạo engine và session
-        self.engine = create_engine(f'sqlite:///{self.db_path}', echo=False)
-        self.SessionLocal = sessionmaker(bind=self.engine, autocommit=False, autoflush=False)
-        
-        # Tạo bảng nếu chưa tồn tại
-        Base.metadata.create_all(bind=self.engine)
+        # Engine và session dùng chung cho cả process (tạo bảng một lần duy nhất)
+        self.engine = get_engine(self.db_path)
+        self.SessionLocal = get_session_factory(self.db_path)
     
     def _get_connection(self):
         """Tạo session database"""
@@ -0,0 +1,226 @@
+import logging
+import threading
+import atexit
+from datetime import datetime
+
+from sqlalchemy import text, bindparam, DateTime
+
+logger = logging.getLogger('app.review_log')
+
+# Append-only history of every review. Columns are kept as small integers:
+# reviewed_at is a UTC epoch timestamp and outcome is 1 (correct) or 0 (wrong).
+REVIEW_EVENTS_DDL = [
+    '''
+    CREATE TABLE IF NOT EXISTS review_events (
+        id INTEGER PRIMARY KEY,
+        card_id INTEGER NOT NULL,
+        user_id INTEGER NOT NULL,
+        reviewed_at INTEGER NOT NULL,
+        outcome INTEGER NOT NULL,
+        old_box INTEGER NOT NULL,
+        new_box INTEGER NOT NULL
+    )
+    ''',
+    "CREATE INDEX IF NOT EXISTS ix_review_events_card ON review_events (card_id, reviewed_at)"
+]
+
+INSERT_EVENT_SQL = text('''
+    INSERT INTO review_events (card_id, user_id, reviewed_at, outcome, old_box, new_box)
+    VALUES (:card_id, :user_id, :reviewed_at, :outcome, :old_box, :new_box)
+''')
+
+UPDATE_CARD_SQL = text('''
+    UPDATE cards
+    SET box_number = :box_number, last_reviewed = :last_reviewed, next_review = :next_review,
+        updated_at = :updated_at
+    WHERE id = :card_id
+''').bindparams(
+    bindparam('last_reviewed', type_=DateTime),
+    bindparam('next_review', type_=DateTime),
+    bindparam('updated_at', type_=DateTime)
+)
+
+def to_epoch(value):
+    """Convert a naive UTC datetime to an integer epoch timestamp"""
+    return int((value - datetime(1970, 1, 1)).total_seconds())
+
+def event_params(card_id, user_id, reviewed_at, correct, old_box, new_box):
+    """Build the bind parameters for one review_events row"""
+    return {
+        'card_id': card_id,
+        'user_id': user_id,
+        'reviewed_at': to_epoch(reviewed_at),
+        'outcome': 1 if correct else 0,
+        'old_box': old_box,
+        'new_box': new_box
+    }
+
+class ReviewEventWriter:
+    """
+    Write-behind buffer for review events.
+
+    Reviews are recorded in memory and a background thread flushes them every
+    `flush_interval_ms` milliseconds, or as soon as `max_events` are pending.
+    A flush hands one mutation to the database writer that inserts the events
+    with executemany and applies the resulting card state in the same
+    transaction.
+
+    review() reads a card's state from the buffer on top of the database, so
+    answers are scheduled from the latest box and lapse count, and overlay()
+    applies the buffered state to cards read from the database. Reads never
+    flush: counts and sync versions catch up within one flush interval.
+    """
+
+    def __init__(self, db_writer, flush_interval_ms=200, max_events=100):
+        self.db_writer = db_writer
+        self.flush_interval = flush_interval_ms / 1000.0
+        self.max_events = max_events
+
+        self._events = []
+        self._card_state = {}   # card_id -> (sequence, state dict, lapse count)
+        self._sequence = 0
+        self._flushes = 0       # Flushes committed so far
+        self._condition = threading.Condition()
+        self._flush_lock = threading.Lock()
+        self._stopped = False
+
+        self._thread = threading.Thread(target=self._run, name='review-event-writer', daemon=True)
+        self._thread.start()
+        atexit.register(self.stop)
+
+    def _record(self, card_id, user_id, reviewed_at, correct, old_box, new_box, next_review, lapses):
+        """Buffer one review; the caller holds the condition"""
+        self._sequence += 1
+        self._events.append(event_params(card_id, user_id, reviewed_at, correct, old_box, new_box))
+        self._card_state[card_id] = (self._sequence, {
+            'card_id': card_id,
+            'box_number': new_box,
+            'last_reviewed': reviewed_at,
+            'next_review': next_review,
+            'updated_at': reviewed_at
+        }, lapses)
+        if len(self._events) >= self.max_events:
+            self._condition.notify()
+
+    def review(self, card_id, user_id, reviewed_at, correct, load, schedule):
+        """
+        Apply one answer to the card's latest state and buffer it.
+
+        `load(card_id)` reads (card dict, lapse count) from the database, or
+        (None, 0) when the card does not exist; `schedule(box_number, correct,
+        reviewed_at, lapses)` returns (new_box, next_review).
+
+        The card is read without holding any lock, so reviews never wait for a
+        flush to commit. A card with buffered reviews is scheduled from its
+        buffered box and lapses; the buffer keeps them until their flush has
+        committed. Otherwise the database is used, unless a flush committed
+        while it was read (it may have written this card), in which case the
+        card is read again. Scheduling and buffering happen under one lock, so
+        two reviews of one card never start from the same state.
+
+        Returns:
+            dict: The card as updated by the review, or None if it does not exist
+        """
+        while True:
+            with self._condition:
+                flushes = self._flushes
+            card, lapses = load(card_id)
+            if card is None:
+                return None
+
+            with self._condition:
+                entry = self._card_state.get(card_id)
+                if entry is None and self._flushes != flushes:
+                    continue
+                if entry is not None:
+                    box_number, lapses = entry[1]['box_number'], entry[2]
+                else:
+                    box_number = card['box_number']
+
+                new_box, next_review = schedule(box_number, correct, reviewed_at, lapses)
+                if not correct:
+                    lapses += 1
+                self._record(card_id, user_id, reviewed_at, correct, box_number or 0, new_box, next_review, lapses)
+
+            return dict(card, box_number=new_box, last_reviewed=reviewed_at,
+                        next_review=next_review, updated_at=reviewed_at)
+
+    def pending_sequence(self):
+        """Sequence number of the newest buffered review, or None when nothing is buffered"""
+        with self._condition:
+            if not self._card_state:
+                return None
+            return max(entry[0] for entry in self._card_state.values())
+
+    def overlay(self, cards):
+        """
+        Apply buffered reviews to serialized cards read from the database (see
+        card_reads.CardProjection), in place. Only the keys a card already has
+        are replaced; datetimes are given in the same ISO 8601 form.
+
+        Returns:
+            list: `cards`
+        """
+        with self._condition:
+            if not self._card_state:
+                return cards
+            states = {card_id: entry[1] for card_id, entry in self._card_state.items()}
+
+        for card in cards:
+            state = states.get(card.get('id'))
+            if state is None:
+                continue
+            for name in ('box_number', 'last_reviewed', 'next_review', 'updated_at'):
+                if name in card:
+                    value = state[name]
+                    card[name] = value if name == 'box_number' else value.strftime('%Y-%m-%dT%H:%M:%S.%f')
+        return cards
+
+    def flush(self):
+        """Write all buffered events and card updates in a single transaction"""
+        with self._flush_lock:
+            with self._condition:
+                if not self._events:
+                    return 0
+                events = self._events
+                states = {card_id: entry[:2] for card_id, entry in self._card_state.items()}
+                self._events = []
+
+            def write(session):
+                session.execute(INSERT_EVENT_SQL, events)
+                session.execute(UPDATE_CARD_SQL, [state for _, state in states.values()])
+
+            try:
+                self.db_writer.run(write)
+            except Exception as e:
+                # Put the events back in front of anything recorded meanwhile and retry later
+                logger.error(f"Error flushing {len(events)} review events: {e}")
+                with self._condition:
+                    self._events = events + self._events
+                return 0
+
+            with self._condition:
+                # Only forget states that were not overwritten by a newer review
+                for card_id, (sequence, _) in states.items():
+                    current = self._card_state.get(card_id)
+                    if current and current[0] == sequence:
+                        del self._card_state[card_id]
+                self._flushes += 1
+            return len(events)
+
+    def stop(self):
+        """Stop the background thread and flush whatever is still buffered"""
+        with self._condition:
+            self._stopped = True
+            self._condition.notify()
+        self._thread.join(timeout=5)
+        self.flush()
+
+    def _run(self):
+        while True:
+            with self._condition:
+                if not self._stopped and len(self._events) < self.max_events:
+                    self._condition.wait(self.flush_interval)
+                if self._stopped:
+                    return
+            self.flush()
@@ -0,0 +1,203 @@
+import logging
+import os
+import time
+from abc import ABC, abstractmethod
+from datetime import timedelta
+
+import numpy as np
+
+logger = logging.getLogger('app.schedulers')
+
+SECONDS_PER_DAY = 86400
+MAX_BOX = 5
+
+# Spaced repetition intervals (in days) for each box
+BOX_INTERVALS = {
+    0: 0,      # New words (review immediately)
+    1: 1,      # First review after 1 day
+    2: 3,      # Second review after 3 days
+    3: 10,     # Third review after 10 days
+    4: 30,     # Fourth review after 30 days
+    5: 90      # Fifth review after 90 days
+}
+
+class Scheduler(ABC):
+    """
+    Base class for review schedulers.
+
+    Every scheduler moves cards between the same boxes (one box up on a correct
+    answer, back to box 1 on a wrong one) and only differs in how long it waits
+    before the next review. `interval_days` works on NumPy arrays so a whole deck
+    can be rescheduled in one vectorized pass; single reviews use the same code.
+    """
+    name = None
+    uses_lapses = False  # Whether the interval depends on the card's number of failed reviews
+
+    def next_box(self, box_number, correct):
+        """Return the box a card moves to after an answer"""
+        box_number = box_number or 0
+        if correct:
+            return min(box_number + 1, MAX_BOX)
+        return 1
+
+    @abstractmethod
+    def interval_days(self, box_numbers, lapses):
+        """Return the review interval in days for arrays of boxes and lapse counts"""
+
+    def box_intervals(self):
+        """Return the interval in days after moving into each box, for a card without lapses"""
+        boxes = np.arange(MAX_BOX + 1)
+        return [float(days) for days in self.interval_days(boxes, np.zeros_like(boxes))]
+
+    def schedule(self, box_number, correct, reviewed_at, lapses=0):
+        """Return the new box number and next review date after answering a card"""
+        new_box = self.next_box(box_number, correct)
+        if not correct:
+            lapses += 1
+        days = float(self.interval_days(np.array([new_box]), np.array([lapses]))[0])
+        return new_box, reviewed_at + timedelta(days=days)
+
+class LeitnerScheduler(Scheduler):
+    """Fixed intervals per box, taken from BOX_INTERVALS"""
+    name = 'leitner'
+
+    def __init__(self, intervals=None):
+        intervals = intervals or BOX_INTERVALS
+        self._intervals = np.array([intervals[box] for box in range(MAX_BOX + 1)], dtype=np.float64)
+
+    def interval_days(self, box_numbers, lapses):
+        return self._intervals[np.clip(box_numbers, 0, MAX_BOX)]
+
+class EaseFactorScheduler(Scheduler):
+    """
+    SM-2 style scheduler. The interval grows geometrically with the box number
+    using an ease factor that starts at `initial_ease` and drops by `lapse_penalty`
+    for every failed review, so hard cards come back sooner and easy cards are
+    reviewed far less often than with fixed Leitner intervals.
+    """
+    name = 'sm2'
+    uses_lapses = True
+
+    def __init__(self, initial_ease=2.5, min_ease=1.3, lapse_penalty=0.2,
+                 first_interval=1.0, second_interval=6.0):
+        self.initial_ease = initial_ease
+        self.min_ease = min_ease
+        self.lapse_penalty = lapse_penalty
+        self.first_interval = first_interval
+        self.second_interval = second_interval
+
+    def interval_days(self, box_numbers, lapses):
+        box_numbers = np.asarray(box_numbers, dtype=np.float64)
+        ease = np.clip(self.initial_ease - self.lapse_penalty * np.asarray(lapses, dtype=np.float64),
+                       self.min_ease, self.initial_ease)
+        days = self.second_interval * np.power(ease, np.maximum(box_numbers - 2, 0))
+        days = np.where(box_numbers == 1, self.first_interval, days)
+        return np.where(box_numbers <= 0, 0.0, days)
+
+SCHEDULERS = {
+    LeitnerScheduler.name: LeitnerScheduler(),
+    EaseFactorScheduler.name: EaseFactorScheduler()
+}
+
+def get_scheduler(name=None):
+    """
+    Look up a scheduler by name. Defaults to the FLASHCARD_SCHEDULER
+    environment variable, then to the Leitner scheduler.
+    """
+    name = name or os.environ.get('FLASHCARD_SCHEDULER', LeitnerScheduler.name)
+    if name not in SCHEDULERS:
+        raise ValueError(f"Unknown scheduler '{name}', expected one of: {', '.join(SCHEDULERS)}")
+    return SCHEDULERS[name]
+
+# Per-card inputs for a bulk reschedule. Timestamps are converted to epoch
+# seconds by SQLite so NumPy never has to parse datetime strings.
+RESCHEDULE_SELECT_SQL = '''
+    SELECT c.id, IFNULL(c.box_number, 0), CAST(strftime('%s', c.last_reviewed) AS INTEGER),
+           IFNULL(l.lapses, 0)
+    FROM cards c
+    LEFT JOIN (
+        SELECT card_id, COUNT(*) AS lapses FROM review_events WHERE outcome = 0 GROUP BY card_id
+    ) l ON l.card_id = c.id
+    WHERE c.last_reviewed IS NOT NULL
+'''
+
+# Timestamps are written in the format SQLAlchemy stores DateTime columns in
+# ('YYYY-MM-DD HH:MM:SS.ffffff'; SQLite's %f only has milliseconds), so they
+# compare correctly as text with the rest of the column
+RESCHEDULE_UPDATE_SQL = '''
+    UPDATE cards
+    SET next_review = strftime('%Y-%m-%d %H:%M:%f', ?, 'unixepoch') || '000',
+        updated_at = strftime('%Y-%m-%d %H:%M:%f', 'now') || '000'
+    WHERE id = ?
+'''
+
+def reschedule(engine, scheduler):
+    """
+    Recompute next_review for every reviewed card with the given scheduler.
+    Cards that were never reviewed keep their next_review (they are due already).
+
+    Returns:
+        int: Number of cards rescheduled
+    """
+    started = time.perf_counter()
+    with engine.begin() as connection:
+        rows = connection.exec_driver_sql(RESCHEDULE_SELECT_SQL).fetchall()
+        if not rows:
+            return 0
+
+        data = np.array(rows, dtype=np.int64)
+        card_ids, boxes, last_reviewed, lapses = data.T
+        next_review = last_reviewed + np.rint(
+            scheduler.interval_days(boxes, lapses) * SECONDS_PER_DAY
+        ).astype(np.int64)
+
+        connection.exec_driver_sql(
+            RESCHEDULE_UPDATE_SQL,
+            list(zip(next_review.tolist(), card_ids.tolist()))
+        )
+
+    logger.info(
+        f"Rescheduled {len(rows)} cards with '{scheduler.name}' "
+        f"in {time.perf_counter() - started:.2f}s"
+    )
+    return len(rows)
+
+# Cards due within the horizon, bucketed by day offset from today and box.
+# Overdue cards are counted as due today. The range filter and both grouping
+# columns are covered by ix_cards_next_review_box.
+FORECAST_SELECT_SQL = '''
+    SELECT MAX(CAST(julianday(date(next_review)) - julianday(date('now')) AS INTEGER), 0) AS day_offset,
+           IFNULL(box_number, 0) AS box, COUNT(*)
+    FROM cards
+    WHERE next_review < date('now', ?)
+    GROUP BY day_offset, box
+'''
+
+def forecast(connection, scheduler, days):
+    """
+    Project how many reviews come due on each of the next `days` days.
+
+    Cards are grouped by (due day, box) in SQL, then every group is walked
+    forward assuming each review is answered correctly: it is counted on its
+    due day, promoted one box and rescheduled with the scheduler's interval,
+    until it falls outside the horizon. Lapses are not projected.
+
+    Returns:
+        numpy.ndarray: Number of reviews due per day, index 0 is today
+    """
+    due = np.zeros(days, dtype=np.int64)
+    rows = connection.exec_driver_sql(FORECAST_SELECT_SQL, (f'+{days} days',)).fetchall()
+    if not rows:
+        return due
+
+    day_offsets, boxes, counts = np.array(rows, dtype=np.int64).T
+    no_lapses = np.zeros_like(boxes)
+    while day_offsets.size:
+        due += np.bincount(day_offsets, weights=counts, minlength=days).astype(np.int64)[:days]
+        boxes = np.minimum(boxes + 1, MAX_BOX)
+        intervals = np.maximum(np.ceil(scheduler.interval_days(boxes, no_lapses[:boxes.size])), 1)
+        day_offsets = day_offsets + intervals.astype(np.int64)
+
+        in_horizon = day_offsets < days
+        day_offsets, boxes, counts = day_offsets[in_horizon], boxes[in_horizon], counts[in_horizon]
+    return due
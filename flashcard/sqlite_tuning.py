@@ -0,0 +1,114 @@
+"""
+SQLite connection settings shared by the app, UserModel and the command-line
+scripts, so every connection to the flashcard database behaves the same way.
+
+The values are read from sqlite_config.ini (or the file named by the
+FLASHCARD_SQLITE_CONFIG environment variable); missing keys use the defaults below.
+"""
+import configparser
+import logging
+import os
+import sqlite3
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.pool import QueuePool
+
+logger = logging.getLogger('app.sqlite_tuning')
+
+CONFIG_PATH = os.environ.get(
+    'FLASHCARD_SQLITE_CONFIG',
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), 'sqlite_config.ini')
+)
+
+DEFAULT_SQLITE_SETTINGS = {
+    'journal_mode': 'WAL',        # Readers no longer block the writer (and vice versa)
+    'synchronous': 'NORMAL',      # Safe with WAL; fsync on checkpoint instead of every commit
+    'busy_timeout_ms': 10000,     # Wait inside SQLite for the write lock instead of failing
+    'cache_size_kib': 65536,      # Page cache per connection
+    'mmap_size_mb': 256,          # Read pages through the OS page cache without copying
+    'temp_store': 'MEMORY',       # Sorts and temporary indexes stay in memory
+    'read_pool_size': 8,          # Connections kept open by the read-only engine
+    'read_pool_overflow': 8       # Extra read connections allowed under load
+}
+
+_settings = None
+
+def load_sqlite_settings(path=CONFIG_PATH):
+    """Read the [SQLITE] section of the config file over the defaults"""
+    settings = dict(DEFAULT_SQLITE_SETTINGS)
+    parser = configparser.ConfigParser()
+    if parser.read(path, encoding='utf-8') and parser.has_section('SQLITE'):
+        for key, default in DEFAULT_SQLITE_SETTINGS.items():
+            if parser.has_option('SQLITE', key):
+                value = parser.get('SQLITE', key)
+                if not isinstance(default, int):
+                    settings[key] = value.upper()
+                    continue
+                try:
+                    settings[key] = int(value)
+                except ValueError:
+                    logger.warning(f"Invalid {key} '{value}' in {path}, using {default}")
+    return settings
+
+def get_sqlite_settings():
+    """Return the settings, reading the config file on first use"""
+    global _settings
+    if _settings is None:
+        _settings = load_sqlite_settings()
+        logger.info(f"SQLite settings: {_settings}")
+    return _settings
+
+def apply_sqlite_settings(dbapi_connection, settings=None, read_only=False):
+    """Apply the connection settings to a raw sqlite3 connection"""
+    settings = settings or get_sqlite_settings()
+    cursor = dbapi_connection.cursor()
+    try:
+        cursor.execute(f"PRAGMA busy_timeout = {int(settings['busy_timeout_ms'])}")
+        if read_only:
+            # journal_mode is stored in the database file and set by the writers
+            cursor.execute("PRAGMA query_only = ON")
+        else:
+            # SQLite answers with the mode in effect, which stays unchanged when
+            # the requested one is unknown or unavailable (e.g. WAL on a network drive)
+            mode = cursor.execute(f"PRAGMA journal_mode = {settings['journal_mode']}").fetchone()[0]
+            if mode.upper() != settings['journal_mode']:
+                logger.warning(f"journal_mode {settings['journal_mode']} not applied, using {mode}")
+        cursor.execute(f"PRAGMA synchronous = {settings['synchronous']}")
+        # Negative cache_size is in KiB rather than pages
+        cursor.execute(f"PRAGMA cache_size = -{int(settings['cache_size_kib'])}")
+        cursor.execute(f"PRAGMA mmap_size = {int(settings['mmap_size_mb']) * 1024 * 1024}")
+        cursor.execute(f"PRAGMA temp_store = {settings['temp_store']}")
+    finally:
+        cursor.close()
+
+def install_sqlite_tuning(engine, settings=None, read_only=False):
+    """Apply the connection settings to every new connection of a SQLAlchemy engine"""
+    @event.listens_for(engine, 'connect')
+    def on_connect(dbapi_connection, connection_record):
+        apply_sqlite_settings(dbapi_connection, settings, read_only)
+    return engine
+
+def create_read_only_engine(db_path, settings=None):
+    """
+    Engine for read traffic. Connections open the file with mode=ro and
+    query_only, so they can never take the write lock, and run in autocommit,
+    so reads are not wrapped in BEGIN/COMMIT. They come from a pool of their
+    own, sized by read_pool_size and read_pool_overflow.
+    """
+    settings = settings or get_sqlite_settings()
+    engine = create_engine(
+        f'sqlite:///file:{db_path}?mode=ro&uri=true',
+        connect_args={'check_same_thread': False},
+        poolclass=QueuePool,
+        pool_size=int(settings['read_pool_size']),
+        max_overflow=int(settings['read_pool_overflow']),
+        isolation_level='AUTOCOMMIT'
+    )
+    return install_sqlite_tuning(engine, settings, read_only=True)
+
+def connect_sqlite(db_path, settings=None):
+    """Open a tuned sqlite3 connection, for scripts that do not use SQLAlchemy"""
+    settings = settings or get_sqlite_settings()
+    connection = sqlite3.connect(db_path, timeout=settings['busy_timeout_ms'] / 1000.0)
+    apply_sqlite_settings(connection, settings)
+    return connection
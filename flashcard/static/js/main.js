@@ -72,12 +72,40 @@ function updateBoxIndicator(boxNumber) {
 }
 
 // Card management functions
-function loadCards() {
-    showLoading(true);
-    fetch('/api/cards')
+const CARD_PAGE_SIZE = 100;
+const CARD_FIELDS = 'id,word,meaning,example,ipa,pos,box_number,next_review';
+let nextCursor = null;       // Cursor for the next page of cards, null when fully loaded
+let isLoadingMore = false;   // Prevent concurrent page fetches
+let deckVersion = null;      // Deck version of the loaded cards, for delta sync
+
+function fetchCardPage(afterId) {
+    const params = new URLSearchParams({
+        limit: CARD_PAGE_SIZE,
+        fields: CARD_FIELDS
+    });
+    if (afterId) {
+        params.set('after_id', afterId);
+    }
+    return fetch(`/api/cards?${params.toString()}`)
         .then(response => response.json())
         .then(data => {
-            cards = data;
+            if (data.error) {
+                throw new Error(data.error);
+            }
+            nextCursor = data.next_cursor;
+            if (!afterId) {
+                deckVersion = data.version;
+            }
+            return data.cards;
+        });
+}
+
+function loadCards() {
+    showLoading(true);
+    nextCursor = null;
+    fetchCardPage(null)
+        .then(page => {
+            cards = page;
             updateCardCount();
             if (cards.length > 0) {
                 isInitialLoad = true; // Set flag before showing first card
@@ -95,6 +123,76 @@ function loadCards() {
         });
 }
 
+// Apply the changes made to the deck since the loaded version instead of reloading it
+function syncCards() {
+    if (deckVersion === null) {
+        loadCards();
+        return Promise.resolve();
+    }
+    const params = new URLSearchParams({
+        since: deckVersion,
+        fields: CARD_FIELDS
+    });
+    return fetch(`/api/cards/changes?${params.toString()}`)
+        .then(response => response.json())
+        .then(data => {
+            if (data.error) {
+                throw new Error(data.error);
+            }
+            if (data.full_reload) {
+                loadCards();
+                return;
+            }
+
+            const indexById = new Map(cards.map((card, index) => [card.id, index]));
+            data.cards.forEach(card => {
+                if (indexById.has(card.id)) {
+                    cards[indexById.get(card.id)] = card;
+                } else if (nextCursor === null || card.id <= nextCursor) {
+                    // Cards past the loaded pages arrive with loadMoreCards()
+                    cards.push(card);
+                }
+            });
+            if (data.deleted.length > 0) {
+                const deleted = new Set(data.deleted);
+                cards = cards.filter(card => !deleted.has(card.id));
+            }
+            deckVersion = data.version;
+
+            updateCardCount();
+            if (cards.length > 0) {
+                const index = Math.min(currentCardIndex, cards.length - 1);
+                if (cards[index] !== currentCard) {
+                    showCard(index);
+                }
+            }
+            updateBoxStats();
+        })
+        .catch(error => {
+            console.error('Error syncing cards:', error);
+            loadCards();
+        });
+}
+
+// Fetch the next page in the background when the user nears the end of the loaded cards
+function loadMoreCards() {
+    if (nextCursor === null || isLoadingMore) {
+        return Promise.resolve();
+    }
+    isLoadingMore = true;
+    return fetchCardPage(nextCursor)
+        .then(page => {
+            cards = cards.concat(page);
+            updateCardCount();
+        })
+        .catch(error => {
+            console.error('Error loading more cards:', error);
+        })
+        .finally(() => {
+            isLoadingMore = false;
+        });
+}
+
 function showCard(index) {
     // Validate index and cards array
     if (index < 0 || index >= cards.length) {
@@ -203,8 +301,15 @@ function updateCardCount() {
 
 // Navigation functions
 function showNextCard() {
+    // Prefetch the next page before reaching the end of the loaded cards
+    if (cards.length - currentCardIndex <= 10) {
+        loadMoreCards();
+    }
+
     if (currentCardIndex < cards.length - 1) {
         showCard(currentCardIndex + 1);
+    } else if (nextCursor !== null) {
+        loadMoreCards().then(() => showCard(Math.min(currentCardIndex + 1, cards.length - 1)));
     } else if (cards.length > 0) {
         showCard(0);
     }
@@ -219,19 +324,74 @@ function showPreviousCard() {
 }
 
 // Card review functions
-function reviewCard(correct) {
-    if (!currentCard) return;
+// Answers are applied locally and queued; the queue is flushed to /api/reviews/batch
+// periodically, when it grows, and when the page is hidden. Each entry carries a
+// client_review_id so a retried flush never applies the same answer twice.
+// Long queues are sent in chunks (see review_queue.js), one request at a time.
+const REVIEW_QUEUE_KEY = 'pending_reviews';
+const REVIEW_FLUSH_INTERVAL = 10000; // ms
+const REVIEW_FLUSH_SIZE = 20;
+let pendingReviews = JSON.parse(localStorage.getItem(REVIEW_QUEUE_KEY) || '[]');
+let isFlushingReviews = false;
+
+// Intervals of the server's scheduler, used to show the result of an answer
+// before the server has applied it; see /api/scheduler
+const SCHEDULER_KEY = 'review_scheduler';
+let reviewScheduler = JSON.parse(localStorage.getItem(SCHEDULER_KEY) || 'null');
+
+function loadScheduler() {
+    return fetch('/api/scheduler')
+        .then(response => response.json())
+        .then(scheduler => {
+            reviewScheduler = scheduler;
+            localStorage.setItem(SCHEDULER_KEY, JSON.stringify(scheduler));
+        })
+        .catch(error => {
+            // Keep the copy saved by an earlier visit, if any
+            console.error('Error loading scheduler:', error);
+        });
+}
+
+function generateReviewId() {
+    if (window.crypto && crypto.randomUUID) {
+        return crypto.randomUUID();
+    }
+    return `${Date.now()}-${Math.random().toString(16).slice(2)}`;
+}
+
+function savePendingReviews() {
+    localStorage.setItem(REVIEW_QUEUE_KEY, JSON.stringify(pendingReviews));
+}
+
+function flushReviews(keepalive = false) {
+    if (isFlushingReviews || pendingReviews.length === 0) {
+        return Promise.resolve();
+    }
+    isFlushingReviews = true;
+
+    // A failed chunk stops the flush; it and the chunks after it stay queued
+    return chunkReviews(pendingReviews)
+        .reduce((previous, chunk) => previous.then(() => sendReviewChunk(chunk, keepalive)), Promise.resolve())
+        .then(() => updateBoxStats())
+        .catch(error => {
+            console.error('Error flushing reviews:', error);
+        })
+        .finally(() => {
+            isFlushingReviews = false;
+        });
+}
 
-    const cardId = currentCard.id;
-    fetch(`/api/cards/${cardId}/review`, {
+function sendReviewChunk(batch, keepalive) {
+    return fetch('/api/reviews/batch', {
         method: 'POST',
         headers: {
             'Content-Type': 'application/json',
         },
-        body: JSON.stringify({ correct })
+        body: JSON.stringify({ reviews: batch }),
+        // Only the flush on page hide needs to outlive the page
+        keepalive: keepalive
     })
     .then(response => {
-        // Add explicit error handling for non-200 responses
         if (!response.ok) {
             return response.text().then(errorText => {
                 throw new Error(`HTTP error! status: ${response.status}, message: ${errorText}`);
@@ -239,42 +399,70 @@ function reviewCard(correct) {
         }
         return response.json();
     })
-    .then(updatedCard => {
-        // Update the card in our local array
-        const index = cards.findIndex(c => c.id === cardId);
-        if (index !== -1) {
-            cards[index] = updatedCard;
-        }
-        
-        // Update box stats and indicator
-        updateBoxStats();
-        updateBoxIndicator(updatedCard.box_number);
-        
-        // Show success message
-        const message = correct ? 
-            `Moved to Box ${updatedCard.box_number} - Next review in ${getIntervalText(updatedCard.box_number)}` :
-            'Moved back to Box 1 - Review again tomorrow';
-        showToast(message);
-        
-        // Move to next card
-        showNextCard();
-    })
-    .catch(error => {
-        console.error('Error reviewing card:', error);
-        showToast(`Error reviewing card: ${error.message}`, 5000);
+    .then(result => {
+        // Drop the flushed entries; anything queued meanwhile stays for the next flush
+        const flushedIds = new Set(batch.map(review => review.client_review_id));
+        pendingReviews = pendingReviews.filter(review => !flushedIds.has(review.client_review_id));
+        savePendingReviews();
+
+        // Replace local cards with the server state
+        result.cards.forEach(updatedCard => {
+            const index = cards.findIndex(c => c.id === updatedCard.id);
+            if (index !== -1) {
+                cards[index] = updatedCard;
+            }
+        });
     });
 }
 
-function getIntervalText(boxNumber) {
-    const intervals = {
-        0: 'now',
-        1: '1 day',
-        2: '3 days',
-        3: '10 days',
-        4: '30 days',
-        5: '90 days'
-    };
-    return intervals[boxNumber] || 'unknown';
+function reviewCard(correct) {
+    if (!currentCard) return;
+
+    // Apply the server scheduler's box logic so the UI updates immediately;
+    // the card is replaced by the server's state once the review is flushed
+    const previousBox = currentCard.box_number || 0;
+    const maxBox = reviewScheduler ? reviewScheduler.max_box : 5;
+    const newBox = correct ? Math.min(previousBox + 1, maxBox) : 1;
+    const now = new Date();
+    const intervalDays = reviewScheduler ? reviewScheduler.intervals[newBox] : null;
+    currentCard.box_number = newBox;
+    if (intervalDays !== null) {
+        currentCard.next_review = new Date(now.getTime() + intervalDays * 86400000).toISOString();
+    }
+
+    pendingReviews.push({
+        card_id: currentCard.id,
+        correct: correct,
+        reviewed_at: now.toISOString(),
+        client_review_id: generateReviewId()
+    });
+    savePendingReviews();
+    if (pendingReviews.length >= REVIEW_FLUSH_SIZE) {
+        flushReviews();
+    }
+
+    updateBoxIndicator(newBox);
+
+    // Show success message
+    const nextReview = intervalDays !== null ? ` - Next review in ${getIntervalText(intervalDays)}` : '';
+    const message = correct ? 
+        `Moved to Box ${newBox}${nextReview}` :
+        `Moved back to Box 1${nextReview}`;
+    showToast(message);
+
+    // Move to next card
+    showNextCard();
+}
+
+function getIntervalText(days) {
+    if (days <= 0) {
+        return 'now';
+    }
+    const rounded = Math.round(days);
+    if (rounded < 1) {
+        return `${Math.round(days * 24)} hours`;
+    }
+    return rounded === 1 ? '1 day' : `${rounded} days`;
 }
 
 // Card flipping with auto-pronunciation
@@ -367,6 +555,12 @@ function speakWord() {
 }
 
 // YouTube import functionality
+// Imports run as background jobs: the POST returns a job id right away and the
+// job is polled until it finishes. The id is kept in localStorage so a reload
+// keeps following the same import.
+const IMPORT_JOB_KEY = 'youtube_import_job';
+const IMPORT_POLL_INTERVAL = 1500; // ms
+
 function importFromYouTube() {
     const urlInput = document.getElementById('youtubeUrl');
     const url = urlInput.value.trim();
@@ -376,8 +570,7 @@ function importFromYouTube() {
         return;
     }
     
-    showLoading(true);
-    fetch('/api/youtube/import', {
+    fetch('/api/import-youtube', {
         method: 'POST',
         headers: {
             'Content-Type': 'application/json',
@@ -386,19 +579,71 @@ function importFromYouTube() {
     })
     .then(response => response.json())
     .then(data => {
-        showToast(`Successfully imported ${data.imported} words`);
+        if (!data.job_id) {
+            throw new Error(data.error || 'Import was not started');
+        }
+        localStorage.setItem(IMPORT_JOB_KEY, data.job_id);
         urlInput.value = '';
-        loadCards();
+        showToast('Import started');
+        pollImportJob(data.job_id);
     })
     .catch(error => {
         console.error('Error importing from YouTube:', error);
-        showToast('Error importing words from YouTube');
-    })
-    .finally(() => {
-        showLoading(false);
+        showToast(`Error importing words from YouTube: ${error.message}`);
     });
 }
 
+function describeImportJob(job) {
+    if (job.stage === 'transcript' || job.status === 'queued') {
+        return 'Import: fetching transcript...';
+    }
+    let message = `Import: ${job.processed}/${job.total} words`;
+    if (job.eta_seconds !== null && job.eta_seconds !== undefined) {
+        message += ` (about ${Math.max(1, Math.round(job.eta_seconds))}s left)`;
+    }
+    return message;
+}
+
+function pollImportJob(jobId) {
+    fetch(`/api/jobs/${jobId}`)
+        .then(response => {
+            if (response.status === 404) {
+                localStorage.removeItem(IMPORT_JOB_KEY);
+                return null;
+            }
+            return response.json();
+        })
+        .then(job => {
+            if (!job) {
+                return;
+            }
+            if (job.status === 'done') {
+                localStorage.removeItem(IMPORT_JOB_KEY);
+                showToast(`Successfully imported ${job.added} words`);
+                syncCards();
+                updateBoxStats();
+            } else if (job.status === 'failed') {
+                localStorage.removeItem(IMPORT_JOB_KEY);
+                showToast(`Import failed: ${job.error}`);
+            } else {
+                showToast(describeImportJob(job), IMPORT_POLL_INTERVAL + 500);
+                setTimeout(() => pollImportJob(jobId), IMPORT_POLL_INTERVAL);
+            }
+        })
+        .catch(error => {
+            // Keep polling through network hiccups; the job carries on server-side
+            console.error('Error polling import job:', error);
+            setTimeout(() => pollImportJob(jobId), IMPORT_POLL_INTERVAL * 2);
+        });
+}
+
+document.addEventListener('DOMContentLoaded', function() {
+    const jobId = localStorage.getItem(IMPORT_JOB_KEY);
+    if (jobId) {
+        pollImportJob(jobId);
+    }
+});
+
 // UI helpers
 function showLoading(show) {
     const loadingSpinner = document.getElementById('loading-spinner');
@@ -407,6 +652,8 @@ function showLoading(show) {
     }
 }
 
+let toastTimer = null;
+
 function showToast(message, duration = 3000) {
     const toast = document.getElementById('toast');
     const toastMessage = document.getElementById('toastMessage');
@@ -414,7 +661,9 @@ function showToast(message, duration = 3000) {
     toastMessage.textContent = message;
     toast.classList.remove('hidden');
     
-    setTimeout(() => {
+    // A newer toast (e.g. import progress) restarts the timer instead of being hidden early
+    clearTimeout(toastTimer);
+    toastTimer = setTimeout(() => {
         toast.classList.add('hidden');
     }, duration);
 }
@@ -818,6 +1067,16 @@ document.addEventListener('DOMContentLoaded', function() {
     // Initialize box system
     updateBoxStats();
     setInterval(updateBoxStats, 60000); // Update stats every minute
+
+    // Flush queued reviews periodically and when the page is hidden
+    loadScheduler();
+    flushReviews();
+    setInterval(() => flushReviews(), REVIEW_FLUSH_INTERVAL);
+    document.addEventListener('visibilitychange', () => {
+        if (document.visibilityState === 'hidden') {
+            flushReviews(true);
+        }
+    });
     
     // Load initial cards
     loadCards();
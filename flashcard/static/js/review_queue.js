@@ -0,0 +1,34 @@
+// Splitting of the queued reviews into /api/reviews/batch requests.
+// No DOM access here, so the chunking can be checked outside the browser.
+
+// Entries per request, well below MAX_REVIEW_BATCH in app.py (1000)
+const REVIEW_CHUNK_MAX_ENTRIES = 100;
+// Body bytes per request; browsers reject keepalive requests above 64 KiB in flight
+const REVIEW_CHUNK_MAX_BYTES = 60 * 1024;
+
+function chunkReviews(reviews, maxEntries = REVIEW_CHUNK_MAX_ENTRIES, maxBytes = REVIEW_CHUNK_MAX_BYTES) {
+    const encoder = new TextEncoder();
+    const envelopeBytes = encoder.encode(JSON.stringify({ reviews: [] })).length;
+    const chunks = [];
+    let chunk = [];
+    let chunkBytes = envelopeBytes;
+
+    reviews.forEach(review => {
+        const entryBytes = encoder.encode(JSON.stringify(review)).length + 1; // Comma separator
+        if (chunk.length > 0 && (chunk.length >= maxEntries || chunkBytes + entryBytes > maxBytes)) {
+            chunks.push(chunk);
+            chunk = [];
+            chunkBytes = envelopeBytes;
+        }
+        chunk.push(review);
+        chunkBytes += entryBytes;
+    });
+    if (chunk.length > 0) {
+        chunks.push(chunk);
+    }
+    return chunks;
+}
+
+if (typeof module !== 'undefined') {
+    module.exports = { chunkReviews, REVIEW_CHUNK_MAX_ENTRIES, REVIEW_CHUNK_MAX_BYTES };
+}
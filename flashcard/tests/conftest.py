@@ -0,0 +1,65 @@
+import importlib
+import os
+import sys
+
+import pytest
+from sqlalchemy import text
+
+# The app's modules are imported flat, as app.py does
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from models import get_engine, DECK_SCHEMA, Card
+
+@pytest.fixture
+def deck_engine(tmp_path):
+    """Engine for a fresh, fully migrated deck database"""
+    return get_engine(str(tmp_path / 'flashcards.db'), schema=DECK_SCHEMA)
+
+@pytest.fixture(scope='session')
+def app_module(tmp_path_factory):
+    """
+    app.py imported once, inside a temporary directory: its databases, audio
+    and logs are created there and no lexicon is loaded
+    """
+    root = tmp_path_factory.mktemp('app')
+    workdir = root / 'deck'
+    workdir.mkdir()
+    previous = os.getcwd()
+    os.environ['FLASHCARD_LOG_DIR'] = str(root / 'logs')
+    os.environ['FLASHCARD_LEXICON'] = str(root / 'no-lexicon.bin')
+    os.chdir(workdir)
+    try:
+        yield importlib.import_module('app')
+    finally:
+        os.chdir(previous)
+
+@pytest.fixture
+def app_module_empty(app_module):
+    """app.py with an empty deck and no review history (card ids are reused)"""
+    app_module.review_writer.flush()
+
+    def clear(session):
+        for table in ('cards', 'review_events', 'review_receipts'):
+            session.execute(text(f"DELETE FROM {table}"))
+    app_module.db_writer.run(clear)
+    with app_module.engine.connect() as connection:
+        app_module.word_index.load(connection)
+    with app_module.forecast_cache_lock:
+        app_module.forecast_cache.clear()
+    return app_module
+
+@pytest.fixture
+def client(app_module_empty):
+    return app_module_empty.app.test_client()
+
+@pytest.fixture
+def add_cards(app_module_empty):
+    """Insert cards through the database writer; returns their ids"""
+    def add(*cards):
+        def insert(session):
+            rows = [Card(**dict({'meaning': 'meaning', 'box_number': 0}, **card)) for card in cards]
+            session.add_all(rows)
+            session.flush()
+            return [row.id for row in rows]
+        return app_module_empty.db_writer.run(insert)
+    return add
@@ -0,0 +1,28 @@
+from sqlalchemy import text
+
+def box_counts(stats):
+    return {box: stats[f'box_{box}']['count'] for box in range(6)}
+
+def test_counters_follow_inserts_updates_and_deletes(client, add_cards, app_module):
+    ids = add_cards(*({'word': f'word{i}', 'box_number': i % 3} for i in range(7)))
+    app_module.db_writer.run(lambda session: session.execute(
+        text("UPDATE cards SET box_number = 5 WHERE id IN (:a, :b)"), {'a': ids[0], 'b': ids[1]}
+    ))
+    app_module.db_writer.run(lambda session: session.execute(text("DELETE FROM cards WHERE id = :id"), {'id': ids[2]}))
+
+    stats = client.get('/api/cards/stats').get_json()
+    with app_module.engine.connect() as connection:
+        actual = dict(connection.execute(text("SELECT box_number, COUNT(*) FROM cards GROUP BY box_number")).all())
+    assert box_counts(stats) == {box: actual.get(box, 0) for box in range(6)}
+    assert box_counts(stats) == {0: 2, 1: 1, 2: 1, 3: 0, 4: 0, 5: 2}
+    assert stats['total'] == 6
+    assert box_counts(client.get('/api/cards/stats?recompute=1').get_json()) == box_counts(stats)
+
+def test_recompute_repairs_drifted_counters(client, add_cards, app_module):
+    add_cards({'word': 'apple', 'box_number': 3})
+    app_module.db_writer.run(lambda session: session.execute(text("UPDATE box_counters SET count = count + 10")))
+
+    assert client.get('/api/cards/stats?recompute=1').get_json()['total'] == 1
+    stats = client.get('/api/cards/stats').get_json()
+    assert stats['box_3'] == {'count': 1, 'percentage': 100.0}
+    assert stats['total'] == 1
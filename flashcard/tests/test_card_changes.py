@@ -0,0 +1,47 @@
+from sqlalchemy import text
+
+def changes(client, since):
+    return client.get(f'/api/cards/changes?since={since}').get_json()
+
+def test_changes_since_a_version(client, add_cards, app_module):
+    apple, pear, plum = add_cards({'word': 'apple'}, {'word': 'pear'}, {'word': 'plum'})
+    body = client.get('/api/cards').get_json()
+    version = body['version']
+    copy = {card['id']: card for card in body['cards']}
+    assert changes(client, version) == {'version': version, 'cards': [], 'deleted': [], 'full_reload': False}
+
+    app_module.db_writer.run(lambda session: session.execute(
+        text("UPDATE cards SET meaning = 'fruit' WHERE id = :id"), {'id': pear}
+    ))
+    kiwi, = add_cards({'word': 'kiwi'})
+    app_module.db_writer.run(lambda session: session.execute(text("DELETE FROM cards WHERE id = :id"), {'id': plum}))
+
+    body = changes(client, version)
+    assert not body['full_reload']
+    assert sorted(card['id'] for card in body['cards']) == [pear, kiwi]
+    assert body['deleted'] == [plum]
+
+    # Applying the changes to the client's copy gives the current deck
+    copy.update((card['id'], card) for card in body['cards'])
+    for card_id in body['deleted']:
+        del copy[card_id]
+    assert list(copy.values()) == client.get('/api/cards').get_json()['cards']
+    assert changes(client, body['version'])['cards'] == []
+
+def test_reinserted_card_is_not_reported_deleted(client, add_cards, app_module):
+    card_id, = add_cards({'word': 'apple'})
+    version = client.get('/api/cards').get_json()['version']
+    app_module.db_writer.run(lambda session: session.execute(text("DELETE FROM cards WHERE id = :id"), {'id': card_id}))
+    # SQLite reuses the id of the deleted row
+    assert add_cards({'word': 'pear'}) == [card_id]
+
+    body = changes(client, version)
+    assert body['deleted'] == []
+    assert [card['word'] for card in body['cards']] == ['pear']
+
+def test_unknown_or_invalid_versions(client, add_cards):
+    add_cards({'word': 'apple'})
+    version = client.get('/api/cards').get_json()['version']
+    assert changes(client, version + 100)['full_reload']
+    assert client.get('/api/cards/changes').status_code == 400
+    assert client.get('/api/cards/changes?since=-1').status_code == 400
@@ -0,0 +1,25 @@
+def page_ids(client, after_id=0, limit=2):
+    body = client.get(f'/api/cards?after_id={after_id}&limit={limit}').get_json()
+    return [card['id'] for card in body['cards']], body['next_cursor']
+
+def test_pages_stay_stable_across_inserts_and_deletes(client, add_cards, app_module):
+    ids = add_cards(*({'word': f'word{i}'} for i in range(5)))
+
+    first, cursor = page_ids(client)
+    assert first == ids[:2] and cursor == ids[1]
+
+    # Writes between pages neither repeat nor skip the cards that were already there
+    new_ids = add_cards({'word': 'late1'}, {'word': 'late2'})
+    app_module.db_writer.run(lambda session: session.query(app_module.Card).filter_by(id=ids[0]).delete())
+
+    seen = list(first)
+    while cursor is not None:
+        page, cursor = page_ids(client, cursor)
+        seen.extend(page)
+    assert seen == ids + new_ids
+
+def test_fields_project_the_columns(client, add_cards):
+    add_cards({'word': 'apple', 'ipa': '/ˈæpəl/'})
+    card, = client.get('/api/cards?fields=word,ipa').get_json()['cards']
+    assert card == {'id': card['id'], 'word': 'apple', 'ipa': '/ˈæpəl/'}
+    assert client.get('/api/cards?fields=word,password').status_code == 400
@@ -0,0 +1,35 @@
+from sqlalchemy import text
+
+from card_search import build_match_query
+
+def search_words(client, query):
+    return [card['word'] for card in client.get('/api/cards/search', query_string={'q': query}).get_json()['cards']]
+
+def test_match_query_quotes_every_term():
+    assert build_match_query('exam sent') == '"exam"* "sent"*'
+    assert build_match_query('a" OR word NEAR(x') == '"a"* "OR"* "word"* "NEAR"* "x"*'
+    assert build_match_query(' -*" ') is None
+
+def test_word_hits_rank_above_meaning_and_example(client, add_cards):
+    add_cards(
+        {'word': 'river', 'meaning': 'a bank of water', 'example': 'We walked along the bank.'},
+        {'word': 'bank', 'meaning': 'a place for money'},
+        {'word': 'shore', 'meaning': 'land next to the sea', 'example': 'The bank was steep.'}
+    )
+    assert search_words(client, 'bank') == ['bank', 'river', 'shore']
+    assert search_words(client, 'mon plac') == ['bank']
+    # Diacritics are folded
+    add_cards({'word': 'meaning', 'meaning': 'ý nghĩa'})
+    assert search_words(client, 'nghia') == ['meaning']
+    assert search_words(client, '"') == []
+
+def test_index_follows_updates_and_deletes(client, add_cards, app_module):
+    card_id, = add_cards({'word': 'apple', 'meaning': 'a fruit'})
+    app_module.db_writer.run(lambda session: session.execute(
+        text("UPDATE cards SET word = 'pear' WHERE id = :id"), {'id': card_id}
+    ))
+    assert search_words(client, 'apple') == []
+    assert search_words(client, 'pear') == ['pear']
+
+    app_module.db_writer.run(lambda session: session.execute(text("DELETE FROM cards WHERE id = :id"), {'id': card_id}))
+    assert search_words(client, 'fruit') == []
@@ -0,0 +1,45 @@
+from contextlib import closing
+
+from sqlalchemy import text
+
+from card_upsert import upsert_cards, PLACEHOLDER_MEANING, MAX_QUERY_WORDS
+
+def upsert(engine, cards, **kwargs):
+    with closing(engine.raw_connection()) as connection:
+        result = upsert_cards(connection, cards, **kwargs)
+        connection.commit()
+    return result
+
+def meanings(engine):
+    with engine.connect() as connection:
+        return dict(connection.execute(text("SELECT word, meaning FROM cards")).all())
+
+def test_counts_inserts_and_updates(deck_engine):
+    upsert(deck_engine, [{'word': 'apple'}, {'word': 'pear', 'meaning': 'a fruit'}])
+
+    result = upsert(deck_engine, [
+        {'word': 'apple', 'meaning': 'a red fruit'},   # Placeholder meaning: filled in
+        {'word': 'pear', 'meaning': 'changed'},        # Has a meaning: left alone
+        {'word': 'kiwi', 'meaning': 'green'},
+        {'word': 'kiwi', 'meaning': 'second'},         # Duplicate: first one wins
+        {'word': 'plum'}
+    ])
+    assert result == (2, 1, ['kiwi', 'plum'])
+    assert meanings(deck_engine) == {
+        'apple': 'a red fruit', 'pear': 'a fruit', 'kiwi': 'green', 'plum': PLACEHOLDER_MEANING
+    }
+
+    result = upsert(deck_engine, [{'word': 'pear', 'meaning': 'changed'}, {'word': 'kiwi', 'meaning': 'green'}], overwrite=True)
+    assert result == (0, 2, [])
+    assert meanings(deck_engine)['pear'] == 'changed'
+    assert upsert(deck_engine, []) == (0, 0, [])
+
+def test_counts_span_existence_query_chunks(deck_engine):
+    words = [f'word{i}' for i in range(MAX_QUERY_WORDS * 2 + 100)]
+    upsert(deck_engine, [{'word': word} for word in words[::2]])
+
+    result = upsert(deck_engine, [{'word': word, 'meaning': 'known'} for word in words])
+    assert result.inserted == len(words) // 2
+    assert result.updated == len(words) // 2
+    assert result.new_words == words[1::2]
+    assert set(meanings(deck_engine).values()) == {'known'}
@@ -0,0 +1,86 @@
+import gzip
+
+import pytest
+from flask import Flask
+from werkzeug.http import parse_accept_header
+
+from compression import setup_compression, choose_encoding, CompressedBodyCache, BROTLI_AVAILABLE
+
+def make_app():
+    app = Flask(__name__)
+    app.config['COMPRESS_MIN_SIZE'] = 10
+    setup_compression(app)
+
+    # Two resources that happen to use the same strong ETag
+    @app.route('/a')
+    def resource_a():
+        response = app.response_class('a' * 100, mimetype='text/html')
+        response.set_etag('v1')
+        return response
+
+    @app.route('/b')
+    def resource_b():
+        response = app.response_class('b' * 100, mimetype='text/html')
+        response.set_etag('v1')
+        return response
+
+    return app
+
+def test_cached_bodies_are_per_path():
+    app = make_app()
+    client = app.test_client()
+    headers = {'Accept-Encoding': 'gzip'}
+
+    first = client.get('/a', headers=headers)
+    second = client.get('/b', headers=headers)
+    assert gzip.decompress(first.data) == b'a' * 100
+    assert gzip.decompress(second.data) == b'b' * 100
+    assert second.headers['ETag'] == 'W/"v1"'
+
+    # Repeated requests are served from the cache
+    assert gzip.decompress(client.get('/a', headers=headers).data) == b'a' * 100
+    assert app.extensions['compression_cache'].hits == 1
+
+def test_small_or_unaccepted_bodies_are_sent_as_is():
+    app = make_app()
+    app.config['COMPRESS_MIN_SIZE'] = 1000
+    client = app.test_client()
+
+    assert 'Content-Encoding' not in client.get('/a', headers={'Accept-Encoding': 'gzip'}).headers
+    app.config['COMPRESS_MIN_SIZE'] = 10
+    response = client.get('/a', headers={'Accept-Encoding': 'identity'})
+    assert 'Content-Encoding' not in response.headers
+    assert response.data == b'a' * 100
+
+@pytest.mark.parametrize('header, expected', [
+    ('gzip', 'gzip'),
+    ('gzip;q=0', None),
+    ('*', 'br' if BROTLI_AVAILABLE else 'gzip'),
+    ('br, gzip', 'br' if BROTLI_AVAILABLE else 'gzip'),
+    ('br;q=0.5, gzip', 'gzip'),
+    ('deflate', None),
+    ('', None)
+])
+def test_choose_encoding(header, expected):
+    assert choose_encoding(parse_accept_header(header)) == expected
+
+def test_errors_are_not_compressed_but_vary():
+    app = make_app()
+
+    @app.route('/missing')
+    def missing():
+        return app.response_class('x' * 100, status=404, mimetype='text/html')
+
+    response = app.test_client().get('/missing', headers={'Accept-Encoding': 'gzip'})
+    assert 'Content-Encoding' not in response.headers
+    assert 'Accept-Encoding' in response.headers['Vary']
+
+def test_cache_evicts_least_recently_used():
+    cache = CompressedBodyCache(2)
+    cache.put('a', b'1')
+    cache.put('b', b'2')
+    assert cache.get('a') == b'1'
+    cache.put('c', b'3')
+    assert cache.get('b') is None
+    assert cache.get('a') == b'1' and cache.get('c') == b'3'
+    assert (cache.hits, cache.misses) == (3, 1)
@@ -0,0 +1,66 @@
+import threading
+
+import pytest
+from sqlalchemy import text
+
+from db_writer import DatabaseWriter
+
+@pytest.fixture
+def writer(deck_engine):
+    writer = DatabaseWriter(deck_engine)
+    yield writer
+    writer.stop()
+
+def insert(word, fail=False):
+    def mutation(session):
+        session.execute(text("INSERT INTO cards (word, meaning, box_number) VALUES (:word, 'm', 0)"), {'word': word})
+        if fail:
+            raise ValueError(f'cannot add {word}')
+        return word
+    return mutation
+
+def hold(writer):
+    """Keep the writer busy until the returned event is set, so the next submissions form one group"""
+    started, release = threading.Event(), threading.Event()
+    writer.submit(lambda session: (started.set(), release.wait(5)))
+    assert started.wait(5)
+    return release
+
+def words(engine):
+    with engine.connect() as connection:
+        return [row[0] for row in connection.execute(text("SELECT word FROM cards ORDER BY id"))]
+
+def test_mutations_queued_together_share_a_transaction(deck_engine, writer):
+    release = hold(writer)
+    futures = [writer.submit(insert(f'word{i}')) for i in range(5)]
+    transactions = writer.transactions
+    release.set()
+
+    assert [future.result(5) for future in futures] == [f'word{i}' for i in range(5)]
+    assert writer.transactions == transactions + 2
+    assert words(deck_engine) == [f'word{i}' for i in range(5)]
+
+def test_failing_mutation_only_fails_itself(deck_engine, writer):
+    release = hold(writer)
+    futures = [writer.submit(insert('apple')), writer.submit(insert('pear', fail=True)), writer.submit(insert('plum'))]
+    # Violates the unique word constraint inside the group
+    futures.append(writer.submit(insert('apple')))
+    release.set()
+
+    assert futures[0].result(5) == 'apple'
+    with pytest.raises(ValueError, match='cannot add pear'):
+        futures[1].result(5)
+    assert futures[2].result(5) == 'plum'
+    with pytest.raises(Exception, match='UNIQUE'):
+        futures[3].result(5)
+    assert words(deck_engine) == ['apple', 'plum']
+
+def test_stop_finishes_queued_mutations(deck_engine, writer):
+    release = hold(writer)
+    future = writer.submit(insert('apple'))
+    release.set()
+    writer.stop()
+
+    assert future.result(0) == 'apple'
+    with pytest.raises(RuntimeError):
+        writer.submit(insert('pear'))
@@ -0,0 +1,96 @@
+import json
+
+import pytest
+
+import dictionary_cache
+from db_writer import DatabaseWriter
+from dictionary_cache import DictionaryCache
+
+ENTRIES = [{'word': 'apple', 'phonetic': '/ˈæp.əl/'}]
+
+class Clock:
+    """Stands in for the time module, so entries can be expired without waiting"""
+
+    def __init__(self):
+        self.now = 1_700_000_000
+
+    def time(self):
+        return self.now
+
+class FakeApi:
+    """Knows 'apple' only; raises for words in `failing`"""
+
+    def __init__(self):
+        self.calls = []
+        self.failing = set()
+
+    def fetch(self, word):
+        self.calls.append(word)
+        if word in self.failing:
+            raise ConnectionError('offline')
+        if word == 'apple':
+            return 200, json.dumps(ENTRIES).encode('utf-8')
+        return 404, None
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(dictionary_cache, 'time', clock)
+    return clock
+
+@pytest.fixture
+def api():
+    return FakeApi()
+
+def make_cache(engine, api, writer=None):
+    return DictionaryCache(engine, writer=writer, fetch=api.fetch, ttl=1000, miss_ttl=100)
+
+def test_found_words_are_kept_for_the_ttl(deck_engine, clock, api):
+    cache = make_cache(deck_engine, api)
+    assert cache.lookup(' Apple ') == ENTRIES
+    assert cache.lookup('apple') == ENTRIES
+    # Another process (or a restart) reads the table
+    assert make_cache(deck_engine, api).lookup('apple') == ENTRIES
+    assert api.calls == ['apple']
+
+    clock.now += 1000
+    assert cache.lookup('apple') == ENTRIES
+    assert make_cache(deck_engine, api).lookup('apple') == ENTRIES
+    assert api.calls == ['apple', 'apple']
+    assert cache.stats()['memory_hits'] == 1 and cache.stats()['misses'] == 2
+
+def test_unknown_words_are_cached_for_the_miss_ttl(deck_engine, clock, api):
+    cache = make_cache(deck_engine, api)
+    assert cache.lookup('zzyzx') is None
+    assert cache.lookup('zzyzx') is None
+    assert make_cache(deck_engine, api).lookup('zzyzx') is None
+    assert api.calls == ['zzyzx']
+    assert cache.stats()['negative_hits'] == 1
+
+    clock.now += 99
+    assert cache.lookup('zzyzx') is None
+    clock.now += 1
+    assert cache.lookup('zzyzx') is None
+    assert api.calls == ['zzyzx', 'zzyzx']
+
+def test_failures_are_not_cached(deck_engine, clock, api):
+    cache = make_cache(deck_engine, api)
+    api.failing.add('apple')
+    for _ in range(2):
+        with pytest.raises(ConnectionError):
+            cache.lookup('apple')
+    assert cache.stats()['errors'] == 2
+
+    api.failing.clear()
+    assert cache.lookup('apple') == ENTRIES
+    assert api.calls == ['apple'] * 3
+
+def test_entries_are_stored_through_the_writer(deck_engine, clock, api):
+    writer = DatabaseWriter(deck_engine)
+    try:
+        make_cache(deck_engine, api, writer).lookup('apple')
+        writer.run(lambda session: None)  # Wait for the queued store
+    finally:
+        writer.stop()
+    assert make_cache(deck_engine, api).lookup('apple') == ENTRIES
+    assert api.calls == ['apple']
@@ -0,0 +1,47 @@
+import pytest
+from datetime import datetime
+from sqlalchemy import text
+
+from card_reads import CardReader, encode_due_cursor, decode_due_cursor
+
+def add_cards(engine, next_reviews):
+    with engine.begin() as connection:
+        for index, next_review in enumerate(next_reviews):
+            connection.execute(
+                text("INSERT INTO cards (word, meaning, next_review) VALUES (:word, 'm', :next_review)"),
+                {'word': f'word{index}', 'next_review': next_review}
+            )
+
+def due_pages(engine, limit):
+    """Page through the due queue the way /api/cards/due does; returns the ids of each page"""
+    reader = CardReader()
+    pages, cursor = [], None
+    with engine.connect() as connection:
+        while True:
+            cards = reader.due(connection, datetime.utcnow(), limit + 1, cursor, fields=('id', 'next_review'))
+            pages.append([card['id'] for card in cards[:limit]])
+            if len(cards) <= limit:
+                return pages
+            cursor = decode_due_cursor(encode_due_cursor(cards[limit - 1]))
+
+@pytest.mark.parametrize('next_review', ['2020-01-01 00:00:00', '2020-01-01 00:00:00.000000'])
+def test_page_boundary_inside_tied_next_review(deck_engine, next_review):
+    add_cards(deck_engine, [next_review] * 5)
+    assert due_pages(deck_engine, 2) == [[1, 2], [3, 4], [5]]
+
+def test_pages_cover_mixed_timestamps_in_order(deck_engine):
+    add_cards(deck_engine, [
+        '2020-01-02 00:00:00.000000',
+        '2020-01-01 00:00:00',
+        '2020-01-01 00:00:00',
+        '2020-01-01 12:00:00.500000',
+        '2020-01-01 00:00:00'
+    ])
+    assert due_pages(deck_engine, 2) == [[2, 3], [5, 4], [1]]
+
+def test_decode_due_cursor():
+    assert decode_due_cursor(None) is None
+    assert decode_due_cursor('2020-01-01T00:00:00|7') == ('2020-01-01 00:00:00', 7)
+    for cursor in ('garbage', 'notadate|3', '2020-01-01T00:00:00|x'):
+        with pytest.raises(ValueError):
+            decode_due_cursor(cursor)
@@ -0,0 +1,24 @@
+import os
+
+import pytest
+from sqlalchemy import text
+
+from migrations import latest_version
+from models import get_engine, get_session_factory, UserModel, DECK_SCHEMA, USER_SCHEMA
+
+def test_one_engine_per_database_file(tmp_path, monkeypatch):
+    path = str(tmp_path / 'flashcards.db')
+    engine = get_engine(path, DECK_SCHEMA)
+
+    monkeypatch.chdir(tmp_path)
+    assert get_engine('flashcards.db', DECK_SCHEMA) is engine
+    assert get_session_factory(os.path.join('..', tmp_path.name, 'flashcards.db'), DECK_SCHEMA).kw['bind'] is engine
+    with engine.connect() as connection:
+        assert connection.execute(text("PRAGMA user_version")).scalar() == latest_version()
+
+def test_a_file_keeps_its_schema(tmp_path):
+    path = str(tmp_path / 'users.db')
+    first, second = UserModel(path), UserModel(path)
+    assert first.engine is second.engine is get_engine(path, USER_SCHEMA)
+    with pytest.raises(ValueError, match='already open as a user database'):
+        get_engine(path, DECK_SCHEMA)
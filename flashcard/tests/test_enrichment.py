@@ -0,0 +1,59 @@
+import threading
+import time
+
+from enrichment import HostRateLimiter, enrich_words
+
+def test_results_keep_word_order_and_skip_failures():
+    def lookup(word):
+        if word == 'bad':
+            raise ValueError('no entry')
+        time.sleep(0.01 * (len(word) % 3))
+        return word.upper()
+
+    results = enrich_words(['pear', 'bad', 'apple', 'pear', 'kiwi'], lookup, max_workers=4)
+    assert list(results.items()) == [('pear', 'PEAR'), ('apple', 'APPLE'), ('kiwi', 'KIWI')]
+    assert enrich_words([], lookup) == {}
+
+def test_concurrency_is_bounded():
+    running = peak = 0
+    lock = threading.Lock()
+
+    def lookup(word):
+        nonlocal running, peak
+        with lock:
+            running += 1
+            peak = max(peak, running)
+        time.sleep(0.02)
+        with lock:
+            running -= 1
+        return word
+
+    assert len(enrich_words([f'word{i}' for i in range(20)], lookup, max_workers=3)) == 20
+    assert peak == 3
+
+def test_rate_limiter_spaces_requests_per_host():
+    limiter = HostRateLimiter(20)  # One request every 50 ms per host
+    sent = {'a': [], 'b': []}
+
+    def request(host):
+        limiter.wait(f'https://{host}.example.com/word')
+        sent[host].append(time.monotonic())
+
+    threads = [threading.Thread(target=request, args=(host,)) for host in 'aaaabb']
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    for times in sent.values():
+        times.sort()
+        assert all(later - earlier >= 0.045 for earlier, later in zip(times, times[1:]))
+    # Hosts do not wait for each other
+    assert abs(min(sent['b']) - min(sent['a'])) < 0.045
+
+def test_rate_limiter_without_rate_never_waits():
+    limiter = HostRateLimiter(0)
+    started = time.monotonic()
+    for _ in range(100):
+        limiter.wait('https://a.example.com/word')
+    assert time.monotonic() - started < 0.05
@@ -0,0 +1,50 @@
+import time
+from datetime import datetime, timedelta
+
+def test_etag_differs_per_route(client, add_cards):
+    add_cards({'word': 'apple'}, {'word': 'pear'})
+    cards_etag = client.get('/api/cards').headers['ETag']
+    stats_etag = client.get('/api/cards/stats').headers['ETag']
+    due_etag = client.get('/api/cards/due').headers['ETag']
+    assert len({cards_etag, stats_etag, due_etag}) == 3
+
+    # Revalidating one route with another route's ETag gets the full body
+    response = client.get('/api/cards/stats', headers={'If-None-Match': cards_etag})
+    assert response.status_code == 200
+    assert response.get_json()['total'] == 2
+
+def test_unchanged_deck_is_not_modified(client, add_cards):
+    add_cards({'word': 'apple'})
+    etag = client.get('/api/cards?limit=5').headers['ETag']
+
+    response = client.get('/api/cards?limit=5', headers={'If-None-Match': etag})
+    assert response.status_code == 304
+    assert response.headers['ETag'] == etag
+
+    # Another query string is another representation
+    assert client.get('/api/cards?limit=6', headers={'If-None-Match': etag}).status_code == 200
+
+def test_deck_change_invalidates_etag(client, add_cards):
+    add_cards({'word': 'apple'})
+    etag = client.get('/api/cards').headers['ETag']
+    add_cards({'word': 'pear'})
+
+    response = client.get('/api/cards', headers={'If-None-Match': etag})
+    assert response.status_code == 200
+    assert [card['word'] for card in response.get_json()['cards']] == ['apple', 'pear']
+
+def test_stats_and_due_are_not_modified(client, add_cards):
+    add_cards({'word': 'apple'})
+    for route in ('/api/cards/stats', '/api/cards/due'):
+        etag = client.get(route).headers['ETag']
+        assert client.get(route, headers={'If-None-Match': etag}).status_code == 304
+
+def test_due_etag_changes_when_a_card_comes_due(client, add_cards):
+    add_cards({'word': 'apple', 'next_review': datetime.utcnow() + timedelta(seconds=1)})
+    response = client.get('/api/cards/due')
+    assert response.get_json()['cards'] == []
+
+    time.sleep(1.1)
+    response = client.get('/api/cards/due', headers={'If-None-Match': response.headers['ETag']})
+    assert response.status_code == 200
+    assert [card['word'] for card in response.get_json()['cards']] == ['apple']
@@ -0,0 +1,57 @@
+import math
+import random
+from datetime import datetime, timedelta
+
+import numpy as np
+import pytest
+from sqlalchemy import text
+
+from schedulers import SCHEDULERS, MAX_BOX, forecast
+
+def insert_due_cards(engine, cards):
+    """Insert cards given as (days from today until due, box)"""
+    today = datetime.utcnow().replace(hour=12, minute=0, second=0, microsecond=0)
+    with engine.begin() as connection:
+        for i, (offset, box) in enumerate(cards):
+            connection.execute(text(
+                "INSERT INTO cards (word, meaning, box_number, next_review) VALUES (:word, 'm', :box, :due)"
+            ), {'word': f'word{i}', 'box': box, 'due': (today + timedelta(days=offset)).strftime('%Y-%m-%d %H:%M:%S.%f')})
+
+def walk_forward(cards, scheduler, days):
+    """One card at a time: count it on its due day, promote it and schedule the next review"""
+    due = [0] * days
+    for offset, box in cards:
+        offset = max(offset, 0)
+        while offset < days:
+            due[offset] += 1
+            box = min(box + 1, MAX_BOX)
+            offset += max(math.ceil(scheduler.interval_days(np.array([box]), np.array([0]))[0]), 1)
+    return due
+
+def test_leitner_buckets(deck_engine):
+    # Overdue in box 0: today, then +1, +3 and +10 days; the next one (+30) is past the horizon
+    insert_due_cards(deck_engine, [(-5, 0), (2, 4), (40, 0)])
+    with deck_engine.connect() as connection:
+        due = forecast(connection, SCHEDULERS['leitner'], 30)
+    expected = [0] * 30
+    for day in (0, 1, 2, 4, 14):
+        expected[day] = 1
+    assert due.tolist() == expected
+
+@pytest.mark.parametrize('name', sorted(SCHEDULERS))
+def test_matches_walking_each_card(deck_engine, name):
+    rng = random.Random(name)
+    cards = [(rng.randint(-10, 40), rng.randint(0, MAX_BOX)) for _ in range(300)]
+    insert_due_cards(deck_engine, cards)
+    with deck_engine.connect() as connection:
+        assert forecast(connection, SCHEDULERS[name], 45).tolist() == walk_forward(cards, SCHEDULERS[name], 45)
+
+def test_route_dates_and_cache(client, add_cards):
+    body = client.get('/api/cards/forecast?days=7').get_json()
+    today = datetime.utcnow().date()
+    assert [day['date'] for day in body['forecast']] == [(today + timedelta(days=i)).isoformat() for i in range(7)]
+    assert sum(day['count'] for day in body['forecast']) == 0
+
+    # A cached forecast is not served for a newer deck version
+    add_cards({'word': 'apple', 'next_review': datetime.utcnow()})
+    assert client.get('/api/cards/forecast?days=7').get_json()['forecast'][0]['count'] == 1
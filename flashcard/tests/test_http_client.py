@@ -0,0 +1,45 @@
+from http_client import HttpClient
+
+class FakeResponse:
+    def __init__(self, status_code):
+        self.status_code = status_code
+        self.headers = {'Retry-After': '0'}
+
+    def close(self):
+        pass
+
+class FakeSession:
+    """Answers with the given statuses in turn"""
+
+    def __init__(self, statuses):
+        self.statuses = list(statuses)
+        self.calls = 0
+
+    def request(self, method, url, **kwargs):
+        self.calls += 1
+        return FakeResponse(self.statuses.pop(0))
+
+class CountingLimiter:
+    def __init__(self):
+        self.waits = []
+
+    def wait(self, url):
+        self.waits.append(url)
+
+def test_every_retry_waits_for_the_rate_limiter():
+    client = HttpClient(retries=3)
+    client.session = FakeSession([503, 429, 200])
+    limiter = CountingLimiter()
+
+    response = client.get('https://api.example.com/word', limiter=limiter)
+
+    assert response.status_code == 200
+    assert client.session.calls == 3
+    assert limiter.waits == ['https://api.example.com/word'] * 3
+    assert client.stats()['api.example.com']['retries'] == 2
+
+def test_no_limiter_sends_straight_away():
+    client = HttpClient()
+    client.session = FakeSession([200])
+
+    assert client.get('https://api.example.com/word').status_code == 200
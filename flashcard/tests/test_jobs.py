@@ -0,0 +1,80 @@
+import threading
+import time
+
+import pytest
+from sqlalchemy import text
+
+from db_writer import DatabaseWriter
+from jobs import JobManager, Job, JobLost
+
+@pytest.fixture
+def writer(deck_engine):
+    writer = DatabaseWriter(deck_engine)
+    yield writer
+    writer.stop()
+
+def insert_job(engine, job_id, status, created_at, owner=None, lease_expires=None):
+    with engine.begin() as connection:
+        connection.execute(text(
+            "INSERT INTO jobs (id, kind, status, stage, params, created_at, updated_at, owner, lease_expires) "
+            "VALUES (:id, 'count', :status, :status, '{}', :created_at, :created_at, :owner, :lease)"
+        ), {'id': job_id, 'status': status, 'created_at': created_at, 'owner': owner, 'lease': lease_expires})
+
+def load_job(manager, job_id):
+    with manager.engine.connect() as connection:
+        return Job(manager, connection.execute(text("SELECT * FROM jobs WHERE id = :id"), {'id': job_id}).first())
+
+def test_resume_runs_unfinished_jobs_once(deck_engine, writer):
+    now = int(time.time())
+    insert_job(deck_engine, 'a', 'running', 1)                                  # Left by a crashed run
+    insert_job(deck_engine, 'b', 'queued', 2)
+    insert_job(deck_engine, 'c', 'done', 3)
+    insert_job(deck_engine, 'd', 'running', 4, 'other:1:x', now + 600)          # Another process holds it
+
+    runs = []
+    finished = threading.Semaphore(0)
+
+    def count(job):
+        runs.append(job.id)
+        finished.release()
+
+    manager = JobManager(deck_engine, writer, workers=1)
+    manager.register('count', count)
+    assert manager.resume() == 2
+    # Later calls, e.g. from every request, queue nothing more
+    assert manager.resume() == 0
+    for _ in range(2):
+        assert finished.acquire(timeout=5)
+    assert not finished.acquire(timeout=0.2)
+    assert runs == ['a', 'b']
+
+def test_a_job_queued_twice_runs_once(deck_engine, writer):
+    runs = []
+    finished = threading.Event()
+    manager = JobManager(deck_engine, writer, workers=2)
+    manager.register('count', lambda job: (runs.append(job.id), finished.set()))
+
+    job_id = manager.submit('count', {})
+    manager._queue.put(job_id)  # As if resume() saw it too
+    assert finished.wait(5)
+    time.sleep(0.2)
+    assert runs == [job_id]
+    assert manager.get(job_id)['status'] == 'done'
+
+def test_claims_are_exclusive_until_the_lease_expires(deck_engine, writer):
+    first = JobManager(deck_engine, writer, workers=0)
+    second = JobManager(deck_engine, writer, workers=0)
+    insert_job(deck_engine, 'a', 'queued', 1)
+
+    assert first.claim('a')
+    assert not second.claim('a')
+    job = load_job(first, 'a')
+    job.update(processed=1)
+
+    # The first owner stops saving; once the lease has expired the job can be taken over
+    with deck_engine.begin() as connection:
+        connection.execute(text("UPDATE jobs SET lease_expires = 0 WHERE id = 'a'"))
+    assert second.claim('a')
+    with pytest.raises(JobLost):
+        job.update(processed=2)
+    assert second.get('a')['processed'] == 1
@@ -0,0 +1,60 @@
+import json
+import uuid
+from datetime import date, datetime
+from decimal import Decimal
+
+import pytest
+from flask import Flask, jsonify
+
+from json_encoding import FastJSONProvider, ORJSON_AVAILABLE
+
+BACKENDS = ['stdlib', pytest.param('orjson', marks=pytest.mark.skipif(not ORJSON_AVAILABLE, reason='orjson not installed'))]
+
+SAMPLE = {
+    'reviewed': datetime(2024, 1, 2, 3, 4, 5, 678901),
+    'created': datetime(2024, 1, 2, 3, 4, 5),
+    'day': date(2024, 1, 2),
+    'id': uuid.UUID('12345678-1234-5678-1234-567812345678'),
+    'ease': Decimal('2.5'),
+    'boxes': {1: 3, 2: 0},
+    'word': 'nghĩa'
+}
+
+EXPECTED = {
+    'reviewed': '2024-01-02T03:04:05.678901',
+    'created': '2024-01-02T03:04:05',
+    'day': '2024-01-02',
+    'id': '12345678-1234-5678-1234-567812345678',
+    'ease': '2.5',
+    'boxes': {'1': 3, '2': 0},
+    'word': 'nghĩa'
+}
+
+def make_app(backend):
+    app = Flask(__name__)
+    app.debug = True
+    app.json_provider_class = FastJSONProvider
+    app.json = FastJSONProvider(app)
+    app.json.backend = backend
+
+    @app.route('/sample')
+    def sample():
+        return jsonify(SAMPLE)
+
+    return app
+
+@pytest.mark.parametrize('backend', BACKENDS)
+def test_backends_encode_the_same_values(backend):
+    app = make_app(backend)
+    response = app.test_client().get('/sample')
+    assert response.mimetype == 'application/json'
+    assert json.loads(response.data) == EXPECTED
+    # Compact output, also in debug mode
+    assert b': ' not in response.data and b', ' not in response.data
+    assert json.loads(app.json.dumps(SAMPLE)) == EXPECTED
+
+@pytest.mark.parametrize('backend', BACKENDS)
+def test_unknown_types_are_rejected(backend):
+    app = make_app(backend)
+    with pytest.raises(TypeError):
+        app.json.dumps({'value': object()})
@@ -0,0 +1,97 @@
+import os
+
+import pytest
+
+from lexicon import (
+    Lexicon, open_lexicon, write_lexicon, read_wiktionary_jsonl, entry_details, main, DEFAULT_LEXICON_PATH
+)
+
+SAMPLE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'wiktionary_sample.jsonl')
+
+@pytest.fixture
+def lexicon(tmp_path):
+    """Lexicon built from the sample Wiktionary extract, as `lexicon.py build` does"""
+    path = str(tmp_path / 'lexicon.bin')
+    assert main(['lexicon.py', 'build', SAMPLE, path]) == 0
+    lexicon = Lexicon(path)
+    yield lexicon
+    lexicon.close()
+
+def test_lookup_reads_back_the_extract(lexicon):
+    # Phrases and other languages are left out
+    assert len(lexicon) == 4
+    assert lexicon.lookup('ice cream') is None
+    assert lexicon.lookup('musique') is None
+
+    entry = lexicon.lookup(' Journey ')
+    assert entry.ipa == '/ˈdʒɜːni/'
+    assert entry.pos == 'noun'
+    assert entry.definition == 'A set amount of travelling, seen as a single unit.'
+    assert entry.example == "It's a three-day journey."
+
+    # Wiktionary POS codes are renamed; the most specific gloss is kept
+    happy = lexicon.lookup('happy')
+    assert happy.pos == 'adjective'
+    assert happy.definition == 'Content, satisfied.'
+    assert happy.example == ''
+
+def test_first_entry_wins_for_repeated_words(lexicon):
+    assert lexicon.lookup('welcome').pos == 'interjection'
+    assert lexicon.lookup('welcome').definition == "Greeting given upon someone's arrival."
+
+def test_lookup_misses(lexicon):
+    assert lexicon.lookup('') is None
+    assert lexicon.lookup('aaa') is None
+    assert lexicon.lookup('zzz') is None
+    assert 'music' in lexicon and 'muse' not in lexicon
+
+def test_explicit_pos_overrides_the_lexicon(lexicon):
+    # The extract lists 'welcome' as an interjection first; the app pins it as a verb
+    ipa, meaning, example, pos = entry_details('Welcome', lexicon.lookup('Welcome'))
+    assert pos == 'verb'
+    assert ipa == '/ˈwɛlkəm/'
+    assert entry_details('music', lexicon.lookup('music'))[3] == 'noun'
+    assert entry_details('happy', lexicon.lookup('happy'))[3] == 'adjective'
+
+def test_write_lexicon_merges_empty_fields(tmp_path):
+    path = str(tmp_path / 'lexicon.bin')
+    count = write_lexicon([('Word', '', 'noun', 'first', ''), ('word', '/w/', 'verb', 'second', 'ex')], path)
+    lexicon = Lexicon(path)
+    try:
+        assert count == 1
+        assert lexicon.lookup('word') == ('/w/', 'noun', 'first', 'ex')
+    finally:
+        lexicon.close()
+
+def test_sample_reader_yields_english_single_words():
+    words = [word for word, *_ in read_wiktionary_jsonl(SAMPLE)]
+    assert words == ['welcome', 'welcome', 'music', 'Journey', 'happy']
+
+def test_shipped_lexicon_is_built_from_the_seed(tmp_path):
+    seed = os.path.join(os.path.dirname(DEFAULT_LEXICON_PATH), 'lexicon_seed.jsonl')
+    path = str(tmp_path / 'lexicon.bin')
+    write_lexicon(read_wiktionary_jsonl(seed), path)
+    with open(path, 'rb') as built, open(DEFAULT_LEXICON_PATH, 'rb') as shipped:
+        assert built.read() == shipped.read(), "Rebuild data/lexicon.bin from data/lexicon_seed.jsonl"
+
+def test_import_words_offline(app_module_empty, monkeypatch):
+    app = app_module_empty
+    fetched = []
+
+    def offline_fetch(word):
+        fetched.append(word)
+        raise ConnectionError('offline')
+
+    monkeypatch.setattr(app, 'lexicon', open_lexicon(DEFAULT_LEXICON_PATH))
+    monkeypatch.setattr(app.dictionary_cache, 'fetch', offline_fetch)
+
+    cards = {card['word']: card for card in app.build_import_cards(['welcome', 'journey', 'quickly', 'zzyzx'])}
+
+    # Words in the lexicon never reach the network; the unknown one has no IPA and is skipped
+    assert fetched == ['zzyzx']
+    assert sorted(cards) == ['journey', 'quickly', 'welcome']
+    assert cards['welcome']['pos'] == 'verb'
+    assert cards['quickly'] == {
+        'word': 'quickly', 'ipa': '/ˈkwɪkli/', 'pos': 'adverb',
+        'meaning': 'At a fast speed; in a short time.', 'example': 'She quickly finished her homework.'
+    }
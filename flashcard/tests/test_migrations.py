@@ -0,0 +1,32 @@
+from sqlalchemy import text
+
+from migrations import run_migrations
+
+def deck_version(connection):
+    return connection.execute(text("SELECT version FROM deck_version WHERE id = 1")).scalar()
+
+def test_padding_timestamps_keeps_the_deck_version(deck_engine):
+    with deck_engine.begin() as connection:
+        for word in ('one', 'two', 'three'):
+            connection.execute(text(
+                "INSERT INTO cards (word, meaning, box_number) VALUES (:word, 'meaning', 0)"
+            ), {'word': word})
+        # Timestamps as written before migration 10
+        connection.execute(text(
+            "UPDATE cards SET created_at = '2024-01-02 03:04:05', next_review = '2024-01-03 03:04:05'"
+        ))
+        connection.execute(text("PRAGMA user_version = 9"))
+        version = deck_version(connection)
+
+    assert 10 in run_migrations(deck_engine)
+
+    with deck_engine.connect() as connection:
+        assert deck_version(connection) == version
+        assert connection.execute(text("SELECT DISTINCT created_at, next_review FROM cards")).all() == [
+            ('2024-01-02 03:04:05.000000', '2024-01-03 03:04:05.000000')
+        ]
+
+    # The version trigger is back for later writes
+    with deck_engine.begin() as connection:
+        connection.execute(text("UPDATE cards SET meaning = 'changed' WHERE word = 'one'"))
+        assert deck_version(connection) == version + 1
@@ -0,0 +1,29 @@
+import pytest
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+
+from sqlite_tuning import create_read_only_engine
+
+@pytest.fixture
+def read_engine(deck_engine):
+    engine = create_read_only_engine(deck_engine.url.database)
+    yield engine
+    engine.dispose()
+
+def test_read_connections_cannot_write(deck_engine, read_engine):
+    with read_engine.connect() as connection:
+        assert connection.execute(text("SELECT COUNT(*) FROM cards")).scalar() == 0
+        with pytest.raises(OperationalError, match='readonly|read-only'):
+            connection.execute(text("INSERT INTO cards (word, meaning, box_number) VALUES ('apple', 'm', 0)"))
+
+def test_pooled_read_connections_see_new_commits(deck_engine, read_engine):
+    # Autocommit: a pooled connection does not keep an old snapshot open
+    with read_engine.connect() as connection:
+        connection.execute(text("SELECT COUNT(*) FROM cards")).scalar()
+        with deck_engine.begin() as writer:
+            writer.execute(text("INSERT INTO cards (word, meaning, box_number) VALUES ('apple', 'm', 0)"))
+        assert connection.execute(text("SELECT COUNT(*) FROM cards")).scalar() == 1
+
+    with read_engine.connect() as connection:
+        assert connection.execute(text("PRAGMA journal_mode")).scalar() == 'wal'
+        assert connection.execute(text("SELECT word FROM cards")).scalar() == 'apple'
@@ -0,0 +1,37 @@
+from sqlalchemy import text
+
+def review_count(app_module, card_id):
+    with app_module.engine.connect() as connection:
+        return connection.execute(
+            text("SELECT COUNT(*) FROM review_events WHERE card_id = :id"), {'id': card_id}
+        ).scalar()
+
+def test_resent_batch_is_applied_once(client, add_cards, app_module):
+    card_id, = add_cards({'word': 'apple'})
+    batch = {'reviews': [
+        {'card_id': card_id, 'correct': True, 'reviewed_at': '2024-01-01T10:00:00Z', 'client_review_id': 'r1'},
+        {'card_id': card_id, 'correct': True, 'reviewed_at': '2024-01-01T10:05:00Z', 'client_review_id': 'r2'},
+        {'card_id': 999999, 'correct': True, 'reviewed_at': '2024-01-01T10:06:00Z', 'client_review_id': 'r3'}
+    ]}
+
+    first = client.post('/api/reviews/batch', json=batch).get_json()
+    assert first['applied'] == 2
+    assert [result['status'] for result in first['results']] == ['applied', 'applied', 'not_found']
+    assert first['cards'][0]['box_number'] == 2
+
+    # The client did not see the answer and sends the batch again, with one new review
+    batch['reviews'].append(
+        {'card_id': card_id, 'correct': False, 'reviewed_at': '2024-01-01T10:10:00Z', 'client_review_id': 'r4'}
+    )
+    second = client.post('/api/reviews/batch', json=batch).get_json()
+    assert second['applied'] == 1
+    assert [result['status'] for result in second['results']] == ['duplicate', 'duplicate', 'not_found', 'applied']
+    assert second['cards'][0]['box_number'] == 1
+    assert review_count(app_module, card_id) == 3
+
+def test_invalid_batches_are_rejected(client, add_cards, app_module):
+    card_id, = add_cards({'word': 'apple'})
+    assert client.post('/api/reviews/batch', json={'reviews': []}).status_code == 400
+    response = client.post('/api/reviews/batch', json={'reviews': [{'card_id': card_id, 'correct': True}]})
+    assert response.status_code == 400
+    assert review_count(app_module, card_id) == 0
@@ -0,0 +1,110 @@
+import threading
+from datetime import datetime
+
+import pytest
+from sqlalchemy import text
+
+from db_writer import DatabaseWriter
+from review_log import ReviewEventWriter
+from schedulers import LeitnerScheduler
+
+@pytest.fixture
+def writers(deck_engine):
+    with deck_engine.begin() as connection:
+        connection.execute(text("INSERT INTO cards (id, word, meaning, box_number) VALUES (1, 'word', 'm', 0)"))
+    db_writer = DatabaseWriter(deck_engine)
+    # A long interval keeps reviews in the buffer until the test flushes
+    review_writer = ReviewEventWriter(db_writer, flush_interval_ms=60000, max_events=1000)
+    yield deck_engine, review_writer
+    review_writer.stop()
+    db_writer.stop()
+
+def load_from(engine):
+    def load(card_id):
+        with engine.connect() as connection:
+            row = connection.execute(text("SELECT id, box_number FROM cards WHERE id = :id"), {'id': card_id}).first()
+            if row is None:
+                return None, 0
+            lapses = connection.execute(
+                text("SELECT COUNT(*) FROM review_events WHERE card_id = :id AND outcome = 0"), {'id': card_id}
+            ).scalar()
+            return dict(row._mapping), lapses
+    return load
+
+def test_lapses_include_buffered_failures(writers):
+    engine, review_writer = writers
+    seen_lapses = []
+
+    def schedule(box_number, correct, reviewed_at, lapses):
+        seen_lapses.append(lapses)
+        return LeitnerScheduler().schedule(box_number, correct, reviewed_at, lapses)
+
+    for correct in (False, False, True):
+        review_writer.review(1, 1, datetime.utcnow(), correct, load_from(engine), schedule)
+    review_writer.flush()
+    review_writer.review(1, 1, datetime.utcnow(), False, load_from(engine), schedule)
+
+    assert seen_lapses == [0, 1, 2, 2]
+
+def test_concurrent_reviews_of_one_card_are_serialized(writers):
+    engine, review_writer = writers
+    results = []
+
+    def answer():
+        card = review_writer.review(1, 1, datetime.utcnow(), True, load_from(engine), LeitnerScheduler().schedule)
+        results.append(card['box_number'])
+
+    threads = [threading.Thread(target=answer) for _ in range(5)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    review_writer.flush()
+
+    assert sorted(results) == [1, 2, 3, 4, 5]
+    with engine.connect() as connection:
+        assert connection.execute(text("SELECT box_number FROM cards WHERE id = 1")).scalar() == 5
+        assert connection.execute(text("SELECT COUNT(*) FROM review_events")).scalar() == 5
+
+def test_missing_card(writers):
+    engine, review_writer = writers
+    assert review_writer.review(99, 1, datetime.utcnow(), True, load_from(engine), LeitnerScheduler().schedule) is None
+
+def test_flush_committed_during_load_rereads_the_card(writers):
+    engine, review_writer = writers
+    scheduler = LeitnerScheduler()
+    review_writer.review(1, 1, datetime.utcnow(), True, load_from(engine), scheduler.schedule)
+    stale_load = load_from(engine)
+    loads = []
+
+    def load_racing_a_flush(card_id):
+        # Read the card, then let the buffered review commit before returning
+        result = stale_load(card_id)
+        if not loads:
+            review_writer.flush()
+        loads.append(result[0]['box_number'])
+        return result
+
+    card = review_writer.review(1, 1, datetime.utcnow(), True, load_racing_a_flush, scheduler.schedule)
+
+    assert loads == [0, 1]
+    assert card['box_number'] == 2
+
+def test_overlay_applies_buffered_reviews(writers):
+    engine, review_writer = writers
+    assert review_writer.pending_sequence() is None
+    reviewed_at = datetime(2024, 1, 2, 3, 4, 5)
+    review_writer.review(1, 1, reviewed_at, True, load_from(engine), LeitnerScheduler().schedule)
+    assert review_writer.pending_sequence() == 1
+
+    cards = [
+        {'id': 1, 'box_number': 0, 'last_reviewed': None, 'word': 'word'},
+        {'id': 2, 'box_number': 3, 'last_reviewed': None}
+    ]
+    review_writer.overlay(cards)
+    assert cards[0] == {'id': 1, 'box_number': 1, 'last_reviewed': '2024-01-02T03:04:05.000000', 'word': 'word'}
+    assert cards[1] == {'id': 2, 'box_number': 3, 'last_reviewed': None}
+
+    review_writer.flush()
+    assert review_writer.pending_sequence() is None
+    assert review_writer.overlay([{'id': 1, 'box_number': 0}]) == [{'id': 1, 'box_number': 0}]
@@ -0,0 +1,55 @@
+import json
+import os
+import re
+import shutil
+import subprocess
+
+import pytest
+
+STATIC_JS = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'static', 'js')
+APP_PY = os.path.join(os.path.dirname(STATIC_JS), '..', 'app.py')
+
+pytestmark = pytest.mark.skipif(shutil.which('node') is None, reason='needs node')
+
+def run_chunking(reviews):
+    """Chunk `reviews` with review_queue.js; returns the chunks and the module's limits"""
+    script = (
+        "const q = require(process.argv[1]);"
+        "const reviews = JSON.parse(require('fs').readFileSync(0, 'utf8'));"
+        "console.log(JSON.stringify({chunks: q.chunkReviews(reviews),"
+        " maxEntries: q.REVIEW_CHUNK_MAX_ENTRIES, maxBytes: q.REVIEW_CHUNK_MAX_BYTES}));"
+    )
+    result = subprocess.run(
+        ['node', '-e', script, os.path.join(STATIC_JS, 'review_queue.js')],
+        input=json.dumps(reviews), capture_output=True, text=True, check=True
+    )
+    return json.loads(result.stdout)
+
+def make_reviews(count, id_length=36):
+    return [
+        {'card_id': i, 'correct': i % 2 == 0, 'reviewed_at': '2024-01-01T10:00:00.000Z',
+         'client_review_id': str(i).rjust(id_length, '0')}
+        for i in range(count)
+    ]
+
+@pytest.mark.parametrize('count', [0, 1, 100, 101, 450, 2500])
+def test_long_queue_is_sent_in_bounded_chunks(count):
+    reviews = make_reviews(count)
+    result = run_chunking(reviews)
+    chunks = result['chunks']
+
+    assert [review for chunk in chunks for review in chunk] == reviews
+    for chunk in chunks:
+        assert 0 < len(chunk) <= result['maxEntries']
+        assert len(json.dumps({'reviews': chunk}, separators=(',', ':')).encode()) <= result['maxBytes']
+
+def test_chunks_stay_under_keepalive_limit_for_large_entries():
+    result = run_chunking(make_reviews(300, id_length=1000))
+    assert len(result['chunks']) > 3
+    for chunk in result['chunks']:
+        assert len(json.dumps({'reviews': chunk}, separators=(',', ':')).encode()) <= result['maxBytes'] < 64 * 1024
+
+def test_chunk_size_is_within_server_batch_limit():
+    with open(APP_PY, encoding='utf-8') as f:
+        max_review_batch = int(re.search(r'^MAX_REVIEW_BATCH = (\d+)', f.read(), re.M).group(1))
+    assert run_chunking([])['maxEntries'] <= max_review_batch
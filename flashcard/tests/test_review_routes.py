@@ -0,0 +1,33 @@
+def test_reads_include_buffered_reviews(client, add_cards, app_module):
+    card_id, = add_cards({'word': 'apple'})
+    etag = client.get('/api/cards').headers['ETag']
+    assert [card['id'] for card in client.get('/api/cards/due').get_json()['cards']] == [card_id]
+
+    assert client.post(f'/api/cards/{card_id}/review', json={'correct': True}).get_json()['box_number'] == 1
+
+    # Whether or not the review was flushed yet, reads see it and the ETag moved on
+    response = client.get('/api/cards', headers={'If-None-Match': etag})
+    assert response.status_code == 200
+    assert response.get_json()['cards'][0]['box_number'] == 1
+    assert client.get('/api/cards/search?q=apple').get_json()['cards'][0]['box_number'] == 1
+    # The answered card is not due any more
+    assert client.get('/api/cards/due').get_json()['cards'] == []
+
+    app_module.review_writer.flush()
+    assert client.get('/api/cards/stats').get_json()['box_1']['count'] == 1
+
+def test_mark_learned_moves_the_card_to_the_last_box(client, add_cards, app_module):
+    card_id, = add_cards({'word': 'apple'})
+    # A buffered review does not undo it when flushed afterwards
+    client.post(f'/api/cards/{card_id}/review', json={'correct': False})
+
+    response = client.post(f'/api/cards/{card_id}/learned')
+    assert response.status_code == 200
+    card = response.get_json()['card']
+    assert card['box_number'] == app_module.MAX_BOX
+    assert card['next_review'] > card['last_reviewed']
+
+    app_module.review_writer.flush()
+    assert client.get('/api/cards/stats').get_json()[f'box_{app_module.MAX_BOX}']['count'] == 1
+    assert client.get('/api/cards/due').get_json()['cards'] == []
+    assert client.post('/api/cards/999999/learned').status_code == 404
@@ -0,0 +1,36 @@
+from datetime import datetime
+
+import pytest
+from sqlalchemy import text
+
+from schedulers import Scheduler, LeitnerScheduler, EaseFactorScheduler, BOX_INTERVALS, MAX_BOX, reschedule
+
+def test_leitner_box_intervals_match_box_table():
+    assert LeitnerScheduler().box_intervals() == [float(BOX_INTERVALS[box]) for box in range(MAX_BOX + 1)]
+
+def test_sm2_box_intervals_grow_with_the_box():
+    intervals = EaseFactorScheduler().box_intervals()
+    assert len(intervals) == MAX_BOX + 1
+    assert intervals[0] == 0.0 and intervals[1] == 1.0
+    assert intervals == sorted(intervals)
+
+def test_scheduler_requires_interval_days():
+    class Incomplete(Scheduler):
+        name = 'incomplete'
+
+    with pytest.raises(TypeError):
+        Incomplete()
+
+def test_reschedule_writes_microsecond_timestamps(deck_engine):
+    with deck_engine.begin() as connection:
+        connection.execute(text(
+            "INSERT INTO cards (word, meaning, box_number, last_reviewed) "
+            "VALUES ('a', 'm', 2, '2024-01-01 10:00:00.000000'), ('b', 'm', 5, '2024-01-01 10:00:00')"
+        ))
+
+    assert reschedule(deck_engine, LeitnerScheduler()) == 2
+    with deck_engine.connect() as connection:
+        rows = connection.execute(text("SELECT next_review, updated_at FROM cards ORDER BY id")).fetchall()
+    assert [row.next_review for row in rows] == ['2024-01-04 10:00:00.000000', '2024-03-31 10:00:00.000000']
+    for row in rows:
+        datetime.strptime(row.updated_at, '%Y-%m-%d %H:%M:%S.%f')
@@ -0,0 +1,29 @@
+import logging
+import sqlite3
+
+from sqlite_tuning import load_sqlite_settings, apply_sqlite_settings, DEFAULT_SQLITE_SETTINGS
+
+def test_invalid_config_values_fall_back_to_the_defaults(tmp_path, caplog):
+    path = tmp_path / 'sqlite_config.ini'
+    path.write_text("[SQLITE]\nbusy_timeout_ms = ten\ncache_size_kib = 1024\nsynchronous = full\n", encoding='utf-8')
+
+    with caplog.at_level(logging.WARNING, logger='app.sqlite_tuning'):
+        settings = load_sqlite_settings(str(path))
+
+    assert settings['busy_timeout_ms'] == DEFAULT_SQLITE_SETTINGS['busy_timeout_ms']
+    assert settings['cache_size_kib'] == 1024
+    assert settings['synchronous'] == 'FULL'
+    assert "Invalid busy_timeout_ms 'ten'" in caplog.text
+
+def test_journal_mode_that_does_not_apply_is_logged(tmp_path, caplog):
+    # In-memory databases only support the MEMORY and OFF journal modes
+    connection = sqlite3.connect(':memory:')
+    with caplog.at_level(logging.WARNING, logger='app.sqlite_tuning'):
+        apply_sqlite_settings(connection, DEFAULT_SQLITE_SETTINGS)
+    assert 'journal_mode WAL not applied, using memory' in caplog.text
+
+    caplog.clear()
+    connection = sqlite3.connect(str(tmp_path / 'deck.db'))
+    with caplog.at_level(logging.WARNING, logger='app.sqlite_tuning'):
+        apply_sqlite_settings(connection, DEFAULT_SQLITE_SETTINGS)
+    assert caplog.text == ''
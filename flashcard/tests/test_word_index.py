@@ -0,0 +1,150 @@
+import random
+
+import pytest
+from sqlalchemy.orm import sessionmaker
+
+from models import Card
+from word_index import WordIndex, BKTree, PartitionedBKTrees, edit_distance, pattern_mask, track_card_changes
+
+LETTERS = 'abcde'  # A small alphabet, so many words are within a typo of each other
+
+def levenshtein(a, b):
+    previous = list(range(len(b) + 1))
+    for i, char_a in enumerate(a, 1):
+        current = [i]
+        for j, char_b in enumerate(b, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (char_a != char_b)))
+        previous = current
+    return previous[-1]
+
+def random_words(rng, count, min_length=3, max_length=8):
+    return sorted({
+        ''.join(rng.choice(LETTERS) for _ in range(rng.randint(min_length, max_length)))
+        for _ in range(count)
+    })
+
+def test_edit_distance_matches_levenshtein():
+    rng = random.Random(1)
+    for _ in range(2000):
+        a = ''.join(rng.choice(LETTERS) for _ in range(rng.randint(0, 12)))
+        b = ''.join(rng.choice(LETTERS) for _ in range(rng.randint(0, 12)))
+        assert edit_distance(pattern_mask(a), len(a), b) == levenshtein(a, b), (a, b)
+
+@pytest.mark.parametrize('max_distance', [1, 2])
+def test_bk_tree_search_matches_brute_force(max_distance):
+    rng = random.Random(2)
+    words = random_words(rng, 400)
+    tree = BKTree()
+    for word in words + words[:50]:
+        tree.add(word)
+    assert tree.size == len(words)
+
+    for query in random_words(rng, 50):
+        expected = sorted((levenshtein(query, word), word) for word in words
+                          if levenshtein(query, word) <= max_distance)
+        assert sorted(tree.search(query, max_distance)) == expected
+
+def test_partitioned_trees_match_brute_force_with_the_same_first_letter():
+    rng = random.Random(3)
+    words = random_words(rng, 400)
+    trees = PartitionedBKTrees()
+    for word in words:
+        trees.add(word)
+
+    for query in random_words(rng, 50):
+        expected = sorted((levenshtein(query, word), word) for word in words
+                          if word[0] == query[0] and levenshtein(query, word) <= 2)
+        assert sorted(trees.search(query, 2)) == expected
+
+def test_partitioned_trees_count_each_key_once():
+    trees = PartitionedBKTrees()
+    for key in ('abc', 'abc', 'abd'):
+        trees.add(key)
+    trees.search('abc', 1)  # Moves the queued keys into their tree
+    trees.add('abc')
+    assert trees.size == 2
+
+def test_suggest_prefix_then_fuzzy():
+    index = WordIndex()
+    for word in ('Apple', 'apple', 'apply', 'banana', 'bandana', 'cherry'):
+        index.add(word)
+
+    assert index.suggest('app') == [
+        {'word': 'Apple', 'match': 'prefix', 'distance': 0},
+        {'word': 'apple', 'match': 'prefix', 'distance': 0},
+        {'word': 'apply', 'match': 'prefix', 'distance': 0}
+    ]
+    assert index.suggest('app', limit=2) == index.suggest('app')[:2]
+    assert index.suggest('chery') == [{'word': 'cherry', 'match': 'fuzzy', 'distance': 1}]
+    # Longer input falls back to distance 2 when nothing is within 1
+    assert [s['word'] for s in index.suggest('bannnaa')] == ['banana']
+    assert index.suggest('zz') == []
+
+def test_suggest_fuzzy_matches_brute_force():
+    rng = random.Random(4)
+    words = random_words(rng, 300, min_length=4)
+    index = WordIndex()
+    for word in words:
+        index.add(word)
+
+    for query in random_words(rng, 100, min_length=4):
+        if any(word.startswith(query) for word in words):
+            continue
+        for max_distance in (1, 2):
+            expected = sorted((levenshtein(query, word), word) for word in words
+                              if word[0] == query[0] and levenshtein(query, word) <= max_distance)
+            expected = [{'word': word, 'match': 'fuzzy', 'distance': distance} for distance, word in expected]
+            if expected or max_distance == 2 or len(query) <= 4:
+                break
+        assert index.suggest(query, limit=1000) == expected, query
+
+def test_removed_words_are_not_suggested_and_the_tree_is_rebuilt():
+    index = WordIndex()
+    index.add('cherry')
+    index.add('Cherry')
+    index.remove('cherry')
+    assert [s['word'] for s in index.suggest('chery')] == ['Cherry']
+    index.remove('Cherry')
+    assert index.suggest('chery') == []
+    assert index.suggest('che') == []
+
+    # Re-adding a stale key does not count it twice; enough stale keys trigger a rebuild
+    index.add('cherry')
+    assert index._tree.size == 1
+    for i in range(100):
+        index.add(f'word{i}')
+    for i in range(100):
+        index.remove(f'word{i}')
+    assert index._tree.size <= 2 * len(index._keys) + 64
+    assert [s['word'] for s in index.suggest('chery')] == ['cherry']
+
+def test_index_follows_committed_card_changes(deck_engine):
+    index = WordIndex()
+    Session = sessionmaker(bind=deck_engine)
+    track_card_changes(Session, index)
+
+    with Session() as session:
+        card = Card(word='journey', meaning='m')
+        session.add(card)
+        session.commit()
+        assert [s['word'] for s in index.suggest('jour')] == ['journey']
+
+        # Rename
+        card.word = 'Journal'
+        session.commit()
+        assert [s['word'] for s in index.suggest('jour')] == ['Journal']
+        assert index.suggest('journe') == [{'word': 'Journal', 'match': 'fuzzy', 'distance': 2}]
+
+        # A rolled back change is never applied
+        card.word = 'voyage'
+        session.flush()
+        session.rollback()
+        assert index.suggest('voy') == []
+
+        session.delete(card)
+        session.commit()
+        assert index.suggest('jour') == []
+
+    with deck_engine.connect() as connection:
+        index.load(connection)
+    assert index.suggest('j') == []
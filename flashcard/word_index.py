@@ -0,0 +1,318 @@
+import bisect
+import logging
+import threading
+
+from sqlalchemy import event, text, inspect as sa_inspect
+
+from models import Card
+
+logger = logging.getLogger('app.word_index')
+
+# Fuzzy matching only starts once a few characters have been typed; shorter
+# input is within edit distance 1-2 of a large part of any vocabulary
+MIN_FUZZY_LENGTH = 3
+# Inputs up to this length tolerate one typo, longer ones two
+SHORT_WORD_LENGTH = 4
+
+def edit_distance(pattern_bits, pattern_length, word):
+    """
+    Levenshtein distance between a pattern and `word`, using the bit-parallel
+    algorithm of Myers/Hyyrö: one pass over `word` with a handful of integer
+    operations per character instead of a full dynamic-programming table.
+
+    Args:
+        pattern_bits: Result of pattern_mask(pattern)
+        pattern_length: len(pattern)
+        word: Word to compare against
+    """
+    if not pattern_length:
+        return len(word)
+
+    mask = (1 << pattern_length) - 1
+    last_bit = 1 << (pattern_length - 1)
+    positive, negative = mask, 0
+    distance = pattern_length
+
+    for char in word:
+        equal = pattern_bits.get(char, 0)
+        vertical = equal | negative
+        horizontal = (((equal & positive) + positive) ^ positive) | equal
+        horizontal_positive = negative | ~(horizontal | positive)
+        horizontal_negative = positive & horizontal
+
+        if horizontal_positive & last_bit:
+            distance += 1
+        elif horizontal_negative & last_bit:
+            distance -= 1
+
+        horizontal_positive = (horizontal_positive << 1) | 1
+        horizontal_negative <<= 1
+        positive = (horizontal_negative | ~(vertical | horizontal_positive)) & mask
+        negative = horizontal_positive & vertical
+    return distance
+
+def pattern_mask(pattern):
+    """Map each character of `pattern` to the bit mask of its positions"""
+    bits = {}
+    for position, char in enumerate(pattern):
+        bits[char] = bits.get(char, 0) | (1 << position)
+    return bits
+
+class BKTree:
+    """
+    Burkhard-Keller tree over edit distance. Each child edge is labelled with the
+    distance to its parent, so a search within distance d only follows edges in
+    [distance - d, distance + d] and skips most of the vocabulary.
+
+    Removing a key from a BK-tree would mean rebuilding its subtree, so callers
+    skip keys that are no longer live instead and rebuild the tree from time to time.
+    """
+
+    def __init__(self):
+        self._root = None  # [key, {distance: child}]
+        self.size = 0
+
+    def add(self, key):
+        self.size += 1
+        if self._root is None:
+            self._root = [key, {}]
+            return
+
+        bits, length = pattern_mask(key), len(key)
+        node = self._root
+        while True:
+            distance = edit_distance(bits, length, node[0])
+            if distance == 0:
+                self.size -= 1
+                return
+            child = node[1].get(distance)
+            if child is None:
+                node[1][distance] = [key, {}]
+                return
+            node = child
+
+    def search(self, query, max_distance):
+        """Return (distance, key) pairs for every key within max_distance of query"""
+        if self._root is None:
+            return []
+
+        bits, length = pattern_mask(query), len(query)
+        matches = []
+        stack = [self._root]
+        while stack:
+            key, children = stack.pop()
+            distance = edit_distance(bits, length, key)
+            if distance <= max_distance:
+                matches.append((distance, key))
+            for edge in range(max(distance - max_distance, 1), distance + max_distance + 1):
+                child = children.get(edge)
+                if child is not None:
+                    stack.append(child)
+        return matches
+
+class PartitionedBKTrees:
+    """
+    One BK-tree per (first character, key length). Keys within edit distance d of
+    a query differ in length by at most d, so a search only walks 2d + 1 small trees
+    instead of one tree holding the whole vocabulary.
+
+    Matching the first character is an autocomplete assumption: the user can see
+    what they started typing, so typos are looked for in the rest of the word.
+
+    Keys are only queued when added; a partition's tree is built the first time a
+    search needs it, so loading a large deck at startup costs no distance computations.
+    `size` counts distinct keys, stale ones included, whether queued or in a tree.
+    """
+
+    def __init__(self):
+        self._trees = {}
+        self._pending = {}  # partition -> keys not inserted into its tree yet
+        self._keys = set()  # every key added, queued or in a tree
+        self.size = 0
+
+    def add(self, key):
+        if key in self._keys:
+            return
+        self._keys.add(key)
+        self._pending.setdefault((key[0], len(key)), []).append(key)
+        self.size += 1
+
+    def search(self, query, max_distance):
+        matches = []
+        for length in range(len(query) - max_distance, len(query) + max_distance + 1):
+            tree = self._tree((query[0], length))
+            if tree is not None:
+                matches.extend(tree.search(query, max_distance))
+        return matches
+
+    def _tree(self, partition):
+        pending = self._pending.pop(partition, None)
+        tree = self._trees.get(partition)
+        if pending:
+            if tree is None:
+                tree = self._trees[partition] = BKTree()
+            for key in pending:
+                tree.add(key)
+        return tree
+
+class WordIndex:
+    """
+    In-memory autocomplete index of card words.
+
+    Prefix matches come from a sorted list of lower-cased words (two binary
+    searches per keystroke), typo-tolerant matches from BK-trees split by first
+    character and word length. The index is loaded once at startup and kept current by
+    `track_card_changes`, which applies the word changes of every committed ORM session.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._clear()
+
+    def _clear(self):
+        self._keys = []     # sorted, lower-cased
+        self._words = {}    # key -> set of card words with that key
+        self._tree = PartitionedBKTrees()
+
+    def load(self, connection):
+        """Replace the index contents with the words currently in the cards table"""
+        words = [row[0] for row in connection.execute(text("SELECT word FROM cards")) if row[0]]
+        with self._lock:
+            self._clear()
+            for word in words:
+                self._words.setdefault(word.lower(), set()).add(word)
+            self._keys = sorted(self._words)
+            for key in self._keys:
+                self._tree.add(key)
+        logger.info(f"Loaded {len(words)} words into the word index")
+
+    def add(self, word):
+        if not word:
+            return
+        key = word.lower()
+        with self._lock:
+            words = self._words.get(key)
+            if words is None:
+                self._words[key] = {word}
+                bisect.insort(self._keys, key)
+                self._tree.add(key)
+            else:
+                words.add(word)
+
+    def remove(self, word):
+        if not word:
+            return
+        key = word.lower()
+        with self._lock:
+            words = self._words.get(key)
+            if words is None:
+                return
+            words.discard(word)
+            if words:
+                return
+            del self._words[key]
+            position = bisect.bisect_left(self._keys, key)
+            if position < len(self._keys) and self._keys[position] == key:
+                del self._keys[position]
+            # Removed keys stay in the BK-tree until half of it is stale
+            if self._tree.size > 2 * len(self._keys) + 64:
+                self._tree = PartitionedBKTrees()
+                for live_key in self._keys:
+                    self._tree.add(live_key)
+
+    def apply(self, changes):
+        """Apply a list of ('add' | 'remove', word) changes in order"""
+        for action, word in changes:
+            if action == 'add':
+                self.add(word)
+            else:
+                self.remove(word)
+
+    def suggest(self, prefix, limit=10):
+        """
+        Suggest words for partially typed input.
+
+        Words starting with the input are returned in alphabetical order. If no word
+        starts with it, the input is treated as a typo and words within edit distance
+        1 are suggested; inputs longer than SHORT_WORD_LENGTH characters fall back
+        to distance 2 when nothing is that close.
+
+        Returns:
+            list: {'word', 'match': 'prefix' or 'fuzzy', 'distance'} dictionaries
+        """
+        key = (prefix or '').strip().lower()
+        if not key:
+            return []
+
+        with self._lock:
+            suggestions = []
+            start = bisect.bisect_left(self._keys, key)
+            end = bisect.bisect_left(self._keys, key + '\U0010ffff', start)
+            for candidate in self._keys[start:min(end, start + limit)]:
+                suggestions.extend(
+                    {'word': word, 'match': 'prefix', 'distance': 0}
+                    for word in sorted(self._words[candidate])
+                )
+
+            if not suggestions and len(key) >= MIN_FUZZY_LENGTH:
+                fuzzy = self._fuzzy_matches(key, 1)
+                if not fuzzy and len(key) > SHORT_WORD_LENGTH:
+                    fuzzy = self._fuzzy_matches(key, 2)
+                for distance, candidate in fuzzy:
+                    suggestions.extend(
+                        {'word': word, 'match': 'fuzzy', 'distance': distance}
+                        for word in sorted(self._words[candidate])
+                    )
+                    if len(suggestions) >= limit:
+                        break
+            return suggestions[:limit]
+
+    def _fuzzy_matches(self, key, max_distance):
+        """Live keys within max_distance of key, closest first"""
+        return sorted(
+            (distance, candidate)
+            for distance, candidate in self._tree.search(key, max_distance)
+            if candidate in self._words
+        )
+
+def record_word_changes(session, changes):
+    """
+    Queue ('add' | 'remove', word) changes for the word index of `session`.
+    Used for cards written with raw SQL, which the flush hook cannot see.
+    """
+    if changes:
+        session.info.setdefault('word_index_changes', []).extend(changes)
+
+def track_card_changes(session_factory, index):
+    """
+    Keep `index` in sync with cards written through sessions of `session_factory`.
+
+    Word changes are collected on every flush and only applied to the index when
+    the transaction commits; a rollback discards them.
+    """
+    @event.listens_for(session_factory, 'after_flush')
+    def collect_word_changes(session, flush_context):
+        changes = []
+        for card in session.new:
+            if isinstance(card, Card):
+                changes.append(('add', card.word))
+        for card in session.dirty:
+            if isinstance(card, Card):
+                history = sa_inspect(card).attrs.word.history
+                if history.has_changes():
+                    changes.extend(('remove', word) for word in history.deleted)
+                    changes.extend(('add', word) for word in history.added)
+        for card in session.deleted:
+            if isinstance(card, Card):
+                changes.append(('remove', card.word))
+        record_word_changes(session, changes)
+
+    @event.listens_for(session_factory, 'after_commit')
+    def apply_word_changes(session):
+        changes = session.info.pop('word_index_changes', None)
+        if changes:
+            index.apply(changes)
+
+    @event.listens_for(session_factory, 'after_rollback')
+    def discard_word_changes(session):
+        session.info.pop('word_index_changes', None)
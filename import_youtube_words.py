@@ -1,18 +1,50 @@
 import sys
-import sqlite3
-import requests
+import os
 from youtube_transcript_api import YouTubeTranscriptApi
 import re
 
+# Shared SQLite connection settings live in the flashcard app
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'flashcard'))
+
+from sqlite_tuning import connect_sqlite
+from card_upsert import upsert_cards
+from models import get_engine, DECK_SCHEMA
+from dictionary_cache import DictionaryCache, fetch_dictionary_entry
+from enrichment import HostRateLimiter, enrich_words
+from lexicon import open_lexicon
+
+DB_PATH = 'e:/WindsurfAICodeFolder/flashcards.db'
+
+# Lookups are cached in the database's dictionary_cache table across runs
+dictionary_cache = None
+
+def get_dictionary_cache():
+    """Open the lookup cache on first use"""
+    global dictionary_cache
+    if dictionary_cache is None:
+        limiter = HostRateLimiter(20)
+        dictionary_cache = DictionaryCache(
+            get_engine(DB_PATH, schema=DECK_SCHEMA),
+            fetch=lambda word: fetch_dictionary_entry(word, limiter=limiter)
+        )
+    return dictionary_cache
+
+# Offline lexicon checked before the dictionary API (None when not built)
+lexicon = open_lexicon()
+
 def get_word_details(word):
     """
-    Fetch word details from a dictionary API
+    Fetch word details from the offline lexicon, or from a dictionary API
+    through the shared lookup cache
     """
+    entry = lexicon.lookup(word) if lexicon is not None else None
+    if entry is not None and entry.definition:
+        return entry.definition, entry.example or "No example available"
+
     try:
-        # Use Free Dictionary API
-        response = requests.get(f"https://api.dictionaryapi.dev/api/v2/entries/en/{word}")
-        if response.status_code == 200:
-            data = response.json()[0]
+        entries = get_dictionary_cache().lookup(word)
+        if entries:
+            data = entries[0]
             
             # Extract meaning
             meaning = data['meanings'][0]['definitions'][0]['definition'] if data['meanings'] else "No definition found"
@@ -68,47 +100,24 @@ def import_youtube_words(video_url):
         # Extract unique words
         words = extract_unique_words(transcript)
         
-        # Connect to SQLite database
-        conn = sqlite3.connect('e:/WindsurfAICodeFolder/flashcards.db')
-        cursor = conn.cursor()
+        # Look up every word concurrently before opening the database
+        get_dictionary_cache()  # Open the cache before the lookup threads start
+        details = enrich_words(words[:50], get_word_details)  # Limit to first 50 words
+        cards = [
+            {'word': word, 'meaning': meaning, 'example': example, 'box_number': 1}
+            for word, (meaning, example) in details.items()
+        ]
         
-        # Track import statistics
-        words_added = 0
-        words_updated = 0
+        # Connect to SQLite database
+        conn = connect_sqlite(DB_PATH)
         
-        for word in words[:50]:  # Limit to first 50 words
-            try:
-                # Check if word already exists
-                cursor.execute('SELECT id FROM cards WHERE word = ?', (word,))
-                existing = cursor.fetchone()
-                
-                # Get word details
-                meaning, example = get_word_details(word)
-                
-                if existing:
-                    # Update existing word
-                    cursor.execute('''
-                        UPDATE cards 
-                        SET meaning = ?, example = ?, updated_at = CURRENT_TIMESTAMP 
-                        WHERE word = ?
-                    ''', (meaning, example, word))
-                    words_updated += 1
-                else:
-                    # Insert new word
-                    cursor.execute('''
-                        INSERT INTO cards 
-                        (word, meaning, example, box_number, created_at, updated_at) 
-                        VALUES (?, ?, ?, 1, CURRENT_TIMESTAMP, CURRENT_TIMESTAMP)
-                    ''', (word, meaning, example))
-                    words_added += 1
-            
-            except Exception as e:
-                print(f"Error processing word {word}: {e}")
+        # New words are inserted, existing ones only filled in while undefined
+        result = upsert_cards(conn, cards, update_columns=('meaning', 'example'))
         
         # Commit changes
         conn.commit()
         
-        print(f"Import complete. Words added: {words_added}, Words updated: {words_updated}")
+        print(f"Import complete. Words added: {result.inserted}, Words updated: {result.updated}")
     
     except Exception as e:
         print(f"Error importing YouTube words: {e}")
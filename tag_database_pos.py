@@ -2,10 +2,12 @@ import sqlite3
 import sys
 import os
 
-# Add the current directory to Python path
+# Add the current directory and the flashcard app to Python path
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'flashcard'))
 
 from pos_tagger import POSTagger
+from sqlite_tuning import connect_sqlite
 
 class DatabasePOSTagger:
     def __init__(self, db_path):
@@ -14,7 +16,7 @@ class DatabasePOSTagger:
     
     def connect_db(self):
         """Connect to the SQLite database"""
-        return sqlite3.connect(self.db_path)
+        return connect_sqlite(self.db_path)
     
     def get_table_info(self):
         """Get information about tables in the database"""